@@ -0,0 +1,90 @@
+import json
+from collections import OrderedDict
+from functools import lru_cache
+from sqlalchemy import func, select, text
+from app.generation import current_generation
+from app.config import settings
+
+# Exact totals of the current generation, least recently used first
+_exact_counts = OrderedDict()
+_counts_generation = {"generation": None}
+
+
+def count_statement(stmt):
+    """SELECT COUNT(*) over the rows a select returns"""
+    return select(func.count()).select_from(stmt.order_by(None).subquery())
+
+
+# Listing selects are built once per filter shape (app/deal_query.py), so their
+# count statements and SQL are worth keeping per select instance
+cached_count_statement = lru_cache(maxsize=256)(count_statement)
+
+
+@lru_cache(maxsize=256)
+def _statement_sql(stmt, dialect):
+    return str(stmt.order_by(None).compile(dialect=dialect))
+
+
+async def count_rows(db, stmt, params=None):
+    """COUNT(*) of the rows a select returns"""
+    return await db.scalar(count_statement(stmt), params)
+
+
+def statement_key(stmt, dialect, params=None):
+    """Normalised filter set of a select: its SQL plus the bound values (lists sorted)"""
+    if params is None:
+        compiled = stmt.order_by(None).compile(dialect=dialect)
+        sql, params = str(compiled), compiled.params
+    else:
+        sql = _statement_sql(stmt, dialect)
+    return sql, tuple(sorted(
+        (name, repr(sorted(value) if isinstance(value, (list, tuple)) else value))
+        for name, value in params.items()
+    ))
+
+
+async def estimated_count(db, stmt, params=None):
+    """The planner's row estimate for a select, from the table statistics"""
+    dialect = db.get_bind().dialect
+    if params:
+        stmt = stmt.params(**params)
+    sql = stmt.order_by(None).compile(dialect=dialect, compile_kwargs={"literal_binds": True})
+    plan = await db.scalar(text(f"EXPLAIN (FORMAT JSON) {sql}"))
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+async def exact_count(db, stmt, params=None):
+    """COUNT(*) cached per filter set until ingest starts a new data generation"""
+    generation = await current_generation(db)
+    if _counts_generation["generation"] != generation:
+        _exact_counts.clear()
+        _counts_generation["generation"] = generation
+
+    key = statement_key(stmt, db.get_bind().dialect, params)
+    if key in _exact_counts:
+        _exact_counts.move_to_end(key)
+        return _exact_counts[key]
+
+    total = await db.scalar(cached_count_statement(stmt), params)
+    _exact_counts[key] = total
+    if len(_exact_counts) > settings.CACHE_CONFIG["count_cache_size"]:
+        _exact_counts.popitem(last=False)
+    return total
+
+
+async def count_total(db, stmt, params=None, with_total=True, estimate=False):
+    """
+    (total, is_estimate) for a listing select, or (None, False) without with_total.
+    params are the values of the select's unbound parameters, if it has any.
+
+    estimate is for selects the column statistics describe well (unfiltered or
+    source-only, see DealFilterSpec.estimable); on Postgres they get the
+    planner's estimate instead of a count.
+    """
+    if not with_total:
+        return None, False
+    if estimate and settings.CACHE_CONFIG["estimate_unfiltered_counts"] and db.get_bind().dialect.name == "postgresql":
+        return await estimated_count(db, stmt, params), True
+    return await exact_count(db, stmt, params), False
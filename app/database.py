@@ -1,32 +1,137 @@
+from fastapi import Query
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.config import settings
 import logging
+import os
 
 logger = logging.getLogger(__name__)
 
-# Create PostgreSQL engine
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def is_postgres(database_url):
+    return make_url(database_url).get_backend_name() == "postgresql"
+
+# Write engine for ingest, cleanup, price history partitions and migrations (always the primary)
 try:
-    engine = create_engine(
+    write_engine = create_engine(
         settings.DATABASE_URL,
-        pool_size=10,
-        max_overflow=20,
+        pool_size=settings.PERFORMANCE["db_write_pool_size"],
+        max_overflow=settings.PERFORMANCE["db_write_max_overflow"],
         pool_pre_ping=True,
+        connect_args=(
+            {"options": f"-c statement_timeout={settings.PERFORMANCE['db_write_statement_timeout']}"}
+            if is_postgres(settings.DATABASE_URL) else {}
+        ),
         echo=False  # Set to True for SQL logging
     )
-    logger.info("✓ PostgreSQL engine created successfully")
+    logger.info("✓ PostgreSQL write engine created successfully")
 except Exception as e:
-    logger.error(f"✗ Failed to create PostgreSQL engine: {e}")
+    logger.error(f"✗ Failed to create PostgreSQL write engine: {e}")
     raise
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Scripts and older code import the write engine by its original name
+engine = write_engine
+
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=write_engine)
 Base = declarative_base()
 
+def async_database_url(database_url):
+    """DATABASE_URL for the asyncpg driver, plus the connect_args it needs
+    
+    asyncpg takes ssl instead of libpq's sslmode and rejects the other libpq
+    query options (channel_binding etc.); non-postgres URLs are left as they are.
+    """
+    url = make_url(database_url)
+    if not is_postgres(database_url):
+        return url, {}
+    
+    connect_args = {}
+    query = dict(url.query)
+    sslmode = query.pop("sslmode", None)
+    if sslmode and sslmode not in ("disable", "allow"):
+        connect_args["ssl"] = sslmode
+    query.pop("channel_binding", None)
+    return url.set(drivername="postgresql+asyncpg", query=query), connect_args
+
+def create_read_engine(database_url, pool_size, max_overflow):
+    """Async engine for the API's read endpoints, with the read statement timeout"""
+    url, connect_args = async_database_url(database_url)
+    if is_postgres(database_url):
+        connect_args["server_settings"] = {
+            "statement_timeout": settings.PERFORMANCE["db_statement_timeout"],
+            "default_transaction_read_only": "on",
+        }
+    return create_async_engine(
+        url,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_pre_ping=True,
+        connect_args=connect_args,
+        echo=False
+    )
+
+# Read engine for the API endpoints: the replica when there is one, otherwise the primary
+try:
+    read_engine = create_read_engine(
+        settings.DATABASE_REPLICA_URL or settings.DATABASE_URL,
+        settings.PERFORMANCE["db_pool_size"],
+        settings.PERFORMANCE["db_max_overflow"],
+    )
+    # Read-your-writes for admin endpoints; without a replica every read is already fresh
+    fresh_read_engine = create_read_engine(
+        settings.DATABASE_URL,
+        settings.PERFORMANCE["db_fresh_pool_size"],
+        settings.PERFORMANCE["db_fresh_max_overflow"],
+    ) if settings.DATABASE_REPLICA_URL else read_engine
+    logger.info(f"✓ Async read engine created ({'replica' if settings.DATABASE_REPLICA_URL else 'primary'})")
+except Exception as e:
+    logger.error(f"✗ Failed to create async read engine: {e}")
+    raise
+
+AsyncSessionLocal = async_sessionmaker(read_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+FreshAsyncSessionLocal = async_sessionmaker(
+    fresh_read_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
+def run_migrations():
+    """Upgrade the schema to the latest Alembic revision (migrations/versions)"""
+    from alembic import command
+    from alembic.config import Config
+    from sqlalchemy import inspect
+    
+    config = Config(os.path.join(PROJECT_ROOT, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(PROJECT_ROOT, "migrations"))
+    config.attributes["configure_logger"] = False
+    
+    # Databases created by the old create_all at startup already have the baseline
+    inspector = inspect(write_engine)
+    if inspector.has_table("deals") and not inspector.has_table("alembic_version"):
+        logger.info("✓ Existing deals table found, stamping baseline revision 0001")
+        command.stamp(config, "0001")
+    
+    command.upgrade(config, "head")
+    logger.info("✓ Database schema is up to date")
+
 def get_db():
     """Dependency to get database session"""
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    """Dependency to get an async database session for the read endpoints"""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+async def get_admin_db(
+    fresh: bool = Query(False, description="Read from the primary instead of the replica (read-your-writes)")
+):
+    """Dependency for admin read endpoints: replica by default, primary with ?fresh=true"""
+    async with (FreshAsyncSessionLocal if fresh else AsyncSessionLocal)() as db:
+        yield db
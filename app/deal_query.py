@@ -0,0 +1,279 @@
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import Float, bindparam, cast, func, or_, select, tuple_
+from sqlalchemy.dialects.postgresql import ARRAY, array
+from app.models import Deal
+from app.parsers.units import UNITS
+from app.parsers.offers import OFFER_TYPES
+from app.counting import count_total
+from app.pagination import DEAL_SORTS, OFFER_SORTS, fetch_page, ordered, page_statement, sortable
+from app.projections import deal_columns
+from app.config import settings
+
+
+class InvalidFilter(ValueError):
+    pass
+
+
+class ListingShape(NamedTuple):
+    """Which filters a listing uses, not their values: one statement per shape"""
+    fields: Tuple[str, ...]
+    offers: bool
+    sort: str
+    include_inactive: bool
+    sources: bool
+    category: bool
+    search: bool
+    unit: bool
+    max_unit_price: bool
+    offer_type: bool
+    offer_text: bool
+
+
+@dataclass(frozen=True)
+class DealFilterSpec:
+    """
+    Canonical filters of a deal listing. Build with DealFilterSpec.of(), which
+    normalises what the endpoints accept: source and sources are one sorted
+    tuple, blank strings are no filter, and an offer_type that is not a parsed
+    type becomes a match on the offer text.
+    """
+    fields: Tuple[str, ...]
+    offers: bool = False  # only deals with a parsed offer, sorted by OFFER_SORTS
+    sort: str = "newest"
+    include_inactive: bool = False
+    sources: Optional[Tuple[str, ...]] = None
+    category: Optional[str] = None
+    search: Optional[str] = None
+    unit: Optional[str] = None
+    max_unit_price: Optional[float] = None
+    offer_type: Optional[str] = None
+    offer_text: Optional[str] = None
+
+    @classmethod
+    def of(cls, fields, offers=False, sort="newest", include_inactive=False, source=None,
+           sources: Optional[List[str]] = None, category=None, search=None, unit=None,
+           max_unit_price=None, offer_type=None):
+        sorts = OFFER_SORTS if offers else DEAL_SORTS
+        if sort not in sorts:
+            raise InvalidFilter(f"Invalid sort '{sort}', expected one of {list(sorts)}")
+        if unit and unit not in UNITS:
+            raise InvalidFilter(f"Invalid unit '{unit}', expected one of {list(UNITS)}")
+
+        names = sources or ([source] if source else [])
+        names = {name.strip() for name in names if name and name.strip()}
+        offer_type = (offer_type or "").strip() or None
+        return cls(
+            fields=tuple(fields),
+            offers=offers,
+            sort=sort,
+            include_inactive=include_inactive and not offers,
+            sources=tuple(sorted(names)) or None,
+            category=(category or "").strip() or None,
+            search=(search or "").strip() or None,
+            unit=unit or None,
+            max_unit_price=max_unit_price,
+            offer_type=offer_type if offer_type in OFFER_TYPES else None,
+            offer_text=offer_type if offer_type not in OFFER_TYPES else None,
+        )
+
+    @property
+    def sorts(self):
+        return OFFER_SORTS if self.offers else DEAL_SORTS
+
+    @property
+    def shape(self):
+        return ListingShape(
+            self.fields, self.offers, self.sort, self.include_inactive,
+            self.sources is not None, self.category is not None, self.search is not None,
+            self.unit is not None, self.max_unit_price is not None,
+            self.offer_type is not None, self.offer_text is not None,
+        )
+
+    @property
+    def params(self):
+        """Values for the bind parameters of listing_statement(self.shape)"""
+        params = {}
+        if self.sources is not None:
+            params["sources"] = list(self.sources)
+        if self.category is not None:
+            params["category"] = f"%{self.category}%"
+        if self.search is not None:
+            params["search"] = f"%{self.search}%"
+        if self.unit is not None:
+            params["unit"] = self.unit
+        if self.max_unit_price is not None:
+            params["max_unit_price"] = self.max_unit_price
+        if self.offer_type is not None:
+            params["offer_type"] = self.offer_type
+        if self.offer_text is not None:
+            params["offer_text"] = f"%{self.offer_text}%"
+        return params
+
+    @property
+    def estimable(self):
+        """
+        Whether the planner's estimate can stand in for the total: unfiltered or
+        source-only listings, which the per-value source statistics describe
+        well. Any other filter (substring, unit, price, offer) can be selective
+        enough to put the estimate off by orders of magnitude, so it is counted
+        """
+        return not (
+            self.offers or self.category or self.search or self.unit or self.max_unit_price is not None
+            or self.offer_type or self.offer_text
+        )
+
+
+@lru_cache(maxsize=256)
+def listing_statement(shape: ListingShape):
+    """The filtered, sortable() select of a shape; filter values are bind parameters"""
+    stmt = select(*deal_columns(shape.fields))
+
+    if not shape.include_inactive:
+        stmt = stmt.where(Deal.is_active == True)
+    if shape.offers:
+        stmt = stmt.where(Deal.offer_type.isnot(None))
+    if shape.sources:
+        stmt = stmt.where(Deal.source.in_(bindparam("sources", expanding=True)))
+    if shape.category:
+        stmt = stmt.where(Deal.category.ilike(bindparam("category")))
+    if shape.search:
+        pattern = bindparam("search")
+        stmt = stmt.where(or_(Deal.title.ilike(pattern), Deal.specs.ilike(pattern), Deal.offer.ilike(pattern)))
+
+    # Unit price filters and sort use idx_unit_price (unit, unit_price)
+    if shape.unit:
+        stmt = stmt.where(Deal.unit == bindparam("unit"))
+    if shape.max_unit_price:
+        stmt = stmt.where(Deal.unit_price <= bindparam("max_unit_price"))
+
+    # Parsed offer types are an indexed equality match, anything else a match on the text
+    if shape.offer_type:
+        stmt = stmt.where(Deal.offer_type == bindparam("offer_type"))
+    if shape.offer_text:
+        stmt = stmt.where(Deal.offer.ilike(bindparam("offer_text")))
+
+    return sortable(stmt, OFFER_SORTS if shape.offers else DEAL_SORTS, shape.sort)
+
+
+@lru_cache(maxsize=512)
+def listing_page_statement(shape: ListingShape, after_cursor: bool):
+    """listing_statement ordered and windowed for one page, see page_statement"""
+    return page_statement(
+        listing_statement(shape), OFFER_SORTS if shape.offers else DEAL_SORTS, shape.sort, after_cursor
+    )
+
+
+# Facet counts a listing can return with facets=. price and discount are
+# ranges numbered by width_bucket; the others group by the column value
+PRICE_BOUNDS = settings.FACET_CONFIG["price_bounds"]
+DISCOUNT_BUCKETS = settings.FACET_CONFIG["discount_buckets"]
+DISCOUNT_STEP = 100 / DISCOUNT_BUCKETS
+
+FACETS = {
+    "source": Deal.source,
+    "category": Deal.category,
+    "offer_type": Deal.offer_type,
+    "price": func.width_bucket(Deal.current_price, cast(array(PRICE_BOUNDS), ARRAY(Float))),
+    "discount": func.width_bucket(Deal.discount_percentage, 0, 100, DISCOUNT_BUCKETS),
+}
+
+
+def parse_facets(names):
+    """Requested facet names in canonical order; each may also be a comma-separated list"""
+    requested = {name.strip() for value in names or [] for name in value.split(",") if name.strip()}
+    unknown = requested - FACETS.keys()
+    if unknown:
+        raise InvalidFilter(f"Invalid facets {sorted(unknown)}, expected any of {list(FACETS)}")
+    return tuple(name for name in FACETS if name in requested)
+
+
+@lru_cache(maxsize=256)
+def facet_statement(shape: ListingShape, facets: Tuple[str, ...]):
+    """
+    Counts per value of each facet over a shape's rows, in one scan:
+    GROUP BY GROUPING SETS ((source), (category), ...). grouping() tells
+    which set a row belongs to. Buckets are computed in the inner select so
+    the sets group plain columns.
+    """
+    rows = listing_statement(shape).with_only_columns(
+        *[FACETS[name].label(name) for name in facets]
+    ).subquery()
+    return select(
+        *[func.grouping(rows.c[name]).label(f"{name}_grouping") for name in facets],
+        *[rows.c[name] for name in facets],
+        func.count().label("count"),
+    ).group_by(func.grouping_sets(*[tuple_(rows.c[name]) for name in facets]))
+
+
+def bucket_range(name, bucket):
+    """[min, max) of a price or discount bucket; None for an open end"""
+    if name == "price":
+        return (PRICE_BOUNDS[bucket - 1] if bucket > 0 else None,
+                PRICE_BOUNDS[bucket] if bucket < len(PRICE_BOUNDS) else None)
+    return (round((bucket - 1) * DISCOUNT_STEP, 2) if bucket > 0 else None,
+            round(bucket * DISCOUNT_STEP, 2) if bucket <= DISCOUNT_BUCKETS else None)
+
+
+async def fetch_facets(db, spec: DealFilterSpec, facets: Tuple[str, ...]):
+    """{facet: [{value, count}] or [{min, max, count}]} for the rows a spec matches"""
+    rows = (await db.execute(facet_statement(spec.shape, facets), spec.params)).mappings().all()
+
+    counts = {name: [] for name in facets}
+    for row in rows:
+        name = next(name for name in facets if row[f"{name}_grouping"] == 0)
+        if row[name] is not None:
+            counts[name].append((row[name], row["count"]))
+
+    result = {}
+    for name, values in counts.items():
+        if name in ("price", "discount"):
+            result[name] = [
+                dict(zip(("min", "max"), bucket_range(name, bucket)), count=count)
+                for bucket, count in sorted(values)
+            ]
+        else:
+            values.sort(key=lambda item: (-item[1], item[0]))
+            result[name] = [
+                {"value": value, "count": count}
+                for value, count in values[:settings.FACET_CONFIG["max_values"]]
+            ]
+    return result
+
+
+@lru_cache(maxsize=256)
+def export_statement(shape: ListingShape):
+    """listing_statement in page order without a window, for /deals/export"""
+    return ordered(listing_statement(shape), OFFER_SORTS if shape.offers else DEAL_SORTS, shape.sort)
+
+
+class ListingPage(NamedTuple):
+    total: Optional[int]
+    total_is_estimate: bool
+    has_more: bool
+    next_cursor: Optional[str]
+    deals: list
+    facets: Optional[dict] = None
+
+
+async def count_listing(db, spec: DealFilterSpec, with_total=True):
+    """(total, is_estimate) of a spec, see count_total"""
+    return await count_total(db, listing_statement(spec.shape), spec.params, with_total, estimate=spec.estimable)
+
+
+async def fetch_listing(db, spec: DealFilterSpec, cursor=None, skip=0, limit=20, with_total=True, facets=()):
+    """
+    One page of a listing, with the counts of facets when any are given.
+    Statements are built once per shape, so SQLAlchemy's compiled cache hits
+    for every request of that shape and only the bind values change.
+    Raises InvalidCursor for a cursor of another sort.
+    """
+    total, total_is_estimate = await count_listing(db, spec, with_total)
+    deals, next_cursor = await fetch_page(
+        db, listing_page_statement(spec.shape, bool(cursor)), spec.params,
+        spec.sorts, spec.sort, cursor=cursor, skip=skip, limit=limit
+    )
+    facet_counts = await fetch_facets(db, spec, facets) if facets else None
+    return ListingPage(total, total_is_estimate, next_cursor is not None, next_cursor, deals, facet_counts)
@@ -0,0 +1,87 @@
+import csv
+import io
+import logging
+import zlib
+from datetime import datetime
+
+import orjson
+from sqlalchemy import text
+from app import database
+from app.deal_query import DealFilterSpec, export_statement
+from app.config import settings
+
+logger = logging.getLogger("deals-api")
+
+# format= of /deals/export: media type and file extension
+EXPORT_FORMATS = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "csv": ("text/csv", "csv"),  # Starlette adds charset=utf-8
+}
+
+
+def ndjson_lines(fields, rows):
+    """One JSON object per row, newline terminated"""
+    return b"".join(orjson.dumps(dict(row), option=orjson.OPT_APPEND_NEWLINE) for row in rows)
+
+
+def csv_lines(fields, rows):
+    """CSV rows in fields order; datetimes as ISO 8601 like the JSON endpoints, NULL as empty"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow([
+            value.isoformat() if isinstance(value, datetime) else value
+            for value in (row[field] for field in fields)
+        ])
+    return buffer.getvalue().encode()
+
+
+ENCODERS = {"ndjson": ndjson_lines, "csv": csv_lines}
+
+
+async def export_deals(spec: DealFilterSpec, fmt, gzip=False):
+    """
+    Body of /deals/export: every deal a spec matches, as chunks of encoded rows.
+
+    Rows come from a server-side cursor (stream_results) in batches of
+    export_batch_size, so memory stays flat however many deals match, and
+    each batch is sent as soon as it is fetched. With gzip, every chunk is
+    flushed through the compressor instead of buffering the whole body.
+
+    The query runs in its own session: the response outlives the endpoint.
+    """
+    encode = ENCODERS[fmt]
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS) if gzip else None
+
+    def chunk(data):
+        if compressor is None:
+            return data
+        return compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    # The CSV header goes out before the query runs
+    if fmt == "csv":
+        yield chunk(",".join(spec.fields).encode() + b"\r\n")
+
+    exported = 0
+    try:
+        async with database.AsyncSessionLocal() as db:
+            if db.get_bind().dialect.name == "postgresql":
+                await db.execute(
+                    text("SELECT set_config('statement_timeout', :timeout, true)"),
+                    {"timeout": settings.PERFORMANCE["export_statement_timeout"]},
+                )
+            result = await db.stream(
+                export_statement(spec.shape).execution_options(yield_per=settings.PERFORMANCE["export_batch_size"]),
+                spec.params,
+            )
+            async for rows in result.mappings().partitions():
+                exported += len(rows)
+                yield chunk(encode(spec.fields, rows))
+    except Exception:
+        # Headers are long gone; the client sees a truncated body
+        logger.error(f"✗ Export failed after {exported} deals", exc_info=True)
+        raise
+
+    if compressor is not None:
+        yield compressor.flush()
+    logger.info(f"✓ Exported {exported} deals as {fmt}{' (gzip)' if gzip else ''}")
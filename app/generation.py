@@ -0,0 +1,56 @@
+import logging
+import time
+from sqlalchemy import func, insert, select, update
+from app.database import write_engine
+from app.models import DataGeneration
+from app.config import settings
+
+logger = logging.getLogger("deals-api")
+
+generation_table = DataGeneration.__table__
+
+# data_generation holds a single row
+GENERATION_ID = 1
+
+# Last generation this worker read, shared by all requests
+_cached = {"generation": None, "changed_at": None, "read_at": 0.0}
+
+
+async def generation_state(db):
+    """
+    (generation, changed_at) the read side is on, re-read at most every
+    generation_ttl seconds. changed_at is when deals last changed (Last-Modified).
+    """
+    now = time.monotonic()
+    if _cached["generation"] is None or now - _cached["read_at"] >= settings.CACHE_CONFIG["generation_ttl"]:
+        row = (await db.execute(
+            select(DataGeneration.generation, DataGeneration.updated_at).where(DataGeneration.id == GENERATION_ID)
+        )).first()
+        generation, changed_at = row if row else (0, None)
+        _cached.update(generation=generation, changed_at=changed_at, read_at=now)
+    return _cached["generation"], _cached["changed_at"]
+
+
+async def current_generation(db):
+    """Data generation the read side is on"""
+    generation, _ = await generation_state(db)
+    return generation
+
+
+def bump_generation(reason):
+    """Start a new data generation after deals changed; caches keyed on the old one go stale"""
+    with write_engine.begin() as conn:
+        generation = conn.scalar(
+            update(generation_table)
+            .where(generation_table.c.id == GENERATION_ID)
+            .values(generation=generation_table.c.generation + 1, updated_at=func.now())
+            .returning(generation_table.c.generation)
+        )
+        if generation is None:
+            generation = 1
+            conn.execute(insert(generation_table).values(id=GENERATION_ID, generation=generation))
+
+    # This worker sees its own writes right away
+    _cached["read_at"] = 0.0
+    logger.info(f"✓ Data generation {generation} ({reason})")
+    return generation
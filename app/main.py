@@ -1,16 +1,34 @@
 from fastapi import FastAPI, Depends, HTTPException, Query, BackgroundTasks
-from sqlalchemy.orm import Session
-from sqlalchemy import desc, or_
-from typing import List, Optional
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import cast, desc, func, select, text
+from sqlalchemy.dialects.postgresql import REGCONFIG
+from typing import Iterable, List, Optional
 import logging
 import logging.handlers
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 import os
 import sys
 
-from app.database import get_db, SessionLocal, engine
-from app.models import Base, Deal
+from app.database import get_admin_db, get_async_db, run_migrations
+from app.models import Deal, DealPriceHistory, SEARCH_CONFIG, deal_source_stats
 from app.scrapers.scraper_manager import ScraperManager
+from app.scrapers.deal_record import DealRecord
+from app.services.ingest_service import IngestService
+from app.services.price_history_service import PriceHistoryService
+from app.services.stats_service import StatsService
+from app.parsers.offers import OFFER_TYPES
+from app.counting import count_total
+from app.generation import bump_generation
+from app.response_cache import cached_response
+from app.projections import (
+    LISTING_FIELDS, MULTI_SOURCE_LISTING_FIELDS, OFFER_LISTING_FIELDS, SEARCH_FIELDS, SIMPLE_LISTING_FIELDS,
+    SOURCE_LISTING_FIELDS, deal_columns
+)
+from app.pagination import InvalidCursor
+from app.deal_query import FACETS, DealFilterSpec, InvalidFilter, fetch_listing, parse_facets
+from app.export import EXPORT_FORMATS, export_deals
 from app.config import settings
 
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
@@ -51,7 +69,9 @@ logger.addHandler(file_handler)
 # ------------------------------------------------------------------------------
 # DATABASE INIT
 # ------------------------------------------------------------------------------
-Base.metadata.create_all(bind=engine)
+# Schema is managed by Alembic (alembic.ini, migrations/); upgraded on startup
+if settings.AUTO_MIGRATE:
+    run_migrations()
 logger.info("✓ Database initialized")
 
 # ------------------------------------------------------------------------------
@@ -60,40 +80,59 @@ logger.info("✓ Database initialized")
 app = FastAPI(
     title="Multi-Site Deals API",
     version="2.0.0",
-    description="Manual scraping API (no auto scraping on startup)"
+    description="Manual scraping API (no auto scraping on startup)",
+    default_response_class=ORJSONResponse
 )
 
 # ------------------------------------------------------------------------------
 # HELPERS
 # ------------------------------------------------------------------------------
-def save_deals_to_db(deals: List[dict]):
-    db = SessionLocal()
+def save_deals_to_db(deals: Iterable[DealRecord], run_id: Optional[str] = None, completed_sources=()):
     try:
-        for deal_data in deals:
-            existing = db.query(Deal).filter(
-                Deal.product_id == deal_data["product_id"],
-                Deal.source == deal_data["source"]
-            ).first()
-
-            if existing:
-                for k, v in deal_data.items():
-                    if hasattr(existing, k) and k not in ("id", "created_at"):
-                        setattr(existing, k, v)
-                existing.updated_at = datetime.utcnow()
-                existing.is_active = True
-            else:
-                db.add(Deal(**deal_data))
-
-        db.commit()
-        logger.info(f"✓ Saved {len(deals)} deals")
+        if settings.INGEST_CONFIG["mode"] == "copy":
+            stats = IngestService.copy_deals(deals, run_id=run_id)
+        else:
+            stats = IngestService.upsert_deals(deals, run_id=run_id)
+        saved = stats['inserted'] + stats['updated'] + stats['unchanged']
+        logger.info(
+            f"✓ Saved {saved} deals: {stats['inserted']} inserted, "
+            f"{stats['updated']} changed, {stats['unchanged']} only seen "
+            f"({stats['price_changes']} price changes recorded)"
+        )
+        if stats['rejected']:
+            logger.warning(f"⚠ {stats['rejected']} deals rejected, see the deal_ingest_rejects table")
+
+        # Mark-and-sweep: rows of a fully scraped source that this run did not
+        # stamp with its run id are no longer listed by the site
+        changed = stats['inserted'] + stats['updated']
+        if run_id and settings.CLEANUP_CONFIG["sweep_unseen"]:
+            for source in sorted(completed_sources):
+                swept = IngestService.sweep_unseen(source, run_id)
+                changed += swept
+                logger.info(f"🧹 {source}: deactivated {swept} deals missing from run {run_id}")
+        
+        # Cached counts (and anything else keyed on the generation) go stale;
+        # the stats view is refreshed first so the new generation includes it.
+        # A run that only re-saw unchanged deals still moved their last_seen_at
+        # (latest_scrape in /scrapers/stats), so any saved row counts
+        if saved or changed:
+            StatsService.refresh_source_stats()
+            bump_generation(f"ingest run {run_id}" if run_id else "ingest")
+        return stats
 
     except Exception as e:
-        db.rollback()
         logger.error("✗ DB save failed", exc_info=True)
         raise
-    finally:
-        db.close()
 
+async def listing_page(db: AsyncSession, fields, cursor, skip, limit, with_total, facets=None, **filters):
+    """fetch_listing for the listing endpoints, with a bad filter, facet or cursor as a 400"""
+    try:
+        spec = DealFilterSpec.of(fields, **filters)
+        return await fetch_listing(
+            db, spec, cursor=cursor, skip=skip, limit=limit, with_total=with_total, facets=parse_facets(facets)
+        )
+    except (InvalidFilter, InvalidCursor) as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 def run_all_scraping(max_products=None, max_pages=None):
     logger.info("▶ Running ALL scrapers")
@@ -103,7 +142,7 @@ def run_all_scraping(max_products=None, max_pages=None):
         max_total_deals=max_products
     )
     if deals:
-        save_deals_to_db(deals)
+        save_deals_to_db(deals, manager.run_id, manager.completed_sources)
 
 
 def run_specific_scraper(scraper_name: str, max_products=None, max_pages=None):
@@ -120,13 +159,18 @@ def run_specific_scraper(scraper_name: str, max_products=None, max_pages=None):
         max_total_deals=max_products
     )
     if deals:
-        save_deals_to_db(deals)
+        save_deals_to_db(deals, manager.run_id, manager.completed_sources)
 
 # ------------------------------------------------------------------------------
 # STARTUP (NO SCRAPING)
 # ------------------------------------------------------------------------------
 @app.on_event("startup")
 async def startup_event():
+    try:
+        # Sync DDL on the write engine: keep it off the event loop
+        await run_in_threadpool(PriceHistoryService.rotate_partitions)
+    except Exception as e:
+        logger.error(f"✗ Price history partition rotation failed: {e}")
     logger.info("✓ App started (scraping disabled on startup)")
 
 # ------------------------------------------------------------------------------
@@ -192,15 +236,22 @@ def scrape_specific_limited(
 # DEALS API (Updated with scraper filtering and offer field)
 # ------------------------------------------------------------------------------
 @app.get("/deals")
-def get_deals(
-    db: Session = Depends(get_db),
+@cached_response()
+async def get_deals(
+    db: AsyncSession = Depends(get_async_db),
     skip: int = 0,
-    limit: int = 20,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page (replaces skip)"),
+    with_total: bool = Query(True, description="Set to false to skip counting; use has_more to page"),
     source: Optional[str] = None,
     sources: Optional[List[str]] = Query(None, description="Filter by multiple scraper sources"),
     category: Optional[str] = None,
     search: Optional[str] = None,
-    include_inactive: bool = Query(False, description="Include inactive deals")
+    include_inactive: bool = Query(False, description="Include inactive deals"),
+    unit: Optional[str] = Query(None, description="Filter by package unit (kg, l or piece)"),
+    max_unit_price: Optional[float] = Query(None, ge=0, description="Maximum price per unit"),
+    sort: str = Query("newest", description="Sort order: newest, unit_price, price or discount"),
+    facets: Optional[List[str]] = Query(None, description=f"Facet counts to return: {', '.join(FACETS)}"),
 ):
     """
     Get deals with filtering options.
@@ -208,60 +259,151 @@ def get_deals(
     - **sources**: Filter by multiple scraper sources (comma-separated)
     - **source**: Filter by single scraper source (alternative to sources)
     - **include_inactive**: Set to True to include deals marked as inactive
+    - **unit** / **max_unit_price**: Filter on the price per kg, litre or piece
+    - **sort**: newest (default), unit_price, price or discount; deals without that value are left out
+    - **cursor**: pass next_cursor from the previous response to get the next page
+    - **with_total**: false skips the count; without category/search the total is a planner estimate
+    - **search**: substring match; see /deals/search for ranked, accent-insensitive search
+    - **facets**: e.g. source,category,price: counts per value over all matching deals, in one query
+    """
+    page = await listing_page(
+        db, LISTING_FIELDS, cursor, skip, limit, with_total, sort=sort, include_inactive=include_inactive,
+        facets=facets, source=source, sources=sources, category=category, search=search, unit=unit,
+        max_unit_price=max_unit_price
+    )
+
+    return {
+        "total": page.total,
+        "total_is_estimate": page.total_is_estimate,
+        "has_more": page.has_more,
+        "skip": skip,
+        "limit": limit,
+        "sort": sort,
+        "next_cursor": page.next_cursor,
+        "filters": {
+            "sources": sources,
+            "category": category,
+            "search": search,
+            "include_inactive": include_inactive,
+            "unit": unit,
+            "max_unit_price": max_unit_price
+        },
+        "facets": page.facets,
+        "deals": page.deals
+    }
+
+
+# ts_headline options for /deals/search snippets
+SEARCH_HEADLINE_OPTIONS = "StartSel=<mark>, StopSel=</mark>, MaxWords=25, MinWords=8, MaxFragments=2"
+
+
+@app.get("/deals/search")
+@cached_response()
+async def search_deals(
+    q: str = Query(..., min_length=2, description='Search text: words, "exact phrase", -excluded, or'),
+    db: AsyncSession = Depends(get_async_db),
+    skip: int = 0,
+    limit: int = Query(20, ge=1, le=100),
+    sources: Optional[List[str]] = Query(None, description="Filter by scraper sources"),
+    include_inactive: bool = Query(False, description="Include inactive deals"),
+    with_total: bool = Query(True, description="Set to false to skip counting; use has_more to page")
+):
     """
-    q = db.query(Deal)
+    Full-text search over title, offer, category and specs, ranked by relevance.
     
-    if not include_inactive:
-        q = q.filter(Deal.is_active == True)
+    Accent and case insensitive ("γάλα" matches "ΓΑΛΑ" and "γαλα"), with Greek
+    stemming. Each deal comes with a highlighted snippet of the matched text.
+    """
+    query = func.websearch_to_tsquery(cast(SEARCH_CONFIG, REGCONFIG), q)
+    rank = func.ts_rank_cd(Deal.search_vector, query)
     
-    # Handle source filtering
+    # Matching and ranking only touch the GIN index and search_vector
+    matches = select(Deal.id, Deal.scraped_at, rank.label("rank")).where(
+        Deal.search_vector.bool_op("@@")(query)
+    )
+    if not include_inactive:
+        matches = matches.where(Deal.is_active == True)
     if sources:
-        # Filter by multiple sources
-        q = q.filter(Deal.source.in_(sources))
-    elif source:
-        # Filter by single source (backward compatibility)
-        q = q.filter(Deal.source == source)
+        matches = matches.where(Deal.source.in_(sources))
     
-    if category:
-        q = q.filter(Deal.category.ilike(f"%{category}%"))
-    if search:
-        q = q.filter(or_(
-            Deal.title.ilike(f"%{search}%"),
-            Deal.specs.ilike(f"%{search}%"),
-            Deal.offer.ilike(f"%{search}%")  # Added offer to search
-        ))
-
-    total = q.count()
-    deals = q.order_by(desc(Deal.scraped_at)).offset(skip).limit(limit).all()
+    total, total_is_estimate = await count_total(db, matches, with_total=with_total)
+    # One row past the page tells whether there is a next one
+    page = matches.order_by(desc("rank"), desc(Deal.scraped_at)).offset(skip).limit(limit + 1).subquery()
+    
+    # Snippets are only built for the page being returned
+    highlight = func.ts_headline(
+        cast(SEARCH_CONFIG, REGCONFIG),
+        func.concat_ws(" · ", Deal.title, Deal.offer, Deal.specs),
+        query,
+        SEARCH_HEADLINE_OPTIONS,
+    )
+    id_title, rest = deal_columns(SEARCH_FIELDS[:2]), deal_columns(SEARCH_FIELDS[2:])
+    results = (await db.execute(
+        select(*id_title, highlight.label("highlight"), page.c.rank.label("rank"), *rest)
+        .select_from(Deal).join(page, Deal.id == page.c.id)
+        .order_by(desc(page.c.rank), desc(page.c.scraped_at))
+    )).mappings().all()
+    has_more = len(results) > limit
+    results = results[:limit]
 
     return {
+        "query": q,
         "total": total,
+        "total_is_estimate": total_is_estimate,
+        "has_more": has_more,
         "skip": skip,
         "limit": limit,
         "filters": {
             "sources": sources,
-            "category": category,
-            "search": search,
             "include_inactive": include_inactive
         },
-        "deals": [
+        "deals": [dict(row, rank=round(row["rank"], 4)) for row in results]
+    }
+
+
+@app.get("/deals/{deal_id}/history")
+@cached_response()
+async def get_deal_history(
+    deal_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    days: int = Query(90, ge=1, le=3650, description="How far back to look"),
+    limit: int = Query(200, ge=1, le=1000)
+):
+    """
+    Price changes of one deal, newest first.
+    
+    A row is recorded on the first scrape and whenever the price, original
+    price, discount or offer changes.
+    """
+    deal = await db.get(Deal, deal_id)
+    if not deal:
+        raise HTTPException(status_code=404, detail=f"Deal {deal_id} not found")
+    
+    # deal_id + recorded_at range: one primary key range scan in the partitions it spans
+    since = datetime.now(timezone.utc) - timedelta(days=days)
+    history = (await db.scalars(
+        select(DealPriceHistory).where(
+            DealPriceHistory.deal_id == deal_id,
+            DealPriceHistory.recorded_at >= since
+        ).order_by(desc(DealPriceHistory.recorded_at)).limit(limit)
+    )).all()
+
+    return {
+        "deal_id": deal.id,
+        "title": deal.title,
+        "source": deal.source,
+        "price": deal.current_price,
+        "price_changed_at": deal.price_changed_at,
+        "days": days,
+        "history": [
             {
-                "id": d.id,
-                "title": d.title,
-                "price": d.current_price,
-                "original_price": d.original_price,
-                "discount": d.discount_percentage,
-                "source": d.source,
-                "category": d.category,
-                "image": d.image_url,
-                "url": d.get_redirect_url(),
-                "is_active": d.is_active,
-                "scraped_at": d.scraped_at,
-                "created_at": d.created_at,
-                "updated_at": d.updated_at,
-                "offer": d.offer,  # Added offer field
+                "recorded_at": h.recorded_at,
+                "price": h.current_price,
+                "original_price": h.original_price,
+                "discount": h.discount_percentage,
+                "offer": h.offer,
             }
-            for d in deals
+            for h in history
         ]
     }
 
@@ -270,11 +412,12 @@ def get_deals(
 # ENDPOINTS FOR SPECIFIC SCRAPERS
 # ------------------------------------------------------------------------------
 @app.get("/deals/sources")
-def get_available_sources(db: Session = Depends(get_db)):
+@cached_response()
+async def get_available_sources(db: AsyncSession = Depends(get_async_db)):
     """
     Get list of all available scraper sources in the database.
     """
-    sources = db.query(Deal.source).distinct().all()
+    sources = (await db.execute(select(Deal.source).distinct())).all()
     return {
         "sources": [source[0] for source in sources],
         "total": len(sources)
@@ -282,134 +425,100 @@ def get_available_sources(db: Session = Depends(get_db)):
 
 
 @app.get("/deals/from/{scraper_name}")
-def get_deals_from_scraper(
+@cached_response()
+async def get_deals_from_scraper(
     scraper_name: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     skip: int = 0,
-    limit: int = 20,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page (replaces skip)"),
+    with_total: bool = Query(True, description="Set to false to skip counting; use has_more to page"),
     category: Optional[str] = None,
     search: Optional[str] = None,
-    include_inactive: bool = Query(False, description="Include inactive deals")
+    include_inactive: bool = Query(False, description="Include inactive deals"),
+    sort: str = Query("newest", description="Sort order: newest, unit_price, price or discount"),
+    facets: Optional[List[str]] = Query(None, description=f"Facet counts to return: {', '.join(FACETS)}"),
 ):
     """
     Get deals from a specific scraper.
     
     - **scraper_name**: Name of the scraper to filter by
+    - **cursor**: pass next_cursor from the previous response to get the next page
     """
-    q = db.query(Deal).filter(Deal.source == scraper_name)
-    
-    if not include_inactive:
-        q = q.filter(Deal.is_active == True)
-    
-    if category:
-        q = q.filter(Deal.category.ilike(f"%{category}%"))
-    if search:
-        q = q.filter(or_(
-            Deal.title.ilike(f"%{search}%"),
-            Deal.specs.ilike(f"%{search}%"),
-            Deal.offer.ilike(f"%{search}%")  # Added offer to search
-        ))
-
-    total = q.count()
-    deals = q.order_by(desc(Deal.scraped_at)).offset(skip).limit(limit).all()
+    page = await listing_page(
+        db, SOURCE_LISTING_FIELDS, cursor, skip, limit, with_total, sort=sort, include_inactive=include_inactive,
+        facets=facets, source=scraper_name, category=category, search=search
+    )
 
     return {
         "source": scraper_name,
-        "total": total,
+        "total": page.total,
+        "total_is_estimate": page.total_is_estimate,
+        "has_more": page.has_more,
         "skip": skip,
         "limit": limit,
+        "sort": sort,
+        "next_cursor": page.next_cursor,
         "filters": {
             "category": category,
             "search": search,
             "include_inactive": include_inactive
         },
-        "deals": [
-            {
-                "id": d.id,
-                "title": d.title,
-                "price": d.current_price,
-                "original_price": d.original_price,
-                "discount": d.discount_percentage,
-                "category": d.category,
-                "image": d.image_url,
-                "url": d.get_redirect_url(),
-                "is_active": d.is_active,
-                "scraped_at": d.scraped_at,
-                "offer": d.offer,  # Added offer field
-            }
-            for d in deals
-        ]
+        "facets": page.facets,
+        "deals": page.deals
     }
 
 
 @app.get("/deals/multiple-sources")
-def get_deals_from_multiple_sources(
+@cached_response()
+async def get_deals_from_multiple_sources(
     sources: List[str] = Query(..., description="List of scraper sources to include"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     skip: int = 0,
-    limit: int = 20,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page (replaces skip)"),
+    with_total: bool = Query(True, description="Set to false to skip counting; use has_more to page"),
     category: Optional[str] = None,
     search: Optional[str] = None,
-    include_inactive: bool = Query(False, description="Include inactive deals")
+    include_inactive: bool = Query(False, description="Include inactive deals"),
+    sort: str = Query("newest", description="Sort order: newest, unit_price, price or discount"),
+    facets: Optional[List[str]] = Query(None, description=f"Facet counts to return: {', '.join(FACETS)}"),
 ):
     """
     Get deals from multiple specific scrapers.
     
     - **sources**: Comma-separated list of scraper sources
+    - **cursor**: pass next_cursor from the previous response to get the next page
     """
-    q = db.query(Deal).filter(Deal.source.in_(sources))
-    
-    if not include_inactive:
-        q = q.filter(Deal.is_active == True)
-    
-    if category:
-        q = q.filter(Deal.category.ilike(f"%{category}%"))
-    if search:
-        q = q.filter(or_(
-            Deal.title.ilike(f"%{search}%"),
-            Deal.specs.ilike(f"%{search}%"),
-            Deal.offer.ilike(f"%{search}%")  # Added offer to search
-        ))
-
-    total = q.count()
-    deals = q.order_by(desc(Deal.scraped_at)).offset(skip).limit(limit).all()
+    # Per-source counts come from the source facet, in the same grouped query as any requested facets
+    page = await listing_page(
+        db, MULTI_SOURCE_LISTING_FIELDS, cursor, skip, limit, with_total,
+        facets=(facets or []) + (["source"] if with_total else []), sort=sort,
+        include_inactive=include_inactive, sources=sources, category=category, search=search
+    )
     
-    # Count per source for statistics
-    source_counts = {}
-    for source in sources:
-        count_query = db.query(Deal).filter(Deal.source == source)
-        if not include_inactive:
-            count_query = count_query.filter(Deal.is_active == True)
-        source_counts[source] = count_query.count()
+    source_counts = None
+    if with_total:
+        counts = {facet["value"]: facet["count"] for facet in page.facets["source"]}
+        source_counts = {source: counts.get(source, 0) for source in sources}
 
     return {
         "sources": sources,
-        "total": total,
+        "total": page.total,
+        "total_is_estimate": page.total_is_estimate,
+        "has_more": page.has_more,
         "source_counts": source_counts,
         "skip": skip,
         "limit": limit,
+        "sort": sort,
+        "next_cursor": page.next_cursor,
         "filters": {
             "category": category,
             "search": search,
             "include_inactive": include_inactive
         },
-        "deals": [
-            {
-                "id": d.id,
-                "title": d.title,
-                "price": d.current_price,
-                "original_price": d.original_price,
-                "discount": d.discount_percentage,
-                "source": d.source,
-                "category": d.category,
-                "image": d.image_url,
-                "url": d.get_redirect_url(),
-                "is_active": d.is_active,
-                "scraped_at": d.scraped_at,
-                "offer": d.offer,  # Added offer field
-            }
-            for d in deals
-        ]
+        "facets": {name: page.facets[name] for name in parse_facets(facets)} if facets else None,
+        "deals": page.deals
     }
 
 
@@ -417,130 +526,74 @@ def get_deals_from_multiple_sources(
 # SCRAPER STATISTICS ENDPOINT
 # ------------------------------------------------------------------------------
 @app.get("/scrapers/stats")
-def get_scraper_statistics(db: Session = Depends(get_db)):
+@cached_response(store=False, cache_control="private, no-cache")
+async def get_scraper_statistics(db: AsyncSession = Depends(get_admin_db)):
     """
     Get statistics for each scraper.
-    """
-    # Get all available sources
-    all_sources = db.query(Deal.source).distinct().all()
-    sources_list = [source[0] for source in all_sources]
     
-    stats = []
-    for source in sources_list:
-        # Total deals for this source
-        total_deals = db.query(Deal).filter(Deal.source == source).count()
-        
-        # Active deals
-        active_deals = db.query(Deal).filter(
-            Deal.source == source,
-            Deal.is_active == True
-        ).count()
-        
-        # Latest scrape time
-        latest_scrape = db.query(Deal).filter(
-            Deal.source == source
-        ).order_by(desc(Deal.scraped_at)).first()
-        
-        # Category distribution
-        categories_query = db.query(
-            Deal.category,
-            db.func.count(Deal.id).label('count')
-        ).filter(
-            Deal.source == source,
-            Deal.is_active == True
-        ).group_by(Deal.category).all()
-        
-        # Offer types distribution
-        offers_query = db.query(
-            Deal.offer,
-            db.func.count(Deal.id).label('count')
-        ).filter(
-            Deal.source == source,
-            Deal.is_active == True,
-            Deal.offer.isnot(None),
-            Deal.offer != ""
-        ).group_by(Deal.offer).order_by(desc('count')).limit(10).all()
-        
-        stats.append({
-            "source": source,
-            "total_deals": total_deals,
-            "active_deals": active_deals,
-            "inactive_deals": total_deals - active_deals,
-            "latest_scrape": latest_scrape.scraped_at if latest_scrape else None,
-            "categories": [
-                {"category": cat, "count": count}
-                for cat, count in categories_query
-                if cat  # Filter out None/empty categories
-            ],
-            "top_offers": [
-                {"offer": offer, "count": count}
-                for offer, count in offers_query
-            ]
-        })
+    One read of the deal_source_stats view, which ingest and cleanup refresh.
+    Reads the replica when one is configured; pass fresh=true right after a
+    scrape to read the primary instead.
+    """
+    rows = (await db.execute(select(deal_source_stats).order_by(deal_source_stats.c.source))).mappings().all()
+    stats = [
+        {
+            "source": row["source"],
+            "total_deals": row["total_deals"],
+            "active_deals": row["active_deals"],
+            "inactive_deals": row["inactive_deals"],
+            "latest_scrape": row["latest_scrape"],
+            "categories": row["categories"],
+            "top_offers": row["top_offers"],
+        }
+        for row in rows
+    ]
     
     return {
         "scrapers": stats,
-        "total_scrapers": len(stats)
+        "total_scrapers": len(stats),
+        "refreshed_at": max((row["refreshed_at"] for row in rows), default=None)
     }
 
 # ------------------------------------------------------------------------------
 # NEW ENDPOINT: GET DEALS WITH OFFERS
 # ------------------------------------------------------------------------------
 @app.get("/deals/with-offers")
-def get_deals_with_offers(
-    db: Session = Depends(get_db),
+@cached_response()
+async def get_deals_with_offers(
+    db: AsyncSession = Depends(get_async_db),
     skip: int = 0,
-    limit: int = 20,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page (replaces skip)"),
+    with_total: bool = Query(True, description="Set to false to skip counting; use has_more to page"),
     source: Optional[str] = None,
-    offer_type: Optional[str] = Query(None, description="Filter by specific offer type"),
+    offer_type: Optional[str] = Query(None, description=f"Filter by offer type: {', '.join(OFFER_TYPES)}"),
+    sort: str = Query("newest", description="Sort order: newest, effective_discount or effective_price"),
+    facets: Optional[List[str]] = Query(None, description=f"Facet counts to return: {', '.join(FACETS)}"),
 ):
     """
     Get deals that have promotional offers.
+    
+    Offers are parsed at ingest, so offer_type is an indexed equality match.
+    Any other offer_type value is matched against the offer text.
+    Pass next_cursor from the previous response as cursor to get the next page.
     """
-    q = db.query(Deal).filter(
-        Deal.is_active == True,
-        Deal.offer.isnot(None),
-        Deal.offer != ""
+    page = await listing_page(
+        db, OFFER_LISTING_FIELDS, cursor, skip, limit, with_total, facets=facets, offers=True, sort=sort,
+        source=source, offer_type=offer_type
     )
     
-    if source:
-        q = q.filter(Deal.source == source)
-    
-    if offer_type:
-        q = q.filter(Deal.offer.ilike(f"%{offer_type}%"))
-    
-    total = q.count()
-    deals = q.order_by(desc(Deal.scraped_at)).offset(skip).limit(limit).all()
-    
-    # Get unique offer types for filtering
-    offer_types = db.query(Deal.offer).filter(
-        Deal.is_active == True,
-        Deal.offer.isnot(None),
-        Deal.offer != ""
-    ).distinct().all()
-    
     return {
-        "total": total,
+        "total": page.total,
+        "total_is_estimate": page.total_is_estimate,
+        "has_more": page.has_more,
         "skip": skip,
         "limit": limit,
-        "available_offer_types": sorted(list(set([ot[0] for ot in offer_types if ot[0]]))),
-        "deals": [
-            {
-                "id": d.id,
-                "title": d.title,
-                "price": d.current_price,
-                "original_price": d.original_price,
-                "discount": d.discount_percentage,
-                "source": d.source,
-                "category": d.category,
-                "image": d.image_url,
-                "url": d.get_redirect_url(),
-                "is_active": d.is_active,
-                "scraped_at": d.scraped_at,
-                "offer": d.offer,
-            }
-            for d in deals
-        ]
+        "sort": sort,
+        "next_cursor": page.next_cursor,
+        "available_offer_types": list(OFFER_TYPES),
+        "facets": page.facets,
+        "deals": page.deals
     }
 
 # ------------------------------------------------------------------------------
@@ -555,51 +608,77 @@ def list_scrapers():
 # SIMPLE DEALS ENDPOINT (Legacy - kept for backward compatibility)
 # ------------------------------------------------------------------------------
 @app.get("/deals/simple")
-def get_deals_simple(
-    db: Session = Depends(get_db),
+@cached_response()
+async def get_deals_simple(
+    db: AsyncSession = Depends(get_async_db),
     skip: int = 0,
-    limit: int = 20,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page (replaces skip)"),
+    with_total: bool = Query(True, description="Set to false to skip counting; use has_more to page"),
     source: Optional[str] = None,
     category: Optional[str] = None,
     search: Optional[str] = None,
 ):
-    q = db.query(Deal).filter(Deal.is_active == True)
-
-    if source:
-        q = q.filter(Deal.source == source)
-    if category:
-        q = q.filter(Deal.category.ilike(f"%{category}%"))
-    if search:
-        q = q.filter(or_(
-            Deal.title.ilike(f"%{search}%"),
-            Deal.specs.ilike(f"%{search}%"),
-            Deal.offer.ilike(f"%{search}%")
-        ))
-
-    total = q.count()
-    deals = q.order_by(desc(Deal.scraped_at)).offset(skip).limit(limit).all()
+    page = await listing_page(
+        db, SIMPLE_LISTING_FIELDS, cursor, skip, limit, with_total, source=source, category=category, search=search
+    )
 
     return {
-        "total": total,
-        "deals": [
-            {
-                "id": d.id,
-                "title": d.title,
-                "price": d.current_price,
-                "discount": d.discount_percentage,
-                "source": d.source,
-                "image": d.image_url,
-                "url": d.get_redirect_url(),
-                "offer": d.offer,  # Added offer field
-            }
-            for d in deals
-        ]
+        "total": page.total,
+        "total_is_estimate": page.total_is_estimate,
+        "has_more": page.has_more,
+        "next_cursor": page.next_cursor,
+        "deals": page.deals
+    }
+
+# ------------------------------------------------------------------------------
+# BULK EXPORT
+# ------------------------------------------------------------------------------
+@app.get("/deals/export")
+async def get_deals_export(
+    format: str = Query("ndjson", description=f"Output format: {', '.join(EXPORT_FORMATS)}"),
+    gzip: bool = Query(False, description="Compress the stream (Content-Encoding: gzip)"),
+    source: Optional[str] = None,
+    sources: Optional[List[str]] = Query(None, description="Filter by multiple scraper sources"),
+    category: Optional[str] = None,
+    search: Optional[str] = None,
+    include_inactive: bool = Query(False, description="Include inactive deals"),
+    unit: Optional[str] = Query(None, description="Filter by package unit (kg, l or piece)"),
+    max_unit_price: Optional[float] = Query(None, ge=0, description="Maximum price per unit"),
+    sort: str = Query("newest", description="Sort order: newest, unit_price, price or discount")
+):
+    """
+    Stream every deal matching the /deals filters, with the /deals fields.
+    
+    - **format**: ndjson (one JSON object per line) or csv (with a header row)
+    - **gzip**: compress the stream; chunks are flushed as they are sent
+    
+    Rows are read through a server-side cursor and sent batch by batch, so
+    the export starts right away and its size is not limited by memory.
+    """
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Invalid format '{format}', expected one of {list(EXPORT_FORMATS)}")
+    try:
+        spec = DealFilterSpec.of(
+            LISTING_FIELDS, sort=sort, include_inactive=include_inactive, source=source, sources=sources,
+            category=category, search=search, unit=unit, max_unit_price=max_unit_price
+        )
+    except InvalidFilter as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    media_type, extension = EXPORT_FORMATS[format]
+    headers = {
+        "Content-Disposition": f'attachment; filename="deals.{extension}"',
+        "Cache-Control": "no-store",
     }
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(export_deals(spec, format, gzip), media_type=media_type, headers=headers)
 
 # ------------------------------------------------------------------------------
 # HEALTH
 # ------------------------------------------------------------------------------
 @app.get("/health")
-def health(db: Session = Depends(get_db)):
-    db.execute("SELECT 1")
+async def health(db: AsyncSession = Depends(get_async_db)):
+    await db.execute(text("SELECT 1"))
     return {"status": "healthy"}
\ No newline at end of file
@@ -1,7 +1,21 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Text, Boolean, Index
+from sqlalchemy import BigInteger, Column, Integer, String, Float, DateTime, Text, Boolean, Index, UniqueConstraint, Computed, text
+from sqlalchemy import MetaData, Table, and_, case
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.sql import func
 from app.database import Base
 
+# Text search configuration for /deals/search: Greek stemming after unaccent (migration 0004)
+SEARCH_CONFIG = 'greek_unaccent'
+
+# Weighted document behind deals.search_vector: title > offer > category > specs
+SEARCH_VECTOR_SQL = (
+    f"setweight(to_tsvector('{SEARCH_CONFIG}'::regconfig, coalesce(title, '')), 'A') || "
+    f"setweight(to_tsvector('{SEARCH_CONFIG}'::regconfig, coalesce(offer, '')), 'B') || "
+    f"setweight(to_tsvector('{SEARCH_CONFIG}'::regconfig, coalesce(category, '')), 'C') || "
+    f"setweight(to_tsvector('{SEARCH_CONFIG}'::regconfig, coalesce(specs, '')), 'D')"
+)
+
 class Deal(Base):
     __tablename__ = "deals"
     
@@ -24,19 +38,146 @@ class Deal(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     is_active = Column(Boolean, default=True)
+    # md5 of the material fields (DealRecord.content_hash); ingest only rewrites the row when it changes
+    content_hash = Column(String(32), nullable=True)
+    # Refreshed on every scrape that sees the deal, changed or not (kept unindexed so the update stays HOT)
+    last_seen_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Last time price, discount or offer changed (a deal_price_history row was written)
+    price_changed_at = Column(DateTime(timezone=True), server_default=func.now())
+    # ScraperManager run that last saw the deal; complete runs deactivate the rest of their source
+    last_run_id = Column(String(32), nullable=True)
     offer = Column(String(200), nullable=True) 
     
-    # Create indexes for better query performance
+    # Package size parsed at ingest (app/parsers/units.py), normalised to kg, l or piece
+    unit_quantity = Column(Float, nullable=True)
+    unit = Column(String(10), nullable=True)
+    unit_price = Column(Float, nullable=True)  # current_price per unit
+    
+    # Promotion parsed from the offer text at ingest (app/parsers/offers.py)
+    offer_type = Column(String(30), nullable=True)
+    offer_buy_qty = Column(Integer, nullable=True)
+    offer_free_qty = Column(Integer, nullable=True)
+    offer_nth_item = Column(Integer, nullable=True)
+    offer_nth_discount = Column(Float, nullable=True)
+    effective_price = Column(Float, nullable=True)  # per item, buying the whole offer
+    effective_discount = Column(Float, nullable=True)
+    
+    # Full-text document, generated by Postgres from the columns above
+    search_vector = Column(TSVECTOR, Computed(SEARCH_VECTOR_SQL, persisted=True))
+    
+    # Create indexes for better query performance. The schema is managed by the
+    # Alembic migrations in migrations/versions; keep these in step with them
     __table_args__ = (
-        Index('idx_product_id_source', 'product_id', 'source'),
+        # One row per product and site; save_deals_to_db upserts on it
+        UniqueConstraint('source', 'product_id', name='uq_deals_source_product_id'),
         Index('idx_discount', 'discount_percentage'),
         Index('idx_current_price', 'current_price'),
         Index('idx_scraped_at', 'scraped_at'),
-        Index('idx_source', 'source'),
+        # Keyset pages of the listing sorts, (sort column, id) in sort order (0005, app/pagination.py)
+        Index('idx_deals_active_newest', text('scraped_at DESC'), text('id DESC'), postgresql_where=text('is_active')),
+        Index('idx_deals_active_source_newest', 'source', text('scraped_at DESC'), text('id DESC'),
+              postgresql_where=text('is_active')),
+        Index('idx_deals_active_discount', text('discount_percentage DESC'), text('id DESC'),
+              postgresql_where=text('is_active AND discount_percentage IS NOT NULL')),
+        Index('idx_deals_active_price', 'current_price', 'id',
+              postgresql_where=text('is_active AND current_price IS NOT NULL')),
+        Index('idx_deals_active_unit_price', 'unit_price', 'id',
+              postgresql_where=text('is_active AND unit_price IS NOT NULL')),
+        Index('idx_deals_active_offers_newest', text('scraped_at DESC'), text('id DESC'),
+              postgresql_where=text('is_active AND offer_type IS NOT NULL')),
+        Index('idx_deals_active_offers_effective_discount', text('effective_discount DESC'), text('id DESC'),
+              postgresql_where=text('is_active AND offer_type IS NOT NULL AND effective_discount IS NOT NULL')),
+        Index('idx_deals_active_offers_effective_price', 'effective_price', 'id',
+              postgresql_where=text('is_active AND offer_type IS NOT NULL AND effective_price IS NOT NULL')),
+        # include_inactive listings and the latest scrape per source in /scrapers/stats (0003)
+        Index('idx_deals_source_scraped_at', 'source', text('scraped_at DESC')),
+        # pg_trgm indexes for the ilike '%x%' filters
+        Index('idx_deals_title_trgm', 'title', postgresql_using='gin', postgresql_ops={'title': 'gin_trgm_ops'}),
+        Index('idx_deals_specs_trgm', 'specs', postgresql_using='gin', postgresql_ops={'specs': 'gin_trgm_ops'}),
+        Index('idx_deals_offer_trgm', 'offer', postgresql_using='gin', postgresql_ops={'offer': 'gin_trgm_ops'}),
+        Index('idx_deals_category_trgm', 'category', postgresql_using='gin',
+              postgresql_ops={'category': 'gin_trgm_ops'}),
+        # /deals/search (0004)
+        Index('idx_deals_search_vector', 'search_vector', postgresql_using='gin'),
+        Index('idx_unit_price', 'unit', 'unit_price'),
+        Index('idx_offer_type_effective_discount', 'offer_type', 'effective_discount'),
+        Index('idx_effective_price', 'effective_price'),
     )
     
-    def get_redirect_url(self):
+    @hybrid_property
+    def redirect_url(self):
         """Generate the full redirect URL for the deal"""
         if self.product_id and '?' not in self.product_url:
             return f"{self.product_url}?product_id={self.product_id}"
-        return self.product_url
\ No newline at end of file
+        return self.product_url
+    
+    @redirect_url.expression
+    def redirect_url(cls):
+        """The same URL built in SQL, for column-projected listings"""
+        return case(
+            (and_(cls.product_id.isnot(None), cls.product_id != '', ~cls.product_url.contains('?', autoescape=True)),
+             cls.product_url + '?product_id=' + cls.product_id),
+            else_=cls.product_url,
+        )
+    
+    def get_redirect_url(self):
+        """Generate the full redirect URL for the deal"""
+        return self.redirect_url
+
+
+class DealIngestReject(Base):
+    """Rows ingest could not write, kept with the database error (see IngestService)"""
+    __tablename__ = "deal_ingest_rejects"
+    
+    id = Column(Integer, primary_key=True)
+    run_id = Column(String(32), index=True)
+    source = Column(String(100))
+    product_id = Column(String(100))
+    error = Column(Text)
+    row_data = Column(Text)  # the rejected row as JSON
+    rejected_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class DealPriceHistory(Base):
+    """Append-only price changes of a deal, partitioned by month (see PriceHistoryService)"""
+    __tablename__ = "deal_price_history"
+    
+    # No foreign key: rows are only ever appended by ingest, and old partitions
+    # are detached rather than deleted
+    deal_id = Column(Integer, primary_key=True)
+    recorded_at = Column(DateTime(timezone=True), primary_key=True)
+    current_price = Column(Float)
+    original_price = Column(Float)
+    discount_percentage = Column(Float)
+    offer = Column(String(200), nullable=True)
+    
+    # The (deal_id, recorded_at) primary key doubles as the history lookup index
+    __table_args__ = (
+        {'postgresql_partition_by': 'RANGE (recorded_at)'},
+    )
+
+
+class DataGeneration(Base):
+    """Single-row counter bumped whenever ingest or cleanup changes deals (see app/generation.py)"""
+    __tablename__ = "data_generation"
+    
+    id = Column(Integer, primary_key=True)
+    generation = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+# Materialized view from migrations/versions/0007_deal_source_stats.py, refreshed
+# by StatsService. On its own MetaData so create_all and autogenerate leave it alone
+view_metadata = MetaData()
+
+deal_source_stats = Table(
+    "deal_source_stats", view_metadata,
+    Column("source", String(100), primary_key=True),
+    Column("total_deals", BigInteger),
+    Column("active_deals", BigInteger),
+    Column("inactive_deals", BigInteger),
+    Column("latest_scrape", DateTime(timezone=True)),
+    Column("categories", JSONB),  # [{"category", "count"}], most deals first
+    Column("top_offers", JSONB),  # [{"offer", "count"}], at most 10
+    Column("refreshed_at", DateTime(timezone=True)),
+)
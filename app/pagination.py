@@ -0,0 +1,140 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import NamedTuple
+
+from sqlalchemy import Integer, bindparam, tuple_
+from app.models import Deal
+
+
+class SortKey(NamedTuple):
+    column: object
+    descending: bool
+
+
+# Keyset sorts: (sort column, id) in the same direction, each matched by a partial
+# index in migrations/versions/0005_keyset_indexes.py
+DEAL_SORTS = {
+    "newest": SortKey(Deal.scraped_at, True),
+    "discount": SortKey(Deal.discount_percentage, True),
+    "price": SortKey(Deal.current_price, False),
+    "unit_price": SortKey(Deal.unit_price, False),
+}
+
+OFFER_SORTS = {
+    "newest": SortKey(Deal.scraped_at, True),
+    "effective_discount": SortKey(Deal.effective_discount, True),
+    "effective_price": SortKey(Deal.effective_price, False),
+}
+
+
+# Labels of the keyset position page_statement adds to a page's columns
+CURSOR_VALUE = "cursor_value"
+CURSOR_ID = "cursor_id"
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(sort, value, row_id):
+    """Opaque token for the page after the row with this sort value and id"""
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    payload = json.dumps([sort, value, row_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(token, sort, sorts):
+    """(sort value, id) from a cursor, which must have been issued for this sort"""
+    try:
+        payload = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        cursor_sort, value, row_id = json.loads(payload)
+    except (binascii.Error, ValueError, TypeError):
+        raise InvalidCursor("Malformed cursor")
+
+    if cursor_sort != sort:
+        raise InvalidCursor(f"Cursor was issued for sort '{cursor_sort}', not '{sort}'")
+    # bool is an int subclass, but true/false is never a sort value or an id
+    if not isinstance(row_id, int) or isinstance(row_id, bool) or value is None:
+        raise InvalidCursor("Malformed cursor")
+
+    if sorts[sort].column is Deal.scraped_at:
+        try:
+            value = datetime.fromisoformat(value)
+        except (TypeError, ValueError):
+            raise InvalidCursor("Malformed cursor")
+    elif not isinstance(value, (int, float)) or isinstance(value, bool):
+        raise InvalidCursor("Malformed cursor")
+    return value, row_id
+
+
+def sortable(stmt, sorts, sort):
+    """
+    Leave out rows without a value for the sort column.
+
+    Apply before counting, so total matches what the pages return; it also
+    keeps the row comparison in page_statement a single index range.
+    """
+    return stmt.where(sorts[sort].column.isnot(None))
+
+
+def ordered(stmt, sorts, sort):
+    """Order a sortable() stmt by (sort column, id), the order of its keyset index"""
+    key = sorts[sort]
+    if key.descending:
+        return stmt.order_by(key.column.desc(), Deal.id.desc())
+    return stmt.order_by(key.column.asc(), Deal.id.asc())
+
+
+def page_statement(stmt, sorts, sort, after_cursor=False):
+    """
+    A sortable() column select ordered by (sort column, id), with the keyset
+    position added as CURSOR_VALUE / CURSOR_ID and its window left as bind
+    parameters: offset and limit, plus after_value / after_id with after_cursor.
+
+    The statement holds no values, so one instance serves every page of a
+    query shape (see app/deal_query.py); page_params supplies the values.
+    """
+    key = sorts[sort]
+    if after_cursor:
+        position = tuple_(key.column, Deal.id)
+        after = tuple_(bindparam("after_value", type_=key.column.type), bindparam("after_id", type_=Integer))
+        stmt = stmt.where(position < after if key.descending else position > after)
+
+    return ordered(stmt, sorts, sort).add_columns(
+        key.column.label(CURSOR_VALUE), Deal.id.label(CURSOR_ID)
+    ).offset(bindparam("offset", type_=Integer)).limit(bindparam("limit", type_=Integer))
+
+
+def page_params(sorts, sort, cursor=None, skip=0, limit=20):
+    """
+    Bind values of a page_statement for the page after cursor, or at skip
+    without one (for clients still paging by offset). One extra row is
+    fetched to tell whether there is a next page.
+    """
+    if not cursor:
+        return {"offset": skip, "limit": limit + 1}
+    value, row_id = decode_cursor(cursor, sort, sorts)
+    return {"offset": 0, "limit": limit + 1, "after_value": value, "after_id": row_id}
+
+
+async def fetch_page(db, stmt, params, sorts, sort, cursor=None, skip=0, limit=20):
+    """
+    One page of a page_statement(stmt, after_cursor=bool(cursor)), as dicts
+    keyed by the column labels, plus the cursor for the next page (None on
+    the last page). params are the statement's filter values.
+    """
+    params = {**params, **page_params(sorts, sort, cursor, skip, limit)}
+    rows = (await db.execute(stmt, params)).mappings().all()
+    deals = []
+    for row in rows[:limit]:
+        deal = dict(row)
+        del deal[CURSOR_VALUE], deal[CURSOR_ID]
+        deals.append(deal)
+
+    if len(rows) <= limit:
+        return deals, None
+    last = rows[limit - 1]
+    return deals, encode_cursor(sort, last[CURSOR_VALUE], last[CURSOR_ID])
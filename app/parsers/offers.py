@@ -0,0 +1,130 @@
+import re
+from typing import NamedTuple, Optional
+
+# offer_type values stored in the deals table
+BUY_X_GET_Y = 'buy_x_get_y'              # 1+1, 2+1 ...
+NTH_ITEM_DISCOUNT = 'nth_item_discount'  # second item at -50%
+PERCENT_OFF = 'percent_off'              # -20%
+OTHER = 'other'                          # any other promotion text
+
+OFFER_TYPES = (BUY_X_GET_Y, NTH_ITEM_DISCOUNT, PERCENT_OFF, OTHER)
+
+_ORDINAL = r'(?:ο|η|nd|rd|th|st)'
+_ITEM = r'(?:\s*(?:τεμάχιο|τεμ\.?|προϊόν|item|product))?'
+_WORD_NTH = {'δεύτερο': 2, 'δευτερο': 2, 'second': 2, 'τρίτο': 3, 'τριτο': 3, 'third': 3}
+
+# "1+1", "Offer 2+1", "2+1 ΔΩΡΟ"
+BUY_GET_RE = re.compile(r'(\d+)\s*\+\s*(\d+)')
+# "3 για 2", "3 στην τιμή των 2", "3 for 2" (not "2 για 5€", a price)
+PAY_FOR_RE = re.compile(
+    r'(?<![\d.,])(\d+)\s*(?:για|for|στην\s+τιμή\s+των|at\s+the\s+price\s+of)\s*(\d+)(?![\d.,]|\s*(?:€|ευρ|eur))',
+    re.IGNORECASE
+)
+# "2ο -50%", "2nd item at 50%", "2ο τεμάχιο στη μισή τιμή"
+NTH_FIRST_RE = re.compile(r'(?<![\d.,])(\d)\s*' + _ORDINAL + _ITEM + r'\s*(?:στο|στη|στην|at|με|σε)?\s*-?\s*(\d+(?:[.,]\d+)?)\s*%', re.IGNORECASE)
+# "-50% στο 2ο", "50% off the 2nd"
+NTH_LAST_RE = re.compile(r'-?(\d+(?:[.,]\d+)?)\s*%[^\d%]{0,20}?(\d)\s*' + _ORDINAL + r'(?![\d%])', re.IGNORECASE)
+# "το δεύτερο -50%", "second at half price"
+NTH_WORD_RE = re.compile(r'(' + '|'.join(_WORD_NTH) + r')\D{0,30}?(?:(\d+(?:[.,]\d+)?)\s*%|(μισή|half))', re.IGNORECASE)
+HALF_PRICE_RE = re.compile(r'(?<![\d.,])(\d)\s*' + _ORDINAL + _ITEM + r'\D{0,20}?(?:μισή|half)', re.IGNORECASE)
+PERCENT_RE = re.compile(r'-?\s*(\d+(?:[.,]\d+)?)\s*%')
+
+
+class ParsedOffer(NamedTuple):
+    offer_type: Optional[str] = None
+    buy_qty: Optional[int] = None
+    free_qty: Optional[int] = None
+    nth_item: Optional[int] = None
+    nth_discount: Optional[float] = None
+    percent: Optional[float] = None
+
+
+def _number(text):
+    return float(text.replace(',', '.'))
+
+
+def _nth(nth_item, discount):
+    if nth_item < 2 or not 0 < discount <= 100:
+        return None
+    return ParsedOffer(NTH_ITEM_DISCOUNT, nth_item=nth_item, nth_discount=discount)
+
+
+def parse_offer(text) -> ParsedOffer:
+    """Structured form of a promotion badge text"""
+    if not text or not text.strip():
+        return ParsedOffer()
+
+    match = BUY_GET_RE.search(text)
+    if match:
+        buy, free = int(match.group(1)), int(match.group(2))
+        if buy > 0 and free > 0:
+            return ParsedOffer(BUY_X_GET_Y, buy_qty=buy, free_qty=free)
+
+    # Take N, pay for M: buy M, get N - M free
+    match = PAY_FOR_RE.search(text)
+    if match:
+        take, pay = int(match.group(1)), int(match.group(2))
+        if take > pay > 0:
+            return ParsedOffer(BUY_X_GET_Y, buy_qty=pay, free_qty=take - pay)
+
+    for pattern, swap in ((NTH_FIRST_RE, False), (NTH_LAST_RE, True)):
+        match = pattern.search(text)
+        if match:
+            nth, discount = match.groups()
+            if swap:
+                nth, discount = discount, nth
+            offer = _nth(int(nth), _number(discount))
+            if offer:
+                return offer
+
+    match = NTH_WORD_RE.search(text)
+    if match:
+        word, discount, half = match.groups()
+        offer = _nth(_WORD_NTH[word.lower()], _number(discount) if discount else 50.0)
+        if offer:
+            return offer
+
+    match = HALF_PRICE_RE.search(text)
+    if match:
+        offer = _nth(int(match.group(1)), 50.0)
+        if offer:
+            return offer
+
+    match = PERCENT_RE.search(text)
+    if match:
+        percent = _number(match.group(1))
+        if 0 < percent < 100:
+            return ParsedOffer(PERCENT_OFF, percent=percent)
+
+    return ParsedOffer(OTHER)
+
+
+def offer_columns(text, current_price, original_price=None):
+    """deals table offer columns, with the effective per-item price when buying the whole bundle"""
+    offer = parse_offer(text)
+
+    effective_price = current_price
+    if current_price:
+        if offer.offer_type == BUY_X_GET_Y:
+            effective_price = current_price * offer.buy_qty / (offer.buy_qty + offer.free_qty)
+        elif offer.offer_type == NTH_ITEM_DISCOUNT:
+            effective_price = current_price * (offer.nth_item - offer.nth_discount / 100) / offer.nth_item
+        effective_price = round(effective_price, 2)
+
+    # Compared with the regular (pre-promotion) price where the site shows one
+    reference_price = original_price or current_price
+    effective_discount = None
+    if effective_price and reference_price and reference_price > effective_price:
+        effective_discount = round((reference_price - effective_price) / reference_price * 100, 1)
+    elif offer.offer_type == PERCENT_OFF and not original_price:
+        effective_discount = offer.percent
+
+    return {
+        'offer_type': offer.offer_type,
+        'offer_buy_qty': offer.buy_qty,
+        'offer_free_qty': offer.free_qty,
+        'offer_nth_item': offer.nth_item,
+        'offer_nth_discount': offer.nth_discount,
+        'effective_price': effective_price,
+        'effective_discount': effective_discount,
+    }
@@ -0,0 +1,92 @@
+import re
+from typing import NamedTuple, Optional
+
+# Unit spellings seen on the Greek supermarket sites, mapped to
+# (base unit, factor to convert into the base unit)
+UNIT_ALIASES = {
+    # mass -> kg
+    'g': ('kg', 0.001), 'gr': ('kg', 0.001), 'grs': ('kg', 0.001), 'γρ': ('kg', 0.001),
+    'γρμ': ('kg', 0.001), 'γραμ': ('kg', 0.001), 'γραμμάρια': ('kg', 0.001),
+    'kg': ('kg', 1.0), 'kgr': ('kg', 1.0), 'κιλ': ('kg', 1.0), 'κιλό': ('kg', 1.0),
+    'κιλά': ('kg', 1.0),
+    # volume -> l
+    'ml': ('l', 0.001), 'μλ': ('l', 0.001), 'cl': ('l', 0.01),
+    'l': ('l', 1.0), 'lt': ('l', 1.0), 'ltr': ('l', 1.0), 'λ': ('l', 1.0), 'λτ': ('l', 1.0),
+    'λιτ': ('l', 1.0), 'λίτρο': ('l', 1.0), 'λίτρα': ('l', 1.0),
+    # count -> piece
+    'τεμ': ('piece', 1.0), 'τεμάχιο': ('piece', 1.0), 'τεμάχια': ('piece', 1.0),
+    'τμχ': ('piece', 1.0), 'pcs': ('piece', 1.0), 'pc': ('piece', 1.0), 'τεμαχια': ('piece', 1.0),
+}
+
+UNITS = ('kg', 'l', 'piece')
+
+_NUMBER = r'(\d+(?:[.,]\d+)?)'
+# Longest spellings first so 'kg' wins over 'g' and 'ml' over 'l'
+_UNIT = '(' + '|'.join(sorted((re.escape(u) for u in UNIT_ALIASES), key=len, reverse=True)) + r')\.?'
+# A unit must not run into another letter ("5 lemons" is not 5 litres)
+_END = r'(?![a-zα-ωά-ώ])'
+_TIMES = r'\s*[x×χ*]\s*'
+
+# 6x330ml / 6 x 0,33 λ
+MULTIPACK_RE = re.compile(r'(\d+)' + _TIMES + _NUMBER + r'\s*' + _UNIT + _END, re.IGNORECASE)
+# 330ml x 6
+MULTIPACK_SUFFIX_RE = re.compile(_NUMBER + r'\s*' + _UNIT + _END + _TIMES + r'(\d+)(?!\s*[.,]?\d)', re.IGNORECASE)
+# 600-800γρ (variable weight, priced on the midpoint)
+RANGE_RE = re.compile(_NUMBER + r'\s*[-–]\s*' + _NUMBER + r'\s*' + _UNIT + _END, re.IGNORECASE)
+# 500gr / 1,5 λίτρα / 10 τεμ.
+SIZE_RE = re.compile(_NUMBER + r'\s*' + _UNIT + _END, re.IGNORECASE)
+
+
+class PackageSize(NamedTuple):
+    quantity: float
+    unit: str
+
+
+def _number(text):
+    return float(text.replace(',', '.'))
+
+
+def _size(amount, alias, count=1):
+    unit, factor = UNIT_ALIASES[alias.lower()]
+    quantity = amount * factor * count
+    if quantity <= 0:
+        return None
+    return PackageSize(round(quantity, 6), unit)
+
+
+def parse_package_size(text) -> Optional[PackageSize]:
+    """Package size of a product, in kg, l or pieces, from a title or specs string"""
+    if not text:
+        return None
+
+    match = MULTIPACK_RE.search(text)
+    if match:
+        count, amount, alias = match.groups()
+        return _size(_number(amount), alias, int(count))
+
+    match = MULTIPACK_SUFFIX_RE.search(text)
+    if match:
+        amount, alias, count = match.groups()
+        return _size(_number(amount), alias, int(count))
+
+    match = RANGE_RE.search(text)
+    if match:
+        low, high, alias = match.groups()
+        return _size((_number(low) + _number(high)) / 2, alias)
+
+    match = SIZE_RE.search(text)
+    if match:
+        amount, alias = match.groups()
+        return _size(_number(amount), alias)
+
+    return None
+
+
+def unit_pricing(price, *texts):
+    """(unit_quantity, unit, unit_price) for a price and the texts describing the product"""
+    for text in texts:
+        size = parse_package_size(text)
+        if size:
+            unit_price = round(price / size.quantity, 2) if price else None
+            return size.quantity, size.unit, unit_price
+    return None, None, None
@@ -0,0 +1,57 @@
+from app.models import Deal
+
+# Response fields of the listings and the columns behind them. Listings select
+# only the fields they return, labelled with their keys, so rows come back
+# ready to serialise; url is Deal.redirect_url built in SQL
+DEAL_FIELDS = {
+    "id": Deal.id,
+    "title": Deal.title,
+    "price": Deal.current_price,
+    "original_price": Deal.original_price,
+    "discount": Deal.discount_percentage,
+    "source": Deal.source,
+    "category": Deal.category,
+    "image": Deal.image_url,
+    "url": Deal.redirect_url,
+    "is_active": Deal.is_active,
+    "scraped_at": Deal.scraped_at,
+    "created_at": Deal.created_at,
+    "updated_at": Deal.updated_at,
+    "offer": Deal.offer,
+    "unit_quantity": Deal.unit_quantity,
+    "unit": Deal.unit,
+    "unit_price": Deal.unit_price,
+    "offer_type": Deal.offer_type,
+    "offer_buy_qty": Deal.offer_buy_qty,
+    "offer_free_qty": Deal.offer_free_qty,
+    "offer_nth_item": Deal.offer_nth_item,
+    "offer_nth_discount": Deal.offer_nth_discount,
+    "effective_price": Deal.effective_price,
+    "effective_discount": Deal.effective_discount,
+}
+
+LISTING_FIELDS = (
+    "id", "title", "price", "original_price", "discount", "source", "category", "image", "url",
+    "is_active", "scraped_at", "created_at", "updated_at", "offer", "unit_quantity", "unit", "unit_price",
+)
+SOURCE_LISTING_FIELDS = (
+    "id", "title", "price", "original_price", "discount", "category", "image", "url", "is_active", "scraped_at", "offer",
+)
+MULTI_SOURCE_LISTING_FIELDS = (
+    "id", "title", "price", "original_price", "discount", "source", "category", "image", "url",
+    "is_active", "scraped_at", "offer",
+)
+OFFER_LISTING_FIELDS = MULTI_SOURCE_LISTING_FIELDS + (
+    "offer_type", "offer_buy_qty", "offer_free_qty", "offer_nth_item", "offer_nth_discount",
+    "effective_price", "effective_discount",
+)
+SEARCH_FIELDS = (
+    "id", "title", "price", "original_price", "discount", "source", "category", "image", "url",
+    "scraped_at", "offer", "unit_price", "unit",
+)
+SIMPLE_LISTING_FIELDS = ("id", "title", "price", "discount", "source", "image", "url", "offer")
+
+
+def deal_columns(fields):
+    """Columns for select(), labelled with their response keys"""
+    return [DEAL_FIELDS[field].label(field) for field in fields]
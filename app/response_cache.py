@@ -0,0 +1,244 @@
+import asyncio
+import functools
+import hashlib
+import inspect
+import json
+import logging
+from collections import OrderedDict
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import NamedTuple, Optional
+
+import orjson
+from fastapi import Request, Response
+from fastapi.responses import ORJSONResponse
+from app import database
+from app.generation import generation_state
+from app.config import settings
+
+logger = logging.getLogger("deals-api")
+
+
+class CacheEntry(NamedTuple):
+    generation: int
+    changed_at: Optional[str]  # ISO time the generation started, for Last-Modified
+    body: bytes  # the rendered JSON response
+
+
+class ResponseCache:
+    """
+    Endpoint responses keyed by endpoint and parameters, tagged with the data generation.
+
+    Two tiers: an in-process LRU and, with REDIS_URL, Redis shared by all workers.
+    An entry from an older generation is stale: it is still served (up to
+    stale_generations behind) while one background task recomputes it.
+    Concurrent misses for the same key share one computation.
+    """
+
+    def __init__(self, size, redis_url=None, ttl=21600, stale_generations=1):
+        self.size = size
+        self.ttl = ttl
+        self.stale_generations = stale_generations
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._redis = None
+        if redis_url:
+            import redis.asyncio as aioredis
+            self._redis = aioredis.from_url(redis_url)
+            logger.info("✓ Response cache using Redis")
+
+    @staticmethod
+    def make_key(name, params):
+        """name?sorted params, the normalised identity of a request"""
+        # Repeated query params are sets: ?sources=b&sources=a&sources=a is ?sources=a&sources=b
+        params = {
+            param: sorted(set(value), key=str) if isinstance(value, (list, tuple)) else value
+            for param, value in params.items()
+        }
+        return f"{name}?{json.dumps(sorted(params.items()), default=str, separators=(',', ':'))}"
+
+    @staticmethod
+    def _redis_key(key):
+        return "deals:response:" + hashlib.sha1(key.encode()).hexdigest()
+
+    async def get(self, key):
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            return entry
+
+        if self._redis is not None:
+            try:
+                raw = await self._redis.get(self._redis_key(key))
+            except Exception as e:
+                logger.warning(f"⚠ Redis read failed, using the local cache only: {e}")
+                return None
+            if raw:
+                generation, changed_at, body = json.loads(raw)
+                entry = CacheEntry(generation, changed_at, body.encode())
+                self._remember(key, entry)
+                return entry
+        return None
+
+    async def set(self, key, entry):
+        self._remember(key, entry)
+        if self._redis is not None:
+            try:
+                raw = json.dumps([entry.generation, entry.changed_at, entry.body.decode()])
+                await self._redis.set(self._redis_key(key), raw, ex=self.ttl)
+            except Exception as e:
+                logger.warning(f"⚠ Redis write failed: {e}")
+
+    def _remember(self, key, entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.size:
+            self._entries.popitem(last=False)
+
+    def _load(self, key, generation, changed_at, compute, background=False):
+        """Task computing key for generation, shared by every caller of that generation until it finishes"""
+        # Keyed by generation too: a request that arrives after an ingest must not
+        # join (and be answered by) a computation that started before it
+        inflight_key = (key, generation)
+        task = self._inflight.get(inflight_key)
+        if task is None:
+            async def run():
+                try:
+                    entry = CacheEntry(generation, changed_at, render(await compute()))
+                    # An older generation finishing last does not replace a newer entry
+                    current = self._entries.get(key)
+                    if current is None or current.generation <= generation:
+                        await self.set(key, entry)
+                    return entry
+                finally:
+                    self._inflight.pop(inflight_key, None)
+
+            task = asyncio.ensure_future(run())
+            if background:
+                # Nobody awaits a background refresh, so its errors are only logged
+                task.add_done_callback(_log_refresh_error)
+            self._inflight[inflight_key] = task
+        return task
+
+    async def fetch(self, key, generation, changed_at, compute):
+        """Cached entry for key, computing it at most once per generation"""
+        entry = await self.get(key)
+        if entry is not None and entry.generation >= generation:
+            return entry
+
+        if entry is not None and generation - entry.generation <= self.stale_generations:
+            self._load(key, generation, changed_at, compute, background=True)
+            return entry
+
+        # shield: a client disconnecting must not cancel the query other callers wait on
+        return await asyncio.shield(self._load(key, generation, changed_at, compute))
+
+
+def _log_refresh_error(task):
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning(f"⚠ Background cache refresh failed: {task.exception()}")
+
+
+response_cache = ResponseCache(
+    size=settings.CACHE_CONFIG["response_cache_size"],
+    redis_url=settings.REDIS_URL,
+    ttl=settings.CACHE_CONFIG["response_ttl"],
+    stale_generations=settings.CACHE_CONFIG["stale_generations"],
+)
+
+
+def render(payload):
+    """JSON body of an endpoint's return value (orjson handles datetimes natively)"""
+    return orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS)
+
+
+def etag(key, generation):
+    """Weak validator of a response: the query and the data generation it was built from"""
+    digest = hashlib.sha1(key.encode()).hexdigest()[:20]
+    return f'W/"{generation}-{digest}"'
+
+
+def http_date(changed_at):
+    if isinstance(changed_at, str):
+        changed_at = datetime.fromisoformat(changed_at)
+    if changed_at.tzinfo is None:
+        changed_at = changed_at.replace(tzinfo=timezone.utc)
+    return format_datetime(changed_at.astimezone(timezone.utc), usegmt=True)
+
+
+def not_modified(request, tag, last_modified):
+    """Whether the client's copy is current (If-None-Match wins over If-Modified-Since)"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return if_none_match.strip() == "*" or tag in [t.strip() for t in if_none_match.split(",")]
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified:
+        try:
+            return parsedate_to_datetime(last_modified) <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+# Browsers and proxies reuse a listing for max_age, then revalidate it with the ETag
+PUBLIC_CACHE_CONTROL = (
+    f"public, max-age={settings.CACHE_CONFIG['max_age']}, "
+    f"stale-while-revalidate={settings.CACHE_CONFIG['stale_while_revalidate']}"
+)
+
+
+def cached_response(store=True, cache_control=PUBLIC_CACHE_CONTROL):
+    """
+    HTTP caching for an async read endpoint that takes its session as db.
+
+    Responses carry an ETag from the query and the data generation, and
+    Last-Modified from when that generation started. A conditional request
+    for the current generation gets a 304 before any query or serialisation
+    (the generation itself is cached per worker, see app/generation.py).
+
+    With store, responses are also kept in response_cache. The cached query
+    runs in its own session, since it may outlive the request that started it.
+    """
+    def decorate(endpoint):
+        signature = inspect.signature(endpoint)
+        extra = [inspect.Parameter("request", inspect.Parameter.KEYWORD_ONLY, annotation=Request)]
+
+        @functools.wraps(endpoint)
+        async def wrapper(*, request: Request, db, **params):
+            generation, changed_at = await generation_state(db)
+            key = ResponseCache.make_key(endpoint.__name__, params)
+
+            headers = {"ETag": etag(key, generation), "Cache-Control": cache_control}
+            if changed_at:
+                headers["Last-Modified"] = http_date(changed_at)
+            if not_modified(request, headers["ETag"], headers.get("Last-Modified")):
+                return Response(status_code=304, headers=headers)
+
+            if store and settings.CACHE_CONFIG["response_cache"]:
+                async def compute():
+                    async with database.AsyncSessionLocal() as own_db:
+                        return await endpoint(db=own_db, **params)
+
+                entry = await response_cache.fetch(
+                    key, generation, changed_at.isoformat() if changed_at else None, compute
+                )
+                # A stale entry is labelled with its own generation
+                headers["ETag"] = etag(key, entry.generation)
+                if entry.changed_at:
+                    headers["Last-Modified"] = http_date(entry.changed_at)
+                else:
+                    headers.pop("Last-Modified", None)
+                if entry.generation != generation and not_modified(
+                    request, headers["ETag"], headers.get("Last-Modified")
+                ):
+                    return Response(status_code=304, headers=headers)
+                # Already rendered: returned as is, without FastAPI's jsonable_encoder pass
+                return Response(content=entry.body, media_type="application/json", headers=headers)
+
+            return ORJSONResponse(await endpoint(db=db, **params), headers=headers)
+
+        wrapper.__signature__ = signature.replace(parameters=list(signature.parameters.values()) + extra)
+        return wrapper
+
+    return decorate
@@ -4,12 +4,13 @@ import time
 import logging
 from datetime import datetime
 from urllib.parse import urljoin
-from bs4 import BeautifulSoup
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 from selenium.webdriver.common.by import By
 from .base_scraper import BaseScraper
+from .deal_record import DealRecord
+from .page_classifier import PageClassifier
 import random
 
 logger = logging.getLogger("deals-api")
@@ -17,6 +18,46 @@ logger = logging.getLogger("deals-api")
 class ABScraper(BaseScraper):
     """Scraper for ab.gr website"""
     
+    JS_EXTRACTOR = """
+    function priceFields(el) {
+        if (!el) return null;
+        var euros = null, cents = null;
+        if (el.querySelector('.sc-dqia0p-7')) {
+            var e = el.querySelector('.sc-dqia0p-8, .hSCnvJ'), c = el.querySelector('.sc-dqia0p-9, .ibBxTt, sup');
+            if (e && c) { euros = __text(e); cents = __text(c); }
+        }
+        return {aria_label: el.getAttribute('aria-label') || '', euros: euros, cents: cents, text: __text(el)};
+    }
+    function oldPriceFields(el) {
+        if (!el) return null;
+        return {
+            aria_label: el.getAttribute('aria-label') || '',
+            text: __text(el),
+            spans: Array.prototype.map.call(el.querySelectorAll('.sc-dqia0p-20, .ETpLg, span'), __text)
+        };
+    }
+    var cards = Array.prototype.map.call(document.querySelectorAll('[data-testid="product-block"]'), function (block) {
+        var q = function (id) { return block.querySelector('[data-testid="' + id + '"]'); };
+        var link = q('product-block-name-link');
+        return {
+            product_id: __text(q('product-id')),
+            position: __text(q('search-position')),
+            brand: __text(q('product-brand')),
+            name: __text(q('product-name')),
+            link_href: link ? (link.getAttribute('href') || '') : null,
+            weight: __text(q('product-block-supplementary-price')),
+            offer: __text(q('tag-promo')),
+            price: priceFields(q('product-block-price')),
+            old_price: oldPriceFields(q('product-block-old-price')),
+            image_src: __attr(q('product-block-image'), 'src')
+        };
+    });
+    return {cards: cards, state: __pageState(cards.length, null)};
+    """
+    
+    PAGE_CLASSIFIER = PageClassifier('[data-testid="product-block"]')
+    MIN_PAGE_SIZE = 10000
+    
     def __init__(self, headless=True):
         super().__init__(headless=headless, scraper_name="ABScraper")
         self.base_url = "https://www.ab.gr"
@@ -34,6 +75,7 @@ class ABScraper(BaseScraper):
         logger.info(f"{self.scraper_name}: Starting to scrape deals")
         logger.info(f"{self.scraper_name}: Max pages: {max_pages if max_pages else 'No limit'}")
         logger.info(f"{self.scraper_name}: Max total deals: {max_total_deals if max_total_deals else 'No limit'}")
+        self.start_run()
         return self.scrape_with_pagination(max_pages, max_total_deals)
     
     def scrape_with_pagination(self, max_pages=None, max_total_deals=None):
@@ -45,6 +87,78 @@ class ABScraper(BaseScraper):
         consecutive_empty_pages = 0
         MAX_CONSECUTIVE_EMPTY = 2
         MAX_SAFETY_PAGES = 50
+        stopped = False
+        pipeline = self.create_parse_pipeline()
+        
+        def collect(page_number, result):
+            """Merge a parsed page (in page order), returns True when scraping should stop"""
+            nonlocal consecutive_empty_pages
+            
+            verdict, page_deals = result if result else (None, [])
+            self.check_no_results_marker(verdict, page_number)
+            
+            if verdict is not None:
+                # Check if page is valid
+                if self._is_end_of_pages(verdict, page_number):
+                    logger.info(f"✓ {self.scraper_name}: Reached end of pages at page {page_number}")
+                    if self.is_end_of_listing(verdict):
+                        self.mark_run_complete()
+                    return True
+                
+                if verdict.html_length < self.MIN_PAGE_SIZE:
+                    logger.warning(f"⚠ {self.scraper_name}: Page {page_number} source too small")
+                    page_deals = []
+                
+                # Extract pagination info on first page
+                elif page_number == 1:
+                    self._extract_pagination_info(verdict)
+                    # Log estimated progress after first page
+                    if self.total_products > 0:
+                        estimated_pages = (self.total_products + self.products_per_page - 1) // self.products_per_page
+                        logger.info(f"📊 {self.scraper_name}: Estimated total: {self.total_products} products "
+                                  f"across {estimated_pages} pages")
+            
+            if page_deals:
+                all_deals.extend(page_deals)
+                logger.info(f"✅ {self.scraper_name}: Page {page_number}: Added {len(page_deals)} deals "
+                          f"(Total: {len(all_deals)}/{self.total_products if self.total_products > 0 else '?'})")
+                
+                # Calculate progress percentage if we have total products
+                if self.total_products > 0:
+                    progress = (len(all_deals) / self.total_products) * 100
+                    logger.info(f"📈 {self.scraper_name}: Progress: {progress:.1f}% complete")
+                
+                # Reset consecutive empty counter
+                consecutive_empty_pages = 0
+                
+                if max_total_deals and len(all_deals) >= max_total_deals:
+                    logger.info(f"✓ {self.scraper_name}: Reached max deals limit: {max_total_deals}")
+                    del all_deals[max_total_deals:]
+                    return True
+                
+                # Check if we've scraped all products
+                if self.total_products > 0 and len(all_deals) >= self.total_products:
+                    logger.info(f"✓ {self.scraper_name}: Scraped all {self.total_products} products")
+                    self.mark_run_complete()
+                    return True
+                    
+            else:
+                logger.warning(f"⚠ {self.scraper_name}: No deals found on page {page_number}")
+                self.skip_page(page_number, "no deals")
+                consecutive_empty_pages += 1
+                if consecutive_empty_pages >= MAX_CONSECUTIVE_EMPTY:
+                    logger.info(f"{self.scraper_name}: {MAX_CONSECUTIVE_EMPTY} consecutive empty pages, stopping")
+                    return True
+            
+            # Calculate if we should continue based on total products
+            if self.total_products > 0:
+                estimated_pages = (self.total_products + self.products_per_page - 1) // self.products_per_page
+                if page_number >= estimated_pages:
+                    logger.info(f"✓ {self.scraper_name}: Reached estimated last page ({estimated_pages})")
+                    self.mark_run_complete()
+                    return True
+            
+            return False
         
         try:
             while True:
@@ -87,6 +201,7 @@ class ABScraper(BaseScraper):
                     
                 except TimeoutException as e:
                     logger.error(f"⚠ {self.scraper_name}: Timeout loading page {current_page}: {e}")
+                    self.skip_page(current_page, "timeout")
                     consecutive_empty_pages += 1
                     if consecutive_empty_pages >= MAX_CONSECUTIVE_EMPTY:
                         break
@@ -94,85 +209,41 @@ class ABScraper(BaseScraper):
                     continue
                 except Exception as e:
                     logger.error(f"⚠ {self.scraper_name}: Failed to load page {current_page}: {e}")
+                    self.skip_page(current_page, "failed to load")
                     consecutive_empty_pages += 1
                     if consecutive_empty_pages >= MAX_CONSECUTIVE_EMPTY:
                         break
                     current_page += 1
                     continue
                 
-                # Get page source
-                page_source = self.driver.page_source
-                
-                # Check if page is valid
-                if self._is_end_of_pages(page_source, current_page):
-                    logger.info(f"✓ {self.scraper_name}: Reached end of pages at page {current_page}")
-                    break
-                
-                if len(page_source) < 5000:
-                    logger.warning(f"⚠ {self.scraper_name}: Page {current_page} source too small")
-                    consecutive_empty_pages += 1
-                    if consecutive_empty_pages >= MAX_CONSECUTIVE_EMPTY:
-                        break
-                    current_page += 1
-                    continue
-                
-                # Extract pagination info on first page
-                if current_page == 1:
-                    self._extract_pagination_info(page_source)
-                    # Log estimated progress after first page
-                    if self.total_products > 0:
-                        estimated_pages = (self.total_products + self.products_per_page - 1) // self.products_per_page
-                        logger.info(f"📊 {self.scraper_name}: Estimated total: {self.total_products} products "
-                                  f"across {estimated_pages} pages")
-                
-                # Parse current page
-                logger.debug(f"{self.scraper_name}: Parsing page {current_page} content...")
-                page_deals = self.parse_current_page()
-                
-                if page_deals:
-                    all_deals.extend(page_deals)
-                    logger.info(f"✅ {self.scraper_name}: Page {current_page}: Added {len(page_deals)} deals "
-                              f"(Total: {len(all_deals)}/{self.total_products if self.total_products > 0 else '?'})")
-                    
-                    # Calculate progress percentage if we have total products
-                    if self.total_products > 0:
-                        progress = (len(all_deals) / self.total_products) * 100
-                        logger.info(f"📈 {self.scraper_name}: Progress: {progress:.1f}% complete")
-                    
-                    # Reset consecutive empty counter
-                    consecutive_empty_pages = 0
-                    
-                    if max_total_deals and len(all_deals) >= max_total_deals:
-                        logger.info(f"✓ {self.scraper_name}: Reached max deals limit: {max_total_deals}")
-                        all_deals = all_deals[:max_total_deals]
-                        break
-                    
-                    # Check if we've scraped all products
-                    if self.total_products > 0 and len(all_deals) >= self.total_products:
-                        logger.info(f"✓ {self.scraper_name}: Scraped all {self.total_products} products")
-                        break
-                        
-                else:
-                    logger.warning(f"⚠ {self.scraper_name}: No deals found on page {current_page}")
-                    consecutive_empty_pages += 1
-                    if consecutive_empty_pages >= MAX_CONSECUTIVE_EMPTY:
-                        logger.info(f"{self.scraper_name}: {MAX_CONSECUTIVE_EMPTY} consecutive empty pages, stopping")
-                        break
-                
-                # Calculate if we should continue based on total products
-                if self.total_products > 0:
-                    estimated_pages = (self.total_products + self.products_per_page - 1) // self.products_per_page
-                    if current_page >= estimated_pages:
-                        logger.info(f"✓ {self.scraper_name}: Reached estimated last page ({estimated_pages})")
+                # Hand the page to the parser pool and keep navigating; the
+                # page is classified and parsed in one pass, and results come
+                # back in page order
+                logger.debug(f"{self.scraper_name}: Queueing page {current_page} for parsing...")
+                pipeline.submit(current_page, self.take_snapshot())
+                for page_number, result in pipeline.completed():
+                    if collect(page_number, result):
+                        stopped = True
                         break
+                if stopped:
+                    break
                 
                 # Page delay before next page
                 current_page += 1
+                estimated_pages = (self.total_products + self.products_per_page - 1) // self.products_per_page
                 if current_page <= (max_pages if max_pages else estimated_pages if self.total_products > 0 else MAX_SAFETY_PAGES):
                     delay = self.page_delay + random.uniform(1, 3)
                     logger.debug(f"{self.scraper_name}: Waiting {delay:.1f} seconds before next page...")
                     time.sleep(delay)
             
+            # Pages fetched past a stop condition are discarded, the rest are awaited
+            if stopped:
+                pipeline.cancel()
+            else:
+                for page_number, result in pipeline.completed(drain=True):
+                    if collect(page_number, result):
+                        break
+            
             total_time = datetime.now() - self.start_time
             logger.info(f"✅ {self.scraper_name}: Scraping completed - {len(all_deals)} deals collected in "
                        f"{total_time.seconds // 60}m {total_time.seconds % 60}s")
@@ -182,8 +253,10 @@ class ABScraper(BaseScraper):
             
         except Exception as e:
             logger.error(f"✗ {self.scraper_name}: Scraping failed: {e}", exc_info=True)
+            self.run_complete = False
             return all_deals
         finally:
+            pipeline.close()
             self.close()
     
     def _scroll_for_content(self):
@@ -208,65 +281,38 @@ class ABScraper(BaseScraper):
         except Exception as e:
             logger.debug(f"{self.scraper_name}: Scroll error: {e}")
     
-    def _is_end_of_pages(self, page_source, current_page):
+    def _is_end_of_pages(self, verdict, current_page):
         """Check if we've reached the end of pagination"""
-        soup = BeautifulSoup(page_source, 'html.parser')
-        
-        # Check 1: Look for no products message
-        no_products_keywords = ['δεν βρέθηκαν προϊόντα', 'no products found', 'κανένα αποτέλεσμα']
-        page_text = soup.get_text().lower()
-        if any(keyword in page_text for keyword in no_products_keywords):
-            logger.info(f"{self.scraper_name}: Found 'no products' message on page {current_page}")
+        # Check 1: Bot wall instead of a listing
+        if verdict.blocked:
+            logger.warning(f"⚠ {self.scraper_name}: Page {current_page} looks like a bot check")
             return True
         
-        # Check 2: Check if there are no product blocks
-        product_blocks = soup.select('[data-testid="product-block"]')
-        if not product_blocks:
+        # Check 2: Check if there are no product blocks (a 'no products' message
+        # next to product blocks does not end the listing)
+        if not verdict.card_count:
             logger.info(f"{self.scraper_name}: No product blocks found on page {current_page}")
             return True
         
         # Check 3: Look for pagination indicators
-        pagination_elements = soup.select('[data-testid*="pagination"], .pagination, .page-numbers')
-        if pagination_elements:
-            for element in pagination_elements:
-                text = element.get_text()
-                if 'σελίδα' in text.lower() and 'από' in text.lower():
-                    # Extract page numbers if available
-                    match = re.search(r'(\d+)\s*από\s*(\d+)', text)
-                    if match:
-                        current, total = match.groups()
-                        logger.info(f"{self.scraper_name}: Pagination shows {current} of {total} pages")
-                        if int(current) > int(total):
-                            logger.info(f"{self.scraper_name}: Current page {current} exceeds total {total}")
-                            return True
+        if verdict.page_current and verdict.page_total:
+            logger.info(f"{self.scraper_name}: Pagination shows {verdict.page_current} of {verdict.page_total} pages")
+            if verdict.past_last_page:
+                logger.info(f"{self.scraper_name}: Current page {verdict.page_current} exceeds total {verdict.page_total}")
+                return True
         
         return False
     
-    def _extract_pagination_info(self, page_source):
+    def _extract_pagination_info(self, verdict):
         """Extract pagination information from the first page"""
-        soup = BeautifulSoup(page_source, 'html.parser')
-        
-        # Try to find total products count
-        # Look for text like "X προϊόντα" or "X αντικείμενα"
-        page_text = soup.get_text()
-        patterns = [
-            r'(\d+(?:\.?\d+)?)\s+προϊόντα',
-            r'(\d+(?:\.?\d+)?)\s+αντικείμενα',
-            r'(\d+(?:\.?\d+?))\s+results',
-            r'(\d+(?:\.?\d+)?)\s+items'
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, page_text, re.IGNORECASE)
-            if match:
-                self.total_products = int(match.group(1).replace('.', ''))
-                logger.info(f"{self.scraper_name}: Found {self.total_products} total products")
-                break
+        # Total products count from text like "X προϊόντα" or "X αντικείμενα"
+        if verdict.total_products:
+            self.total_products = verdict.total_products
+            logger.info(f"{self.scraper_name}: Found {self.total_products} total products")
         
         # Calculate products per page from first page
-        product_blocks = soup.select('[data-testid="product-block"]')
-        if product_blocks:
-            self.products_per_page = len(product_blocks)
+        if verdict.card_count:
+            self.products_per_page = verdict.card_count
             logger.info(f"{self.scraper_name}: Estimated {self.products_per_page} products per page")
         
         # Estimate total pages
@@ -274,19 +320,8 @@ class ABScraper(BaseScraper):
             estimated_pages = (self.total_products + self.products_per_page - 1) // self.products_per_page
             logger.info(f"{self.scraper_name}: Estimated total pages: {estimated_pages}")
     
-    def parse_current_page(self):
-        """Parse deals from current page"""
-        page_source = self.driver.page_source
-        
-        if len(page_source) < 10000:
-            logger.warning(f"{self.scraper_name}: Page source too small")
-            return []
-        
-        soup = BeautifulSoup(page_source, 'html.parser')
-        
-        # Find all product blocks
-        product_blocks = soup.select('[data-testid="product-block"]')
-        
+    def parse_cards(self, product_blocks):
+        """Parse deals from the product blocks of an ab.gr page"""
         logger.info(f"{self.scraper_name}: Found {len(product_blocks)} product blocks on page")
         
         deals = []
@@ -313,58 +348,107 @@ class ABScraper(BaseScraper):
     def _log_sample_deal(self, deal_data):
         """Log sample deal information for debugging"""
         logger.info(f"📝 {self.scraper_name}: Sample deal:")
-        logger.info(f"  Title: {deal_data.get('title', 'N/A')}")
-        logger.info(f"  Current Price: €{deal_data.get('current_price', 'N/A')}")
-        logger.info(f"  Original Price: €{deal_data.get('original_price', 'N/A')}")
-        logger.info(f"  Discount: {deal_data.get('discount_percentage', 'N/A')}%")
-        logger.info(f"  Offer: {deal_data.get('offer', 'N/A')}")
-        logger.info(f"  Product URL: {deal_data.get('product_url', 'N/A')}")
+        logger.info(f"  Title: {deal_data.title}")
+        logger.info(f"  Current Price: €{deal_data.current_price}")
+        logger.info(f"  Original Price: €{deal_data.original_price}")
+        logger.info(f"  Discount: {deal_data.discount_percentage}%")
+        logger.info(f"  Offer: {deal_data.offer or 'N/A'}")
+        logger.info(f"  Product URL: {deal_data.product_url or 'N/A'}")
     
     def parse_product_block(self, block):
         """Parse individual product block for ab.gr"""
-        from datetime import datetime
+        return self.build_deal(self._block_fields(block))
+    
+    def _block_fields(self, block):
+        """Read the raw product block fields (mirrors JS_EXTRACTOR)"""
+        def text(selector):
+            elem = block.select_one(selector)
+            return elem.get_text(strip=True) if elem else None
+        
+        link_elem = block.select_one('[data-testid="product-block-name-link"]')
+        img_elem = block.select_one('[data-testid="product-block-image"]')
+        
+        return {
+            'product_id': text('[data-testid="product-id"]'),
+            'position': text('[data-testid="search-position"]'),
+            'brand': text('[data-testid="product-brand"]'),
+            'name': text('[data-testid="product-name"]'),
+            'link_href': link_elem.get('href', '') if link_elem else None,
+            'weight': text('[data-testid="product-block-supplementary-price"]'),
+            'offer': text('[data-testid="tag-promo"]'),
+            'price': self._price_fields(block.select_one('[data-testid="product-block-price"]')),
+            'old_price': self._old_price_fields(block.select_one('[data-testid="product-block-old-price"]')),
+            'image_src': img_elem.get('src', '') if img_elem else None,
+        }
+    
+    def _price_fields(self, price_elem):
+        """Raw parts of the current price element"""
+        if not price_elem:
+            return None
         
+        # Euros/cents parts only count when the euro symbol element is there
+        euros = cents = None
+        if price_elem.select_one('.sc-dqia0p-7'):
+            euros_elem = price_elem.select_one('.sc-dqia0p-8, .hSCnvJ')
+            cents_elem = price_elem.select_one('.sc-dqia0p-9, .ibBxTt, sup')
+            if euros_elem and cents_elem:
+                euros = euros_elem.get_text(strip=True)
+                cents = cents_elem.get_text(strip=True)
+        
+        return {
+            'aria_label': price_elem.get('aria-label', ''),
+            'euros': euros,
+            'cents': cents,
+            'text': price_elem.get_text(strip=True),
+        }
+    
+    def _old_price_fields(self, old_price_elem):
+        """Raw parts of the old price element"""
+        if not old_price_elem:
+            return None
+        
+        return {
+            'aria_label': old_price_elem.get('aria-label', ''),
+            'text': old_price_elem.get_text(strip=True),
+            'spans': [span.get_text(strip=True) for span in old_price_elem.select('.sc-dqia0p-20, .ETpLg, span')],
+        }
+    
+    def build_deal(self, fields):
+        """Build an ab.gr deal from raw product block fields"""
         # Extract product ID
-        product_id_elem = block.select_one('[data-testid="product-id"]')
-        product_id = product_id_elem.get_text(strip=True) if product_id_elem else ""
+        product_id = fields.get('product_id') or ""
         
         # Extract SKU/position
-        position_elem = block.select_one('[data-testid="search-position"]')
-        skuid = position_elem.get_text(strip=True) if position_elem else product_id
+        skuid = fields.get('position')
+        if skuid is None:
+            skuid = product_id
         
         # Brand and Name
-        brand_elem = block.select_one('[data-testid="product-brand"]')
-        brand = brand_elem.get_text(strip=True) if brand_elem else ""
-        
-        name_elem = block.select_one('[data-testid="product-name"]')
-        name = name_elem.get_text(strip=True) if name_elem else ""
+        brand = fields.get('brand') or ""
+        name = fields.get('name') or ""
         
         # Combine for title
         title = f"{brand} {name}".strip()
         
         # Category - try to extract from URL or structure
         category = "Uncategorized"
-        link_elem = block.select_one('[data-testid="product-block-name-link"]')
-        if link_elem:
-            href = link_elem.get('href', '')
-            if '/el/eshop/' in href:
-                parts = href.split('/')
-                if len(parts) > 4:
-                    # Try to extract category from URL path
-                    category_part = parts[3] if parts[3] else parts[2]
-                    category = category_part.replace('-', ' ').title()
+        href = fields.get('link_href') or ''
+        if '/el/eshop/' in href:
+            parts = href.split('/')
+            if len(parts) > 4:
+                # Try to extract category from URL path
+                category_part = parts[3] if parts[3] else parts[2]
+                category = category_part.replace('-', ' ').title()
         
         # Weight/size
-        weight_elem = block.select_one('[data-testid="product-block-supplementary-price"]')
-        weight = weight_elem.get_text(strip=True) if weight_elem else ""
+        weight = fields.get('weight') or ""
         
         # PROMOTION/OFFER - This is the key new field
-        promotion_elem = block.select_one('[data-testid="tag-promo"]')
-        offer = promotion_elem.get_text(strip=True) if promotion_elem else ""
+        offer = fields.get('offer') or ""
         
         # Extract prices with the new format handling
-        current_price = self._extract_current_price(block)
-        original_price = self._extract_original_price(block)
+        current_price = self._extract_current_price(fields.get('price'))
+        original_price = self._extract_original_price(fields.get('old_price'))
         
         # Calculate discount if we have both prices
         discount_percentage = None
@@ -379,24 +463,20 @@ class ABScraper(BaseScraper):
         
         # Product URL
         product_url = ""
-        if link_elem:
-            href = link_elem.get('href', '')
-            if href:
-                if not href.startswith('http'):
-                    product_url = urljoin(self.base_url, href)
-                else:
-                    product_url = href
+        if href:
+            if not href.startswith('http'):
+                product_url = urljoin(self.base_url, href)
+            else:
+                product_url = href
         
         # Image URL
-        img_elem = block.select_one('[data-testid="product-block-image"]')
         image_url = ""
-        if img_elem:
-            src = img_elem.get('src', '')
-            if src:
-                if not src.startswith('http'):
-                    image_url = urljoin(self.base_url, src)
-                else:
-                    image_url = src
+        src = fields.get('image_src') or ''
+        if src:
+            if not src.startswith('http'):
+                image_url = urljoin(self.base_url, src)
+            else:
+                image_url = src
         
         # Build specs
         specs_parts = []
@@ -408,39 +488,29 @@ class ABScraper(BaseScraper):
         specs = " | ".join(specs_parts)
         
         # Create final deal object
-        return {
-            'title': title[:500],
-            'category': category[:200],
-            'specs': specs[:500],
-            'original_price': original_price,
-            'current_price': current_price,
-            'discount_percentage': discount_percentage,
-            'rating': 0.0,
-            'review_count': 0,
-            'product_url': product_url,
-            'image_url': image_url,
-            'skuid': skuid,
-            'product_id': product_id,
-            'shop_count': "1",
-            'is_active': True,
-            'scraped_at': datetime.now(),
-            'source': 'ab.gr',
-            'offer': offer[:200] if offer else "",  # NEW FIELD: Promotional offer text
-        }
+        return DealRecord(
+            title=title,
+            category=category,
+            specs=specs,
+            original_price=original_price,
+            current_price=current_price,
+            discount_percentage=discount_percentage,
+            product_url=product_url,
+            image_url=image_url,
+            skuid=skuid,
+            product_id=product_id,
+            source='ab.gr',
+            offer=offer or "",  # Promotional offer text
+        )
     
-    def _extract_current_price(self, block):
-        """Extract current price from product block"""
-        # Look for the main price element - NEW price
-        price_elem = block.select_one('[data-testid="product-block-price"]')
-        if not price_elem:
+    def _extract_current_price(self, price):
+        """Extract current price from the product block price fields"""
+        # No main price element - NEW price
+        if not price:
             return None
         
-        # Log the HTML structure for debugging
-        price_html = str(price_elem)[:200]
-        logger.debug(f"{self.scraper_name}: Price element HTML: {price_html}")
-        
         # Method 1: Extract from aria-label (most reliable)
-        aria_label = price_elem.get('aria-label', '')
+        aria_label = price.get('aria_label') or ''
         logger.debug(f"{self.scraper_name}: Price aria-label: {aria_label}")
         
         if aria_label:
@@ -484,44 +554,31 @@ class ABScraper(BaseScraper):
                         continue
         
         # Method 2: Extract from visible text structure
-        # Look for the price parts in the specific structure
+        # (euros number and cents superscript next to the euro symbol)
         try:
-            # Find euro symbol element
-            euro_elem = price_elem.select_one('.sc-dqia0p-7')
-            if euro_elem:
-                # Find euros number element
-                euros_elem = price_elem.select_one('.sc-dqia0p-8, .hSCnvJ')
-                # Find cents superscript element
-                cents_elem = price_elem.select_one('.sc-dqia0p-9, .ibBxTt, sup')
-                
-                if euros_elem and cents_elem:
-                    euros = float(euros_elem.get_text(strip=True))
-                    cents = float(cents_elem.get_text(strip=True)) / 100
-                    return round(euros + cents, 2)
+            if price.get('euros') is not None and price.get('cents') is not None:
+                euros = float(price['euros'])
+                cents = float(price['cents']) / 100
+                return round(euros + cents, 2)
         except:
             pass
         
         # Method 3: Extract all text and parse
-        text = price_elem.get_text(strip=True)
+        text = price.get('text')
         logger.debug(f"{self.scraper_name}: Price text: {text}")
         if text:
             return self._parse_price_text(text)
         
         return None
     
-    def _extract_original_price(self, block):
-        """Extract original price from product block"""
-        # Look for old price element
-        old_price_elem = block.select_one('[data-testid="product-block-old-price"]')
-        if not old_price_elem:
+    def _extract_original_price(self, old_price):
+        """Extract original price from the product block old price fields"""
+        # No old price element
+        if not old_price:
             return None
         
-        # Log the HTML structure for debugging
-        old_price_html = str(old_price_elem)[:200]
-        logger.debug(f"{self.scraper_name}: Old price element HTML: {old_price_html}")
-        
         # Method 1: Extract from aria-label
-        aria_label = old_price_elem.get('aria-label', '')
+        aria_label = old_price.get('aria_label') or ''
         logger.debug(f"{self.scraper_name}: Old price aria-label: {aria_label}")
         
         if aria_label:
@@ -539,7 +596,7 @@ class ABScraper(BaseScraper):
                     return round(euros + cents, 2)
         
         # Method 2: Extract from visible text
-        text = old_price_elem.get_text(strip=True)
+        text = old_price.get('text')
         logger.debug(f"{self.scraper_name}: Old price text: {text}")
         if text:
             price = self._parse_price_text(text)
@@ -547,9 +604,7 @@ class ABScraper(BaseScraper):
                 return price
         
         # Method 3: Look for span elements with class ETpLg (from your example)
-        span_elements = old_price_elem.select('.sc-dqia0p-20, .ETpLg, span')
-        for span in span_elements:
-            text = span.get_text(strip=True)
+        for text in old_price.get('spans') or []:
             if text and ('€' in text or 'ευρώ' in text.lower()):
                 price = self._parse_price_text(text)
                 if price:
@@ -151,12 +151,63 @@ from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.common.exceptions import TimeoutException
 import re
+import json
+from bs4 import BeautifulSoup
+from .parse_pipeline import ParsePipeline
+from .page_classifier import PageVerdict, NO_RESULTS_MARKERS, BLOCK_MARKERS, CONSENT_IDS
 
 logger = logging.getLogger("deals-api")
 
+# Helpers shared by the per-site in-page extractors. They run inside the
+# browser through execute_script, so only compact JSON crosses the wire.
+PAGE_EXTRACTOR_JS = """
+function __text(el) {
+    // Same result as BeautifulSoup get_text(strip=True)
+    if (!el) return null;
+    var out = '', walker = document.createTreeWalker(el, NodeFilter.SHOW_TEXT);
+    while (walker.nextNode()) out += walker.currentNode.nodeValue.trim();
+    return out;
+}
+function __attr(el, name) {
+    return el ? el.getAttribute(name) : null;
+}
+function __pageState(cardCount, nextSelector) {
+    // Same signals as PageClassifier, see page_classifier.py
+    var body = document.body ? document.body.innerText : '';
+    var lower = body.toLowerCase();
+    var has = function (markers) { return markers.some(function (k) { return lower.indexOf(k) !== -1; }); };
+    var total = body.match(/(\\d+(?:\\.?\\d+)?)\\s+(?:προϊόντα|αντικείμενα|results|items)/i);
+    var pages = lower.match(/σελίδα\\s*(\\d+)\\s*από\\s*(\\d+)/);
+    var next = nextSelector ? document.querySelector(nextSelector) : null;
+    return {
+        card_count: cardCount,
+        html_length: document.documentElement.outerHTML.length,
+        no_results: has(__NO_RESULTS__),
+        total_products: total ? parseInt(total[1].replace('.', ''), 10) : null,
+        page_current: pages ? parseInt(pages[1], 10) : null,
+        page_total: pages ? parseInt(pages[2], 10) : null,
+        next_disabled: next ? /disabled/.test(next.outerHTML) : null,
+        blocked: !cardCount && has(__BLOCKED__),
+        consent: Array.prototype.some.call(document.querySelectorAll('[id]'), function (el) {
+            return __CONSENT_IDS__.indexOf(el.id.toLowerCase()) !== -1;
+        })
+    };
+}
+""".replace("__NO_RESULTS__", json.dumps(NO_RESULTS_MARKERS, ensure_ascii=False)) \
+   .replace("__BLOCKED__", json.dumps(BLOCK_MARKERS)) \
+   .replace("__CONSENT_IDS__", json.dumps(CONSENT_IDS))
+
 class BaseScraper(ABC):
     """Base class for all scrapers"""
     
+    # In-page extractor script (appended to PAGE_EXTRACTOR_JS), None if the site has none.
+    # A scraper that sets it defines build_deal(fields) for the card fields it returns
+    JS_EXTRACTOR = None
+    # Single-pass PageClassifier for the site's listing pages
+    PAGE_CLASSIFIER = None
+    # Pages shorter than this (in HTML characters) are not worth parsing
+    MIN_PAGE_SIZE = 5000
+    
     def __init__(self, headless=True, scraper_name="BaseScraper"):
         self.headless = headless
         self.scraper_name = scraper_name
@@ -167,6 +218,15 @@ class BaseScraper(ABC):
         self.page_load_timeout = 45  # Increased timeout for slow sites
         self.retry_count = 0
         self.max_retries = 3
+        # Set when the last scrape_deals call went through the whole listing
+        # (not cut short by a limit, an error or a blocked page)
+        self.run_complete = False
+        # Pages the current run lost (failed loads, undersized, invalid or
+        # empty pages); a run that skipped any page is never complete
+        self.skipped_pages = 0
+        
+        from app.config import settings
+        self.extraction_mode = settings.SCRAPER_CONFIG["extraction_mode"]
         
         logger.info(f"{self.scraper_name} initialized - headless={headless}")
     
@@ -313,9 +373,134 @@ class BaseScraper(ABC):
         pass
     
     @abstractmethod
+    def parse_cards(self, cards):
+        """Parse deals from the product cards of a page (runs on parser threads, must not touch the driver)"""
+        pass
+    
+    def uses_js_extraction(self):
+        """Whether snapshots come from the in-page JS extractor instead of page_source"""
+        return self.extraction_mode == "js" and self.JS_EXTRACTOR is not None
+    
+    def take_snapshot(self):
+        """Capture the current page for parsing.
+
+        In "js" extraction mode the per-site extractor runs inside the page and
+        returns {"cards": [...], "state": {...}}; otherwise the full page_source.
+        """
+        if self.uses_js_extraction():
+            try:
+                payload = self.driver.execute_script(PAGE_EXTRACTOR_JS + self.JS_EXTRACTOR)
+                if payload and isinstance(payload.get("cards"), list):
+                    return payload
+                logger.warning(f"{self.scraper_name}: In-page extractor returned nothing, falling back to page_source")
+            except Exception as e:
+                logger.warning(f"{self.scraper_name}: In-page extractor failed ({e}), falling back to page_source")
+        return self.driver.page_source
+    
+    def analyze_page_source(self, page_source):
+        """Classify a page and parse its cards from a single BeautifulSoup parse"""
+        soup = BeautifulSoup(page_source, 'html.parser')
+        verdict, cards = self.PAGE_CLASSIFIER.classify(soup, html_length=len(page_source))
+        
+        if len(page_source) < self.MIN_PAGE_SIZE:
+            logger.warning(f"{self.scraper_name}: Page source too small")
+            return verdict, []
+        
+        return verdict, self.parse_cards(cards)
+    
+    def analyze_snapshot(self, snapshot):
+        """Return (PageVerdict, deals) for a snapshot returned by take_snapshot"""
+        if isinstance(snapshot, dict):
+            verdict = PageVerdict.from_state(snapshot.get("state"))
+            deals = self.parse_card_fields(snapshot.get("cards", []))
+        else:
+            verdict, deals = self.analyze_page_source(snapshot)
+        
+        # One timestamp per page instead of one per card
+        scraped_at = datetime.now()
+        for deal in deals:
+            deal.scraped_at = scraped_at
+        return verdict, deals
+    
+    def parse_page_source(self, page_source):
+        """Parse deals from a page snapshot"""
+        return self.analyze_page_source(page_source)[1]
+    
+    def parse_snapshot(self, snapshot):
+        """Parse deals from a snapshot returned by take_snapshot"""
+        return self.analyze_snapshot(snapshot)[1]
+    
+    def parse_card_fields(self, cards):
+        """Build deals from card fields returned by the in-page extractor"""
+        logger.info(f"{self.scraper_name}: Extracted {len(cards)} product cards in page")
+        
+        deals = []
+        for idx, fields in enumerate(cards, 1):
+            try:
+                deal_data = self.build_deal(fields)
+                if deal_data:
+                    deals.append(deal_data)
+            except Exception as e:
+                logger.error(f"{self.scraper_name}: Error building product {idx}: {e}")
+                continue
+        
+        return deals
+    
     def parse_current_page(self):
         """Parse deals from current page"""
-        pass
+        return self.parse_snapshot(self.take_snapshot())
+    
+    def is_end_of_listing(self, verdict):
+        """
+        A full-size, unblocked page without product cards, or a page past the
+        last one: the listing ran out. A no-results message alone never is
+        """
+        if verdict is None or verdict.blocked or verdict.consent_wall:
+            return False
+        return verdict.past_last_page or (verdict.is_empty and verdict.html_length >= self.MIN_PAGE_SIZE)
+    
+    def start_run(self):
+        """Reset the completeness bookkeeping at the start of scrape_deals"""
+        self.run_complete = False
+        self.skipped_pages = 0
+    
+    def skip_page(self, page_number, reason):
+        """Record a page whose deals this run did not get, or cannot vouch for"""
+        self.skipped_pages += 1
+        logger.warning(f"⚠ {self.scraper_name}: Page {page_number} skipped ({reason})")
+    
+    def check_no_results_marker(self, verdict, page_number):
+        """
+        A no-results message next to product cards is ambiguous (a widget, or a
+        half-rendered listing): the deals are kept, but the page is skipped so
+        the run is not marked complete and no deal gets swept
+        """
+        if verdict is not None and verdict.no_results and verdict.card_count:
+            self.skip_page(page_number, "no-results message next to product cards")
+    
+    def mark_run_complete(self):
+        """
+        Record that this run saw every deal the site lists (enables the unseen-deal sweep).
+        
+        Refused when any page was skipped: the sweep would deactivate its deals.
+        """
+        if self.skipped_pages:
+            logger.warning(f"⚠ {self.scraper_name}: Reached the end of the listing, but {self.skipped_pages} "
+                           f"page(s) were skipped; run is not complete, unseen deals are kept")
+            return
+        self.run_complete = True
+        logger.info(f"✓ {self.scraper_name}: Reached the end of the listing, run is complete")
+    
+    def create_parse_pipeline(self):
+        """Create a fetch/parse pipeline sized from SCRAPER_CONFIG"""
+        from app.config import settings
+        
+        return ParsePipeline(
+            self.analyze_snapshot,
+            max_workers=settings.SCRAPER_CONFIG["parse_workers"],
+            max_in_flight=settings.SCRAPER_CONFIG["max_pages_in_flight"],
+            name=self.scraper_name
+        )
     
     def navigate_with_retry(self, url, max_attempts=3):
         """Navigate to URL with retry logic for slow/unreliable sites"""
@@ -0,0 +1,95 @@
+import hashlib
+import sys
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+from app.parsers.units import unit_pricing
+from app.parsers.offers import offer_columns
+
+# Column limits of the deals table (see app/models.py)
+TITLE_MAX = 500
+CATEGORY_MAX = 200
+SPECS_MAX = 500
+OFFER_MAX = 200
+ID_MAX = 100
+
+# Values every scraper sends for the same columns
+DEFAULT_ROW = {
+    'rating': 0.0,
+    'review_count': 0,
+    'shop_count': "1",
+    'is_active': True,
+}
+
+
+# Fields whose change makes a deal "updated" (see content_hash)
+CONTENT_FIELDS = ('title', 'current_price', 'original_price', 'discount_percentage', 'offer', 'image_url')
+
+
+def _intern(value):
+    """Intern a low-cardinality string so every deal shares one copy"""
+    return sys.intern(str(value)) if value else value
+
+
+@dataclass(slots=True)
+class DealRecord:
+    """One scraped deal, as emitted by the scrapers.
+
+    Strings are truncated to their column sizes and the repetitive ones
+    (source, category, offer) are interned when the record is built.
+    ``scraped_at`` is stamped once per page by the base scraper.
+    """
+    title: str
+    product_url: str
+    source: str
+    product_id: str = ""
+    skuid: str = ""
+    category: str = "Uncategorized"
+    specs: str = ""
+    original_price: Optional[float] = None
+    current_price: Optional[float] = None
+    discount_percentage: Optional[float] = None
+    image_url: str = ""
+    offer: Optional[str] = None
+    scraped_at: Optional[datetime] = None
+
+    def __post_init__(self):
+        self.title = self.title[:TITLE_MAX]
+        self.source = _intern(self.source)
+        self.product_id = (self.product_id or "")[:ID_MAX]
+        self.skuid = (self.skuid or "")[:ID_MAX]
+        self.category = _intern((self.category or "Uncategorized")[:CATEGORY_MAX])
+        self.specs = (self.specs or "")[:SPECS_MAX]
+        if self.offer is not None:
+            self.offer = _intern(self.offer[:OFFER_MAX])
+
+    def content_hash(self):
+        """md5 over CONTENT_FIELDS, compared at ingest to skip no-op updates"""
+        content = "\x1f".join(repr(getattr(self, name)) for name in CONTENT_FIELDS)
+        return hashlib.md5(content.encode("utf-8"), usedforsecurity=False).hexdigest()
+
+    def to_row(self):
+        """Column dict for a bulk INSERT into the deals table"""
+        unit_quantity, unit, unit_price = unit_pricing(self.current_price, self.title, self.specs)
+        return {
+            'title': self.title,
+            'category': self.category,
+            'specs': self.specs,
+            'original_price': self.original_price,
+            'current_price': self.current_price,
+            'discount_percentage': self.discount_percentage,
+            'product_url': self.product_url,
+            'image_url': self.image_url,
+            'skuid': self.skuid,
+            'product_id': self.product_id,
+            'source': self.source,
+            'scraped_at': self.scraped_at,
+            'offer': self.offer,
+            'content_hash': self.content_hash(),
+            'unit_quantity': unit_quantity,
+            'unit': unit,
+            'unit_price': unit_price,
+            **offer_columns(self.offer, self.current_price, self.original_price),
+            **DEFAULT_ROW,
+        }
@@ -2,9 +2,9 @@ import re
 import time
 import logging
 import urllib.parse
-from bs4 import BeautifulSoup
 from .base_scraper import BaseScraper
-from datetime import datetime
+from .deal_record import DealRecord
+from .page_classifier import PageClassifier
 import random
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
@@ -15,6 +15,29 @@ logger = logging.getLogger("deals-api")
 class KritikosScraper(BaseScraper):
     """Scraper for kritikos-sm.gr website (infinite scroll)"""
     
+    JS_EXTRACTOR = """
+    var cards = Array.prototype.map.call(document.querySelectorAll('div.ProductListItem_productItem__cKUyG'), function (card) {
+        var q = function (sel) { return card.querySelector(sel); };
+        var finalPrice = q('p.ProductListItem_finalPrice__sEMjs');
+        var beginPrice = q('p.ProductListItem_beginPrice__vK_Dk');
+        var link = q('a.ProductListItem_productLink__BZo3P');
+        return {
+            title: __text(q('p.ProductListItem_title__e6MEz')),
+            description: __text(q('p.ProductListItem_titleDesc__JzvBv')),
+            final_price: finalPrice ? finalPrice.textContent : null,
+            begin_price: beginPrice ? beginPrice.textContent : null,
+            discount_badge: __text(q('div.ProductListItem_badge__Z11mo')),
+            offer_badge: __text(q('div.ProductListItem_badgeOffer__BW9pu')),
+            link_href: link ? (link.getAttribute('href') || '') : null,
+            image_src: __attr(q('img.ProductListItem_productImage__HbseK'), 'src')
+        };
+    });
+    return {cards: cards, state: __pageState(cards.length, null)};
+    """
+    
+    PAGE_CLASSIFIER = PageClassifier('div.ProductListItem_productItem__cKUyG')
+    MIN_PAGE_SIZE = 3000
+    
     def __init__(self, headless=True):
         super().__init__(headless=headless, scraper_name="KritikosScraper")
         self.base_url = "https://kritikos-sm.gr"
@@ -27,6 +50,7 @@ class KritikosScraper(BaseScraper):
         
         logger.info(f"🚀 {self.scraper_name}: Starting to scrape deals from infinite scroll page")
         logger.info(f"📌 URL: {self.deals_url}")
+        self.start_run()
         
         try:
             # Navigate to the deals page
@@ -61,12 +85,12 @@ class KritikosScraper(BaseScraper):
                 if new_deals:
                     # Filter out duplicates
                     new_deals_filtered = []
-                    existing_urls = {deal['product_url'] for deal in all_deals}
+                    existing_urls = {deal.product_url for deal in all_deals}
                     
                     for deal in new_deals:
-                        if deal['product_url'] not in existing_urls:
+                        if deal.product_url not in existing_urls:
                             new_deals_filtered.append(deal)
-                            existing_urls.add(deal['product_url'])
+                            existing_urls.add(deal.product_url)
                     
                     if new_deals_filtered:
                         all_deals.extend(new_deals_filtered)
@@ -76,14 +100,14 @@ class KritikosScraper(BaseScraper):
                         if len(new_deals_filtered) > 0:
                             sample_deal = new_deals_filtered[0]
                             logger.info(f"📋 {self.scraper_name}: Sample new deal added:")
-                            logger.info(f"   Title: {sample_deal['title']}")
-                            logger.info(f"   Product ID: {sample_deal['product_id']} (length: {len(sample_deal['product_id'])})")
-                            logger.info(f"   SKUID: {sample_deal['skuid']} (length: {len(sample_deal['skuid'])})")
-                            logger.info(f"   Current Price: {sample_deal['current_price']}€")
-                            logger.info(f"   Original Price: {sample_deal['original_price']}€")
-                            logger.info(f"   Discount: {sample_deal['discount_percentage']}%")
-                            logger.info(f"   Offer: {sample_deal['offer']}")
-                            logger.info(f"   Source: {sample_deal['source']}")
+                            logger.info(f"   Title: {sample_deal.title}")
+                            logger.info(f"   Product ID: {sample_deal.product_id} (length: {len(sample_deal.product_id)})")
+                            logger.info(f"   SKUID: {sample_deal.skuid} (length: {len(sample_deal.skuid)})")
+                            logger.info(f"   Current Price: {sample_deal.current_price}€")
+                            logger.info(f"   Original Price: {sample_deal.original_price}€")
+                            logger.info(f"   Discount: {sample_deal.discount_percentage}%")
+                            logger.info(f"   Offer: {sample_deal.offer}")
+                            logger.info(f"   Source: {sample_deal.source}")
                         
                         consecutive_no_new_deals = 0
                     else:
@@ -121,6 +145,9 @@ class KritikosScraper(BaseScraper):
                     time.sleep(3)
                     new_height = self.driver.execute_script("return document.body.scrollHeight")
                     
+                    # An unchanged height may be a stalled lazy load rather than
+                    # the end of the list, so the run is not marked complete
+                    # (no sweep); deals that left the site age out in cleanup_old_deals
                     if new_height == last_height:
                         logger.info(f"🏁 {self.scraper_name}: Reached end of content")
                         break
@@ -139,7 +166,7 @@ class KritikosScraper(BaseScraper):
             if all_deals:
                 logger.info(f"📋 {self.scraper_name}: First deal sample (full structure):")
                 sample = all_deals[0]
-                for key, value in sample.items():
+                for key, value in sample.to_row().items():
                     if key != 'scraped_at':
                         logger.info(f"   {key}: {value}")
             
@@ -147,19 +174,11 @@ class KritikosScraper(BaseScraper):
             
         except Exception as e:
             logger.error(f"❌ {self.scraper_name}: Scraping failed: {e}", exc_info=True)
+            self.run_complete = False
             return []
     
-    def parse_current_page(self):
-        """Parse deals from current page for kritikos-sm.gr"""
-        page_source = self.driver.page_source
-        
-        if len(page_source) < 3000:
-            logger.warning(f"{self.scraper_name}: Page source seems very small")
-            return []
-        
-        soup = BeautifulSoup(page_source, 'html.parser')
-        product_cards = soup.select('div.ProductListItem_productItem__cKUyG')
-        
+    def parse_cards(self, product_cards):
+        """Parse deals from the product cards in the current view of kritikos-sm.gr"""
         if not product_cards:
             logger.debug(f"{self.scraper_name}: No product cards found in current view")
             return []
@@ -183,33 +202,55 @@ class KritikosScraper(BaseScraper):
 
     def parse_product_card(self, card):
         """Parse individual product card for kritikos-sm.gr"""
+        return self.build_deal(self._card_fields(card))
+    
+    def _card_fields(self, card):
+        """Read the raw card fields (mirrors JS_EXTRACTOR)"""
+        def text(selector, strip=True):
+            elem = card.select_one(selector)
+            return elem.get_text(strip=strip) if elem else None
+        
+        link_elem = card.select_one('a.ProductListItem_productLink__BZo3P')
+        img_elem = card.select_one('img.ProductListItem_productImage__HbseK')
+        
+        return {
+            'title': text('p.ProductListItem_title__e6MEz'),
+            'description': text('p.ProductListItem_titleDesc__JzvBv'),
+            'final_price': text('p.ProductListItem_finalPrice__sEMjs', strip=False),
+            'begin_price': text('p.ProductListItem_beginPrice__vK_Dk', strip=False),
+            'discount_badge': text('div.ProductListItem_badge__Z11mo'),
+            'offer_badge': text('div.ProductListItem_badgeOffer__BW9pu'),
+            'link_href': link_elem.get('href', '') if link_elem else None,
+            'image_src': img_elem.get('src', '') if img_elem else None,
+        }
+    
+    def build_deal(self, fields):
+        """Build a kritikos-sm.gr deal from raw card fields"""
         
         # Title - maps to 'title' column
-        title_elem = card.select_one('p.ProductListItem_title__e6MEz')
-        title = title_elem.get_text(strip=True) if title_elem else "No title"
+        title = fields.get('title')
+        if title is None:
+            title = "No title"
         
         # Description/Subtitle - maps to 'specs' column
-        desc_elem = card.select_one('p.ProductListItem_titleDesc__JzvBv')
-        specs = desc_elem.get_text(strip=True) if desc_elem else ""
+        specs = fields.get('description') or ""
         
         # Current price - maps to 'current_price' column
-        final_price_elem = card.select_one('p.ProductListItem_finalPrice__sEMjs')
-        current_price = self.extract_price(final_price_elem.get_text()) if final_price_elem else None
+        current_price = self.extract_price(fields.get('final_price'))
         
         # Original price - maps to 'original_price' column
-        original_price_elem = card.select_one('p.ProductListItem_beginPrice__vK_Dk')
-        original_price = self.extract_price(original_price_elem.get_text()) if original_price_elem else None
+        original_price = self.extract_price(fields.get('begin_price'))
         
         # Check for discount badges
-        discount_badge = card.select_one('div.ProductListItem_badge__Z11mo')
-        offer_badge = card.select_one('div.ProductListItem_badgeOffer__BW9pu')
+        discount_badge = fields.get('discount_badge') is not None
+        offer_badge = fields.get('offer_badge') is not None
         
         discount_percentage = None
         offer = None  # Maps to 'offer' column
         
         # If there's a money discount badge (e.g., "-2.25 €")
         if discount_badge:
-            discount_text = discount_badge.get_text(strip=True)
+            discount_text = fields['discount_badge']
             
             # Calculate percentage if we have both prices
             if original_price and current_price and original_price > 0:
@@ -220,7 +261,7 @@ class KritikosScraper(BaseScraper):
         
         # If there's an offer badge (e.g., "Offer 2+1")
         elif offer_badge:
-            offer = offer_badge.get_text(strip=True)
+            offer = fields['offer_badge']
             # For offers like "2+1", leave discount_percentage as None
         
         # Calculate discount percentage if we have both prices but no discount badge
@@ -228,14 +269,12 @@ class KritikosScraper(BaseScraper):
             discount_percentage = round(((original_price - current_price) / original_price) * 100, 2)
         
         # Product URL - maps to 'product_url' column
-        link_elem = card.select_one('a.ProductListItem_productLink__BZo3P')
-        product_url = link_elem.get('href', '') if link_elem else ""
+        product_url = fields.get('link_href') or ""
         if product_url and not product_url.startswith('http'):
             product_url = f"{self.base_url}{product_url}"
         
         # Image URL - maps to 'image_url' column
-        img_elem = card.select_one('img.ProductListItem_productImage__HbseK')
-        image_url = img_elem.get('src', '') if img_elem else ''
+        image_url = fields.get('image_src') or ''
         
         # Category - extract from URL or determine from content
         category = ""
@@ -285,34 +324,20 @@ class KritikosScraper(BaseScraper):
         product_id = product_id[:100]
         skuid = skuid[:100]
         
-        # Source is always 'kritikos-sm.gr'
-        source = 'kritikos-sm.gr'
-        
-        # Default values for other columns
-        rating = 0.0
-        review_count = 0
-        shop_count = "1"
-        is_active = True
-        
-        return {
-            'title': title[:500] if title else "No Title",
-            'category': category[:200] if category else "Uncategorized",
-            'specs': specs[:500],
-            'original_price': original_price,
-            'current_price': current_price,
-            'discount_percentage': discount_percentage,
-            'offer': offer[:200] if offer else None,  # Maps to 'offer' column
-            'rating': rating,
-            'review_count': review_count,
-            'product_url': product_url,
-            'image_url': image_url,
-            'skuid': skuid,
-            'product_id': product_id,
-            'shop_count': shop_count,
-            'is_active': is_active,
-            'scraped_at': datetime.now(),
-            'source': source  # Maps to 'source' column
-        }
+        return DealRecord(
+            title=title or "No Title",
+            category=category or "Uncategorized",
+            specs=specs,
+            original_price=original_price,
+            current_price=current_price,
+            discount_percentage=discount_percentage,
+            offer=offer or None,  # Maps to 'offer' column
+            product_url=product_url,
+            image_url=image_url,
+            skuid=skuid,
+            product_id=product_id,
+            source='kritikos-sm.gr'
+        )
     
     def extract_price(self, text):
         """Extract price from text, handling euro symbols and commas"""
@@ -1,8 +1,8 @@
-import re
 import time
 import logging
-from bs4 import BeautifulSoup
 from .base_scraper import BaseScraper
+from .deal_record import DealRecord
+from .page_classifier import PageClassifier, PageVerdict
 from app.config import settings
 import random
 
@@ -11,6 +11,35 @@ logger = logging.getLogger("deals-api")
 class MarketInScraper(BaseScraper):
     """Scraper for market-in.gr website"""
     
+    JS_EXTRACTOR = """
+    var nodes = document.querySelectorAll('div.product-col');
+    if (!nodes.length) nodes = document.querySelectorAll('.product-item');
+    var cards = Array.prototype.map.call(nodes, function (card) {
+        var title = card.querySelector('a.product-ttl');
+        var link = card.querySelector('a.product-thumb') || title;
+        var cart = card.querySelector('a.add-to-cart-btn');
+        var oldPrice = card.querySelector('.old-price');
+        var newPrice = card.querySelector('.new-price');
+        return {
+            product_id: cart ? (cart.getAttribute('data-id') || '') : null,
+            title: __text(title),
+            title_href: title ? (title.getAttribute('href') || '') : null,
+            discount_text: __text(card.querySelector('.disc-value')),
+            old_price_text: oldPrice ? oldPrice.textContent : null,
+            new_price_text: newPrice ? newPrice.textContent : null,
+            link_href: link ? (link.getAttribute('href') || '') : null,
+            image_src: __attr(card.querySelector('img'), 'src'),
+            brand: __text(card.querySelector('a.product-brand'))
+        };
+    });
+    return {cards: cards, state: __pageState(cards.length, 'a.next, .pagination-next, [rel="next"]')};
+    """
+    
+    PAGE_CLASSIFIER = PageClassifier(
+        ['div.product-col', '.product-item'],
+        next_selector='a.next, .pagination-next, [rel="next"]'
+    )
+    
     def __init__(self, headless=True):
         super().__init__(headless=headless, scraper_name="MarketInScraper")
         self.base_url = "https://www.market-in.gr"
@@ -22,6 +51,7 @@ class MarketInScraper(BaseScraper):
             self.setup_driver()
         
         logger.info(f"{self.scraper_name}: Starting to scrape deals")
+        self.start_run()
         return self.scrape_with_pagination(max_pages, max_total_deals)
     
     def scrape_with_pagination(self, max_pages=None, max_total_deals=None):
@@ -31,6 +61,56 @@ class MarketInScraper(BaseScraper):
         all_deals = []
         current_page = 1
         max_consecutive_failures = 3  # Changed from 2 to be more tolerant
+        stopped = False
+        pipeline = self.create_parse_pipeline()
+        
+        def collect(page_number, result):
+            """Merge a parsed page (in page order), returns True when scraping should stop"""
+            nonlocal max_consecutive_failures
+            
+            verdict, page_deals = result if result else (PageVerdict(), [])
+            self.check_no_results_marker(verdict, page_number)
+            
+            # ENHANCED: Multiple checks for valid product page
+            if not self._validate_page_content(verdict):
+                logger.warning(f"⚠ {self.scraper_name}: Page {page_number} appears invalid or is empty")
+                if not self.is_end_of_listing(verdict):
+                    self.skip_page(page_number, "invalid page")
+                max_consecutive_failures -= 1
+                if max_consecutive_failures <= 0:
+                    logger.info(f"✓ {self.scraper_name}: Too many invalid pages, stopping")
+                    if self.is_end_of_listing(verdict):
+                        self.mark_run_complete()
+                    return True
+                return False
+            
+            # Reset failure counter on successful page
+            max_consecutive_failures = 3
+            
+            if page_deals:
+                all_deals.extend(page_deals)
+                logger.info(f"✓ {self.scraper_name}: Page {page_number}: Added {len(page_deals)} deals (total: {len(all_deals)})")
+                
+                if max_total_deals and len(all_deals) >= max_total_deals:
+                    logger.info(f"✓ {self.scraper_name}: Reached max deals: {max_total_deals}")
+                    del all_deals[max_total_deals:]
+                    return True
+            else:
+                # If parsing returns empty but page seemed valid
+                logger.warning(f"⚠ {self.scraper_name}: No deals parsed from page {page_number}")
+                self.skip_page(page_number, "no parsable deals")
+                max_consecutive_failures -= 1
+                if max_consecutive_failures <= 0:
+                    logger.info(f"✓ {self.scraper_name}: Too many pages with no parsable deals, stopping")
+                    return True
+            
+            # Check for pagination limits
+            if self._has_reached_page_limit(verdict, page_number):
+                logger.info(f"✓ {self.scraper_name}: Reached natural page limit")
+                self.mark_run_complete()
+                return True
+            
+            return False
         
         try:
             while True:
@@ -49,141 +129,87 @@ class MarketInScraper(BaseScraper):
                 self.driver.get(url)
                 time.sleep(2 + random.uniform(1, 2))
                 
-                page_source = self.driver.page_source
-                soup = BeautifulSoup(page_source, 'html.parser')
-                
-                # ENHANCED: Multiple checks for valid product page
-                page_is_valid = self._validate_page_content(soup, page_source)
-                
-                if not page_is_valid:
-                    logger.warning(f"⚠ {self.scraper_name}: Page {current_page} appears invalid or is empty")
-                    max_consecutive_failures -= 1
-                    if max_consecutive_failures <= 0:
-                        logger.info(f"✓ {self.scraper_name}: Too many invalid pages, stopping")
-                        break
-                    current_page += 1
-                    continue
-                
-                # Reset failure counter on successful page
-                max_consecutive_failures = 3
-                
                 self.scroll_page()
                 time.sleep(0.5)  # Small delay after scrolling
                 
-                page_deals = self.parse_current_page()
-                
-                if page_deals:
-                    all_deals.extend(page_deals)
-                    logger.info(f"✓ {self.scraper_name}: Page {current_page}: Added {len(page_deals)} deals (total: {len(all_deals)})")
-                    
-                    if max_total_deals and len(all_deals) >= max_total_deals:
-                        logger.info(f"✓ {self.scraper_name}: Reached max deals: {max_total_deals}")
-                        all_deals = all_deals[:max_total_deals]
-                        break
-                else:
-                    # If parse_current_page returns empty but page seemed valid
-                    logger.warning(f"⚠ {self.scraper_name}: No deals parsed from page {current_page}")
-                    max_consecutive_failures -= 1
-                    if max_consecutive_failures <= 0:
-                        logger.info(f"✓ {self.scraper_name}: Too many pages with no parsable deals, stopping")
+                # Hand the snapshot to the parser pool and move on; pages are
+                # classified and parsed in one pass and come back in order
+                # while the next page loads
+                pipeline.submit(current_page, self.take_snapshot())
+                for page_number, result in pipeline.completed():
+                    if collect(page_number, result):
+                        stopped = True
                         break
-                
-                # Check for pagination limits
-                if self._has_reached_page_limit(soup, current_page):
-                    logger.info(f"✓ {self.scraper_name}: Reached natural page limit")
+                if stopped:
                     break
                 
                 current_page += 1
                 delay = self.page_delay + random.uniform(1, 2)
                 time.sleep(delay)
             
+            # Pages fetched past a stop condition are discarded, the rest are awaited
+            if stopped:
+                pipeline.cancel()
+            else:
+                for page_number, result in pipeline.completed(drain=True):
+                    if collect(page_number, result):
+                        break
+            
             logger.info(f"✓ {self.scraper_name}: Scraping completed - {len(all_deals)} deals collected")
             return all_deals
             
         except Exception as e:
             logger.error(f"✗ {self.scraper_name}: Scraping failed: {e}", exc_info=True)
+            self.run_complete = False
             return all_deals
+        finally:
+            pipeline.close()
 
-    def _validate_page_content(self, soup, page_source):
+    def _validate_page_content(self, verdict):
         """Validate if the page contains actual product content"""
         
         # Check 1: Page source minimum size
-        if len(page_source) < 15000:  # Increased from 10000
+        if verdict.html_length < 15000:  # Increased from 10000
             logger.debug(f"{self.scraper_name}: Page source too small")
             return False
         
-        # Check 2: Look for product count indicator (from URL content: "Βρέθηκαν 306 προϊόντα")
-        product_count_text = soup.find(text=lambda t: 'προϊόντα' in str(t) or 'προϊόν' in str(t))
-        if product_count_text and '0 προϊόν' in str(product_count_text):
+        # Check 2: Product count indicator (from URL content: "Βρέθηκαν 306 προϊόντα")
+        if verdict.total_products == 0:
             logger.debug(f"{self.scraper_name}: Page shows 0 products")
             return False
         
-        # Check 3: Look for actual product containers
-        product_cards = soup.select('div.product-col, .product-item, .product-card')
-        if not product_cards:
+        # Check 3: Actual product containers
+        if not verdict.card_count:
             logger.debug(f"{self.scraper_name}: No product cards found")
             return False
         
-        # Check 4: Look for pagination elements that might indicate we're past the last page
-        pagination_text = soup.get_text()
-        if 'σελίδα' in pagination_text.lower() and 'από' in pagination_text.lower():
-            # Try to extract current/total pages if available
-            import re
-            page_match = re.search(r'σελίδα\s*(\d+)\s*από\s*(\d+)', pagination_text, re.IGNORECASE)
-            if page_match:
-                current, total = page_match.groups()
-                if int(current) > int(total):
-                    logger.debug(f"{self.scraper_name}: Current page {current} exceeds total {total}")
-                    return False
-        
-        # Check 5: Look for "no results" messages
-        no_results_keywords = ['δεν βρέθηκαν', 'no results', 'κανένα αποτέλεσμα']
-        page_text_lower = soup.get_text().lower()
-        if any(keyword in page_text_lower for keyword in no_results_keywords):
-            logger.debug(f"{self.scraper_name}: 'No results' message found")
+        # Check 4: Pagination text showing we're past the last page
+        if verdict.past_last_page:
+            logger.debug(f"{self.scraper_name}: Current page {verdict.page_current} exceeds total {verdict.page_total}")
             return False
         
+        # A "no results" message next to product cards is not checked here:
+        # the deals are kept and check_no_results_marker skips the page
         return True
 
-    def _has_reached_page_limit(self, soup, current_page):
+    def _has_reached_page_limit(self, verdict, current_page):
         """Check if we've reached the natural limit of pagination"""
-
-        # Look for product count to estimate pages
+        
         # From URL: "Βρέθηκαν 306 προϊόντα" = 306 products found
-        product_count_text = soup.find(text=lambda t: 'Βρέθηκαν' in str(t) and 'προϊόντα' in str(t))
-        if product_count_text:
-            import re  # Move import inside the if block
-            match = re.search(r'Βρέθηκαν\s+(\d+)\s+προϊόντα', str(product_count_text))
-            if match:
-                total_products = int(match.group(1))
-                estimated_pages = (total_products + 23) // 24  # Assuming ~24 products per page
-                
-                if current_page > estimated_pages:
-                    logger.info(f"{self.scraper_name}: Current page {current_page} exceeds estimated pages {estimated_pages}")
-                    return True
+        estimated_pages = verdict.estimated_pages(24)  # Assuming ~24 products per page
+        if estimated_pages and current_page > estimated_pages:
+            logger.info(f"{self.scraper_name}: Current page {current_page} exceeds estimated pages {estimated_pages}")
+            return True
 
-        # Look for pagination controls that might be disabled
-        next_button = soup.select_one('a.next, .pagination-next, [rel="next"]')
-        if next_button and ('disabled' in str(next_button.get('class', '')) or 'disabled' in str(next_button)):
+        # Pagination controls that might be disabled
+        if verdict.next_disabled:
             logger.debug(f"{self.scraper_name}: Next button is disabled")
             return True
 
         return False
         
-    def parse_current_page(self):
-        """Parse deals from current page for market-in.gr"""
-        page_source = self.driver.page_source
-        
-        if len(page_source) < 5000:
-            logger.warning(f"{self.scraper_name}: Page source seems very small")
-            return []
-        
-        soup = BeautifulSoup(page_source, 'html.parser')
-        product_cards = soup.select('div.product-col')
-        
-        if not product_cards:
-            product_cards = soup.select('.product-item')
-        
+    def parse_cards(self, product_cards):
+        """Parse deals from the product cards of a market-in.gr page"""
         logger.info(f"{self.scraper_name}: Found {len(product_cards)} product cards")
         
         deals = []
@@ -203,56 +229,72 @@ class MarketInScraper(BaseScraper):
 
     def parse_product_card(self, card):
         """Parse individual product card for market-in.gr"""
-        from datetime import datetime
+        return self.build_deal(self._card_fields(card))
+    
+    def _card_fields(self, card):
+        """Read the raw card fields (mirrors JS_EXTRACTOR)"""
+        add_to_cart_btn = card.select_one('a.add-to-cart-btn')
+        title_elem = card.select_one('a.product-ttl')
+        discount_elem = card.select_one('.disc-value')
+        old_price_elem = card.select_one('.old-price')
+        new_price_elem = card.select_one('.new-price')
+        link_elem = card.select_one('a.product-thumb') or title_elem
+        img_elem = card.select_one('img')
+        brand_elem = card.select_one('a.product-brand')
         
+        return {
+            'product_id': add_to_cart_btn.get('data-id', '') if add_to_cart_btn else None,
+            'title': title_elem.get_text(strip=True) if title_elem else None,
+            'title_href': title_elem.get('href', '') if title_elem else None,
+            'discount_text': discount_elem.get_text(strip=True) if discount_elem else None,
+            'old_price_text': old_price_elem.get_text() if old_price_elem else None,
+            'new_price_text': new_price_elem.get_text() if new_price_elem else None,
+            'link_href': link_elem.get('href', '') if link_elem else None,
+            'image_src': img_elem.get('src', '') if img_elem else None,
+            'brand': brand_elem.get_text(strip=True) if brand_elem else None,
+        }
+    
+    def build_deal(self, fields):
+        """Build a market-in.gr deal from raw card fields"""
         # Extract product ID
-        add_to_cart_btn = card.select_one('a.add-to-cart-btn')
-        product_id = add_to_cart_btn.get('data-id', '') if add_to_cart_btn else ""
+        product_id = fields.get('product_id') or ""
         
         # Title
-        title_elem = card.select_one('a.product-ttl')
-        title = title_elem.get_text(strip=True) if title_elem else "No title"
+        title = fields.get('title')
+        if title is None:
+            title = "No title"
         
         # Category
         category = ""
-        if title_elem:
-            href = title_elem.get('href', '')
-            if '/el-gr/' in href:
-                parts = href.split('/')
-                if len(parts) > 4:
-                    category = parts[3].replace('-', ' ').title()
+        href = fields.get('title_href') or ''
+        if '/el-gr/' in href:
+            parts = href.split('/')
+            if len(parts) > 4:
+                category = parts[3].replace('-', ' ').title()
         
         # Discount
-        discount_elem = card.select_one('.disc-value')
         discount_percentage = None
-        if discount_elem:
-            discount_text = discount_elem.get_text(strip=True)
-            discount_percentage = self.extract_discount_percentage(discount_text)
+        if fields.get('discount_text') is not None:
+            discount_percentage = self.extract_discount_percentage(fields['discount_text'])
         
         # Prices
-        old_price_elem = card.select_one('.old-price')
-        original_price = self.extract_price(old_price_elem.get_text()) if old_price_elem else None
-        
-        new_price_elem = card.select_one('.new-price')
-        current_price = self.extract_price(new_price_elem.get_text()) if new_price_elem else None
+        original_price = self.extract_price(fields.get('old_price_text'))
+        current_price = self.extract_price(fields.get('new_price_text'))
         
         # Calculate original price if not available
         if not original_price and current_price and discount_percentage:
             original_price = round(current_price / (1 - discount_percentage/100), 2)
         
         # Product URL
-        link_elem = card.select_one('a.product-thumb') or card.select_one('a.product-ttl')
-        product_url = link_elem.get('href', '') if link_elem else ""
+        product_url = fields.get('link_href') or ""
         
         # Image URL
-        img_elem = card.select_one('img')
-        image_url = img_elem.get('src', '') if img_elem else ''
+        image_url = fields.get('image_src') or ''
         if image_url and not image_url.startswith('http'):
             image_url = f"{self.base_url}{image_url}"
         
         # Brand
-        brand_elem = card.select_one('a.product-brand')
-        brand = brand_elem.get_text(strip=True) if brand_elem else ""
+        brand = fields.get('brand') or ""
         
         # Create specs
         specs_parts = []
@@ -261,21 +303,16 @@ class MarketInScraper(BaseScraper):
         
         specs = " | ".join(specs_parts) if specs_parts else ""
         
-        return {
-            'title': title[:500],
-            'category': category[:200] if category else "Uncategorized",
-            'specs': specs[:500],
-            'original_price': original_price,
-            'current_price': current_price,
-            'discount_percentage': discount_percentage,
-            'rating': 0.0,
-            'review_count': 0,
-            'product_url': product_url,
-            'image_url': image_url,
-            'skuid': product_id,
-            'product_id': product_id,
-            'shop_count': "1",
-            'is_active': True,
-            'scraped_at': datetime.now(),
-            'source': 'market-in.gr'  # Add source identifier
-        }
\ No newline at end of file
+        return DealRecord(
+            title=title,
+            category=category or "Uncategorized",
+            specs=specs,
+            original_price=original_price,
+            current_price=current_price,
+            discount_percentage=discount_percentage,
+            product_url=product_url,
+            image_url=image_url,
+            skuid=product_id,
+            product_id=product_id,
+            source='market-in.gr'
+        )
@@ -2,14 +2,14 @@
 import re
 import time
 import logging
-from datetime import datetime
 from urllib.parse import urljoin
-from bs4 import BeautifulSoup
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 from .base_scraper import BaseScraper
+from .deal_record import DealRecord
+from .page_classifier import PageClassifier
 import random
 
 logger = logging.getLogger(__name__)
@@ -17,6 +17,9 @@ logger = logging.getLogger(__name__)
 class MasoutisScraper(BaseScraper):
     """Scraper for masoutis.gr website with infinite scroll"""
     
+    PAGE_CLASSIFIER = PageClassifier('div.product')
+    MIN_PAGE_SIZE = 10000
+    
     def __init__(self, headless=True):
         super().__init__(headless=headless, scraper_name="MasoutisScraper")
         self.base_url = "https://www.masoutis.gr"
@@ -36,6 +39,7 @@ class MasoutisScraper(BaseScraper):
         logger.info(f"{self.scraper_name}: Target deals: {target_deals}")
         
         all_deals = []
+        self.start_run()
         
         try:
             # Navigate with retry
@@ -75,6 +79,9 @@ class MasoutisScraper(BaseScraper):
                 if len(current_deals) == last_deals_count:
                     same_count_streak += 1
                     if same_count_streak >= 3:
+                        # A stalled lazy load looks the same as the end of the
+                        # list, so the run is not marked complete (no sweep);
+                        # deals that left the site age out in cleanup_old_deals
                         logger.info(f"{self.scraper_name}: No new deals for 3 scrolls, stopping")
                         break
                 else:
@@ -82,10 +89,10 @@ class MasoutisScraper(BaseScraper):
                     last_deals_count = len(current_deals)
                 
                 # Add unique deals
-                existing_ids = {d.get('product_id') for d in all_deals if d.get('product_id')}
+                existing_ids = {d.product_id for d in all_deals if d.product_id}
                 new_deals = []
                 for deal in current_deals:
-                    deal_id = deal.get('product_id')
+                    deal_id = deal.product_id
                     if deal_id and deal_id not in existing_ids:
                         new_deals.append(deal)
                         existing_ids.add(deal_id)
@@ -103,16 +110,17 @@ class MasoutisScraper(BaseScraper):
             if all_deals:
                 logger.info(f"📊 {self.scraper_name}: Sample of saved deals:")
                 for i, deal in enumerate(all_deals[:3]):
-                    logger.info(f"  Deal {i+1}: {deal.get('title', 'N/A')[:50]}...")
-                    logger.info(f"    Current Price: {deal.get('current_price', 'N/A')}")
-                    logger.info(f"    Original Price: {deal.get('original_price', 'N/A')}")
-                    logger.info(f"    Discount: {deal.get('discount_percentage', 'N/A')}")
+                    logger.info(f"  Deal {i+1}: {deal.title[:50]}...")
+                    logger.info(f"    Current Price: {deal.current_price}")
+                    logger.info(f"    Original Price: {deal.original_price}")
+                    logger.info(f"    Discount: {deal.discount_percentage}")
             
             logger.info(f"✓ {self.scraper_name}: Completed - {len(all_deals)} deals collected")
             return all_deals[:target_deals] if max_total_deals else all_deals
             
         except Exception as e:
             logger.error(f"✗ {self.scraper_name}: Scraping failed: {e}", exc_info=True)
+            self.run_complete = False
             return all_deals
         finally:
             self.close()
@@ -151,17 +159,9 @@ class MasoutisScraper(BaseScraper):
         except Exception as e:
             logger.warning(f"{self.scraper_name}: Could not apply filter: {e}")
     
-    def parse_current_page(self):
-        """Parse deals from current page"""
+    def parse_cards(self, product_containers):
+        """Parse deals from the product containers of a page"""
         try:
-            page_source = self.driver.page_source
-            if len(page_source) < 10000:
-                logger.warning(f"{self.scraper_name}: Page source too small")
-                return []
-            
-            soup = BeautifulSoup(page_source, 'html.parser')
-            product_containers = soup.select('div.product')
-            
             logger.info(f"{self.scraper_name}: Found {len(product_containers)} product containers")
             
             deals = []
@@ -173,8 +173,8 @@ class MasoutisScraper(BaseScraper):
                     deal_data = self.parse_product_container(container)
                     if deal_data:
                         # Check if prices were actually extracted
-                        if deal_data.get('current_price') is None or deal_data.get('original_price') is None:
-                            logger.warning(f"{self.scraper_name}: Product {idx} has null prices: {deal_data.get('title', 'Unknown')}")
+                        if deal_data.current_price is None or deal_data.original_price is None:
+                            logger.warning(f"{self.scraper_name}: Product {idx} has null prices: {deal_data.title}")
                             failed_parses += 1
                         else:
                             deals.append(deal_data)
@@ -198,12 +198,12 @@ class MasoutisScraper(BaseScraper):
     def _log_sample_deal(self, deal_data, idx):
         """Log sample deal information for debugging"""
         logger.info(f"📝 {self.scraper_name}: Sample deal {idx}:")
-        logger.info(f"  Title: {deal_data.get('title', 'N/A')}")
-        logger.info(f"  Current Price: {deal_data.get('current_price', 'N/A')}")
-        logger.info(f"  Original Price: {deal_data.get('original_price', 'N/A')}")
-        logger.info(f"  Discount: {deal_data.get('discount_percentage', 'N/A')}%")
-        logger.info(f"  Offer: {deal_data.get('offer', 'N/A')}")
-        logger.info(f"  Product ID: {deal_data.get('product_id', 'N/A')}")
+        logger.info(f"  Title: {deal_data.title}")
+        logger.info(f"  Current Price: {deal_data.current_price}")
+        logger.info(f"  Original Price: {deal_data.original_price}")
+        logger.info(f"  Discount: {deal_data.discount_percentage}%")
+        logger.info(f"  Offer: {deal_data.offer or 'N/A'}")
+        logger.info(f"  Product ID: {deal_data.product_id or 'N/A'}")
     
     def parse_product_container(self, container):
         """Parse individual product container with improved price extraction"""
@@ -366,25 +366,20 @@ class MasoutisScraper(BaseScraper):
             specs = " | ".join(specs_parts) if specs_parts else ""
             
             # Create deal object - ensure all fields are properly set
-            deal = {
-                'title': title[:500],
-                'category': category[:200],
-                'specs': specs[:500],
-                'original_price': original_price,
-                'current_price': current_price,
-                'discount_percentage': discount_percentage,
-                'rating': 0.0,
-                'review_count': 0,
-                'product_url': product_url,
-                'image_url': image_url,
-                'skuid': product_id,
-                'product_id': product_id,
-                'shop_count': "1",
-                'is_active': True,
-                'scraped_at': datetime.now(),
-                'source': 'masoutis.gr',
-                'offer': offer_text.strip() if offer_text else "",
-            }
+            deal = DealRecord(
+                title=title,
+                category=category,
+                specs=specs,
+                original_price=original_price,
+                current_price=current_price,
+                discount_percentage=discount_percentage,
+                product_url=product_url,
+                image_url=image_url,
+                skuid=product_id,
+                product_id=product_id,
+                source='masoutis.gr',
+                offer=offer_text.strip() if offer_text else "",
+            )
             
             # Log if prices are null for debugging
             if original_price is None or current_price is None:
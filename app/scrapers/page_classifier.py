@@ -0,0 +1,136 @@
+import re
+from dataclasses import dataclass
+from typing import Optional
+
+import soupsieve
+from bs4 import NavigableString, Tag
+
+NO_RESULTS_MARKERS = ('δεν βρέθηκαν προϊόντα', 'no products found', 'κανένα αποτέλεσμα')
+BLOCK_MARKERS = (
+    'attention required', 'checking your browser', 'just a moment', 'access denied',
+    'verify you are human', 'are you a robot', 'cf-chl', 'captcha',
+)
+CONSENT_IDS = ('onetrust-banner-sdk', 'onetrust-consent-sdk', 'cybotcookiebotdialog', 'cookie-consent', 'cookiebanner')
+
+TOTAL_PRODUCTS_RE = re.compile(r'(\d+(?:\.?\d+)?)\s+(?:προϊόντα|αντικείμενα|results|items)', re.IGNORECASE)
+PAGE_OF_RE = re.compile(r'σελίδα\s*(\d+)\s*από\s*(\d+)', re.IGNORECASE)
+
+# Strings under these tags are never visible page text
+SKIP_TEXT_PARENTS = frozenset(('script', 'style', 'noscript', 'template'))
+
+
+@dataclass(frozen=True)
+class PageVerdict:
+    """Everything the pagination loops need to know about one page"""
+    card_count: int = 0
+    html_length: int = 0
+    no_results: bool = False
+    total_products: Optional[int] = None
+    page_current: Optional[int] = None
+    page_total: Optional[int] = None
+    next_disabled: Optional[bool] = None
+    blocked: bool = False
+    consent_wall: bool = False
+
+    @property
+    def past_last_page(self):
+        """The site says we asked for a page beyond the last one"""
+        return bool(self.page_current and self.page_total and self.page_current > self.page_total)
+
+    @property
+    def is_empty(self):
+        """No product cards on this page (a no-results message next to cards does not empty it)"""
+        return self.card_count == 0
+
+    @property
+    def is_valid(self):
+        """A real, reachable product listing page"""
+        return not (self.is_empty or self.blocked or self.consent_wall or self.past_last_page)
+
+    def estimated_pages(self, per_page):
+        """Number of pages implied by the total product count, if known"""
+        if not self.total_products or not per_page:
+            return None
+        return (self.total_products + per_page - 1) // per_page
+
+    @classmethod
+    def from_state(cls, state):
+        """Build a verdict from the page-state summary of an in-page extractor"""
+        state = state or {}
+        return cls(
+            card_count=state.get("card_count") or 0,
+            html_length=state.get("html_length") or 0,
+            no_results=bool(state.get("no_results")),
+            total_products=state.get("total_products"),
+            page_current=state.get("page_current"),
+            page_total=state.get("page_total"),
+            next_disabled=state.get("next_disabled"),
+            blocked=bool(state.get("blocked")),
+            consent_wall=bool(state.get("consent")) and not state.get("card_count"),
+        )
+
+
+class PageClassifier:
+    """Computes a PageVerdict and collects product cards in one document walk.
+
+    ``card_selectors`` are tried in priority order: the cards returned are
+    those of the first selector that matched anything, like the
+    ``select(a) or select(b)`` fallbacks in the scrapers.
+    """
+
+    def __init__(self, card_selectors, next_selector=None):
+        if isinstance(card_selectors, str):
+            card_selectors = [card_selectors]
+        self.card_patterns = [soupsieve.compile(selector) for selector in card_selectors]
+        self.next_pattern = soupsieve.compile(next_selector) if next_selector else None
+
+    def classify(self, soup, html_length=0):
+        """Return (verdict, cards) for a parsed page"""
+        groups = [[] for _ in self.card_patterns]
+        next_elem = None
+        consent = False
+        text_parts = []
+
+        for node in soup.descendants:
+            if isinstance(node, Tag):
+                for group, pattern in zip(groups, self.card_patterns):
+                    if pattern.match(node):
+                        group.append(node)
+                if next_elem is None and self.next_pattern is not None and self.next_pattern.match(node):
+                    next_elem = node
+                if not consent:
+                    node_id = node.get('id')
+                    consent = bool(node_id) and node_id.lower() in CONSENT_IDS
+            elif type(node) is NavigableString and node.parent is not None and node.parent.name not in SKIP_TEXT_PARENTS:
+                text_parts.append(node)
+
+        cards = next((group for group in groups if group), [])
+        text = ''.join(text_parts)
+        lower = text.lower()
+
+        total_products = None
+        total_match = TOTAL_PRODUCTS_RE.search(text)
+        if total_match:
+            total_products = int(total_match.group(1).replace('.', ''))
+
+        page_current = page_total = None
+        page_match = PAGE_OF_RE.search(text)
+        if page_match:
+            page_current, page_total = (int(value) for value in page_match.groups())
+
+        next_disabled = None
+        if next_elem is not None:
+            next_disabled = 'disabled' in str(next_elem.get('class', '')) or 'disabled' in str(next_elem)
+
+        verdict = PageVerdict(
+            card_count=len(cards),
+            html_length=html_length,
+            no_results=any(marker in lower for marker in NO_RESULTS_MARKERS),
+            total_products=total_products,
+            page_current=page_current,
+            page_total=page_total,
+            next_disabled=next_disabled,
+            blocked=not cards and any(marker in lower for marker in BLOCK_MARKERS),
+            consent_wall=consent and not cards,
+        )
+        return verdict, cards
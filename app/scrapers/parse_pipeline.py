@@ -0,0 +1,80 @@
+import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger("deals-api")
+
+class ParsePipeline:
+    """Two-stage fetch/parse pipeline for paginated scrapers.
+
+    The fetch stage (the Selenium driver) hands page snapshots to ``submit``
+    and moves on to the next page while a worker pool parses them. Results
+    come back from ``completed`` strictly in page order. At most
+    ``max_in_flight`` snapshots are held at once; once the pipeline is full,
+    ``completed`` blocks on the oldest page, which is what keeps the driver
+    from running ahead of the parser.
+    """
+
+    def __init__(self, parse_fn, max_workers=2, max_in_flight=2, name="ParsePipeline"):
+        self.parse_fn = parse_fn
+        self.max_in_flight = max(1, max_in_flight)
+        self.name = name
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, max_workers),
+            thread_name_prefix=f"{name}-parse"
+        )
+        self._pending = deque()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    @property
+    def in_flight(self):
+        """Number of snapshots submitted but not yet handed back"""
+        return len(self._pending)
+
+    def is_full(self):
+        """Whether the fetch stage has to wait for the parser"""
+        return len(self._pending) >= self.max_in_flight
+
+    def submit(self, page_number, snapshot):
+        """Queue a page snapshot for parsing and return immediately"""
+        future = self._executor.submit(self.parse_fn, snapshot)
+        self._pending.append((page_number, future))
+        logger.debug(f"{self.name}: Page {page_number} queued for parsing ({self.in_flight} in flight)")
+
+    def completed(self, drain=False):
+        """Yield (page_number, result) in page order for finished pages.
+
+        Blocks on the oldest page while the pipeline is full, and on every
+        remaining page when ``drain`` is set.
+        """
+        while self._pending:
+            page_number, future = self._pending[0]
+            if not (drain or future.done() or self.is_full()):
+                break
+            self._pending.popleft()
+            yield page_number, self._result(page_number, future)
+
+    def cancel(self):
+        """Drop every page that has not been handed back yet"""
+        while self._pending:
+            page_number, future = self._pending.popleft()
+            future.cancel()
+            logger.debug(f"{self.name}: Discarded page {page_number}")
+
+    def close(self):
+        """Cancel outstanding work and stop the worker pool"""
+        self.cancel()
+        self._executor.shutdown(wait=True)
+
+    def _result(self, page_number, future):
+        try:
+            return future.result()
+        except Exception as e:
+            logger.error(f"{self.name}: Failed to parse page {page_number}: {e}", exc_info=True)
+            return None
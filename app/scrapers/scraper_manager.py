@@ -1,5 +1,6 @@
 import logging
 import time
+import uuid
 from typing import List, Dict, Any, Optional
 from .marketin_scraper import MarketInScraper
 from .ab_scraper import ABScraper
@@ -11,6 +12,7 @@ from .kritikos_scraper import KritikosScraper
 # from .plaisio_scraper import PlaisioScraper
 from .masoutis_scraper import MasoutisScraper
 from .sklavenitis_scraper import SklavenitisScraper
+from .deal_record import DealRecord
 from app.config import settings
 
 logger = logging.getLogger("deals-api")
@@ -22,6 +24,10 @@ class ScraperManager:
         self.headless = headless if headless is not None else settings.HEADLESS
         self.scrapers = self._initialize_scrapers()
         self.enabled_scrapers = self._get_enabled_scrapers()
+        # Set by each run: the id written to deals.last_run_id, and the sources
+        # whose scraper went through its whole listing
+        self.run_id = None
+        self.completed_sources = set()
         logger.info(f"ScraperManager initialized with {len(self.enabled_scrapers)} enabled scrapers")
         logger.info(f"Available scrapers: {list(self.scrapers.keys())}")  # Debug line
     
@@ -71,11 +77,12 @@ class ScraperManager:
         max_pages: Optional[int] = None,
         max_total_deals: Optional[int] = None,
         specific_scrapers: Optional[List[str]] = None
-    ) -> List[Dict[str, Any]]:
+    ) -> List[DealRecord]:
         """Run all enabled scrapers sequentially with progress & per-scraper stats"""
 
-        all_deals: List[Dict[str, Any]] = []
+        all_deals: List[DealRecord] = []
         scraper_stats: Dict[str, int] = {}
+        self._start_run()
 
         # Determine which scrapers to run
         scrapers_to_run = self.enabled_scrapers
@@ -118,6 +125,10 @@ class ScraperManager:
                 deal_count = len(deals) if deals else 0
                 scraper_stats[scraper_name] = deal_count
 
+                if deal_count > 0 and scraper.run_complete:
+                    # deals.source values ("sklavenitis.gr"), not the scraper name
+                    self.completed_sources.update(deal.source for deal in deals)
+
                 if deal_count > 0:
                     all_deals.extend(deals)
                     logger.info(
@@ -154,6 +165,7 @@ class ScraperManager:
             logger.info(f"   • {name}: {count} deals")
 
         logger.info(f"🏁 Total deals scraped (all scrapers): {len(all_deals)}")
+        logger.info(f"🧾 Run {self.run_id}: complete sources {sorted(self.completed_sources)}")
 
         return all_deals
 
@@ -163,7 +175,7 @@ class ScraperManager:
         scraper_name: str, 
         max_pages: Optional[int] = None,
         max_total_deals: Optional[int] = None
-    ) -> List[Dict[str, Any]]:
+    ) -> List[DealRecord]:
         """Run a specific scraper"""
         if scraper_name not in self.enabled_scrapers:
             raise ValueError(f"Scraper '{scraper_name}' not found or disabled")
@@ -174,6 +186,7 @@ class ScraperManager:
         # Get website-specific limits or use provided ones
         scraper_max_pages = max_pages or website_config.get('max_pages', settings.DEFAULT_MAX_PAGES)
         scraper_max_deals = max_total_deals or settings.DEFAULT_MAX_PRODUCTS
+        self._start_run()
         
         try:
             deals = scraper.scrape_deals(
@@ -181,12 +194,19 @@ class ScraperManager:
                 max_total_deals=scraper_max_deals
             )
             scraper.close()
+            if deals and scraper.run_complete:
+                self.completed_sources.update(deal.source for deal in deals)
             return deals
         except Exception as e:
             logger.error(f"❌ {scraper_name}: Failed with error: {e}", exc_info=True)
             scraper.close()
             return []
     
+    def _start_run(self):
+        """New run id, no source completed yet"""
+        self.run_id = uuid.uuid4().hex
+        self.completed_sources = set()
+    
     def get_available_scrapers(self) -> List[str]:
         """Get list of available scrapers"""
         return list(self.scrapers.keys())
@@ -3,10 +3,10 @@ import re
 import time
 import json
 import logging
-from datetime import datetime
 from urllib.parse import urljoin
-from bs4 import BeautifulSoup
 from .base_scraper import BaseScraper
+from .deal_record import DealRecord
+from .page_classifier import PageClassifier
 import random
 
 logger = logging.getLogger("deals-api")
@@ -14,6 +14,31 @@ logger = logging.getLogger("deals-api")
 class SklavenitisScraper(BaseScraper):
     """Scraper for sklavenitis.gr website"""
     
+    JS_EXTRACTOR = """
+    var nodes = document.querySelectorAll('div.product[data-plugin-product]');
+    if (!nodes.length) nodes = document.querySelectorAll('div.product');
+    var cards = Array.prototype.map.call(nodes, function (card) {
+        var title = card.querySelector('h4.product__title a');
+        var price = card.querySelector('div[data-price]');
+        var link = card.querySelector('a.absLink') || title;
+        return {
+            'data-plugin-analyticsimpressions': card.getAttribute('data-plugin-analyticsimpressions') || '',
+            'data-plugin-product': card.getAttribute('data-plugin-product') || '',
+            'data-item': card.getAttribute('data-item') || '',
+            title: __text(title),
+            price: price ? (price.getAttribute('data-price') || __text(price)) : null,
+            old_price: __text(card.querySelector('.price--old, .old-price, s')),
+            link_href: link ? (link.getAttribute('href') || '') : null,
+            image_src: __attr(card.querySelector('img'), 'src'),
+            classes: Array.prototype.slice.call(card.classList)
+        };
+    });
+    return {cards: cards, state: __pageState(cards.length, null)};
+    """
+    
+    PAGE_CLASSIFIER = PageClassifier(['div.product[data-plugin-product]', 'div.product'])
+    MIN_PAGE_SIZE = 10000
+    
     def __init__(self, headless=True):
         super().__init__(headless=headless, scraper_name="SklavenitisScraper")
         self.base_url = "https://www.sklavenitis.gr"
@@ -25,6 +50,7 @@ class SklavenitisScraper(BaseScraper):
             self.setup_driver()
         
         logger.info(f"{self.scraper_name}: Starting to scrape deals")
+        self.start_run()
         return self.scrape_with_pagination(max_pages, max_total_deals)
     
     def scrape_with_pagination(self, max_pages=None, max_total_deals=None):
@@ -34,6 +60,43 @@ class SklavenitisScraper(BaseScraper):
         all_deals = []
         current_page = 1
         consecutive_empty_pages = 0
+        stopped = False
+        pipeline = self.create_parse_pipeline()
+        
+        def collect(page_number, result):
+            """Merge a parsed page (in page order), returns True when scraping should stop"""
+            nonlocal consecutive_empty_pages
+            
+            verdict, page_deals = result if result else (None, [])
+            self.check_no_results_marker(verdict, page_number)
+            
+            # Check page content
+            if verdict is not None and verdict.html_length < 5000:
+                logger.warning(f"⚠ {self.scraper_name}: Page {page_number} source too small")
+                page_deals = []
+            
+            if page_deals:
+                all_deals.extend(page_deals)
+                logger.info(f"✓ {self.scraper_name}: Page {page_number}: Added {len(page_deals)} deals (total: {len(all_deals)})")
+                
+                if max_total_deals and len(all_deals) >= max_total_deals:
+                    logger.info(f"✓ {self.scraper_name}: Reached max deals: {max_total_deals}")
+                    del all_deals[max_total_deals:]
+                    return True
+                
+                consecutive_empty_pages = 0
+            else:
+                logger.warning(f"⚠ {self.scraper_name}: No deals found on page {page_number}")
+                if not self.is_end_of_listing(verdict):
+                    self.skip_page(page_number, "no deals")
+                consecutive_empty_pages += 1
+                if consecutive_empty_pages >= 2:
+                    logger.info(f"{self.scraper_name}: 2 consecutive empty pages, stopping")
+                    if self.is_end_of_listing(verdict):
+                        self.mark_run_complete()
+                    return True
+            
+            return False
         
         try:
             while True:
@@ -51,69 +114,45 @@ class SklavenitisScraper(BaseScraper):
                 # Random delay
                 time.sleep(self.page_delay + random.uniform(0.5, 1.5))
                 
-                # Check page content
-                page_source = self.driver.page_source
-                if len(page_source) < 5000:
-                    logger.warning(f"⚠ {self.scraper_name}: Page {current_page} source too small")
-                    consecutive_empty_pages += 1
-                    if consecutive_empty_pages >= 2:
-                        break
-                    current_page += 1
-                    continue
-                
                 # Scroll to load all content
                 self.scroll_page()
                 time.sleep(0.5)
                 
-                # Parse current page
-                page_deals = self.parse_current_page()
-                
-                if page_deals:
-                    all_deals.extend(page_deals)
-                    logger.info(f"✓ {self.scraper_name}: Page {current_page}: Added {len(page_deals)} deals (total: {len(all_deals)})")
-                    
-                    if max_total_deals and len(all_deals) >= max_total_deals:
-                        logger.info(f"✓ {self.scraper_name}: Reached max deals: {max_total_deals}")
-                        all_deals = all_deals[:max_total_deals]
-                        break
-                    
-                    consecutive_empty_pages = 0
-                else:
-                    logger.warning(f"⚠ {self.scraper_name}: No deals found on page {current_page}")
-                    consecutive_empty_pages += 1
-                    if consecutive_empty_pages >= 2:
-                        logger.info(f"{self.scraper_name}: 2 consecutive empty pages, stopping")
+                # Hand the snapshot to the parser pool and move on to the next
+                # page; it is checked and parsed in one pass
+                pipeline.submit(current_page, self.take_snapshot())
+                for page_number, result in pipeline.completed():
+                    if collect(page_number, result):
+                        stopped = True
                         break
+                if stopped:
+                    break
                 
                 current_page += 1
                 delay = self.page_delay + random.uniform(0.5, 2)
                 time.sleep(delay)
             
+            # Pages fetched past a stop condition are discarded, the rest are awaited
+            if stopped:
+                pipeline.cancel()
+            else:
+                for page_number, result in pipeline.completed(drain=True):
+                    if collect(page_number, result):
+                        break
+            
             logger.info(f"✓ {self.scraper_name}: Scraping completed - {len(all_deals)} deals collected")
             return all_deals
             
         except Exception as e:
             logger.error(f"✗ {self.scraper_name}: Scraping failed: {e}", exc_info=True)
+            self.run_complete = False
             return all_deals
         finally:
+            pipeline.close()
             self.close()
     
-    def parse_current_page(self):
-        """Parse deals from current page"""
-        page_source = self.driver.page_source
-        
-        if len(page_source) < 10000:
-            logger.warning(f"{self.scraper_name}: Page source too small")
-            return []
-        
-        soup = BeautifulSoup(page_source, 'html.parser')
-        
-        # Find all product cards
-        product_cards = soup.select('div.product[data-plugin-product]')
-        
-        if not product_cards:
-            product_cards = soup.select('div.product')
-        
+    def parse_cards(self, product_cards):
+        """Parse deals from the product cards of a sklavenitis.gr page"""
         logger.info(f"{self.scraper_name}: Found {len(product_cards)} product cards")
         
         deals = []
@@ -133,11 +172,35 @@ class SklavenitisScraper(BaseScraper):
     
     def parse_product_card(self, card):
         """Parse individual product card"""
+        return self.build_deal(self._card_fields(card))
+    
+    def _card_fields(self, card):
+        """Read the raw card fields (mirrors JS_EXTRACTOR)"""
+        title_elem = card.select_one('h4.product__title a')
+        price_elem = card.select_one('div[data-price]')
+        old_price_elem = card.select_one('.price--old, .old-price, s')
+        link_elem = card.select_one('a.absLink') or title_elem
+        img_elem = card.select_one('img')
+        
+        return {
+            'data-plugin-analyticsimpressions': card.get('data-plugin-analyticsimpressions', ''),
+            'data-plugin-product': card.get('data-plugin-product', ''),
+            'data-item': card.get('data-item', ''),
+            'title': title_elem.get_text(strip=True) if title_elem else None,
+            'price': (price_elem.get('data-price') or price_elem.get_text(strip=True)) if price_elem else None,
+            'old_price': old_price_elem.get_text(strip=True) if old_price_elem else None,
+            'link_href': link_elem.get('href', '') if link_elem else None,
+            'image_src': img_elem.get('src', '') if img_elem else None,
+            'classes': card.get('class', []),
+        }
+    
+    def build_deal(self, fields):
+        """Build a sklavenitis.gr deal from raw card fields"""
         # Extract data from JSON attributes
-        product_data = self._extract_from_json_attributes(card)
+        product_data = self._extract_from_json_attributes(fields)
         
         # Extract from HTML elements
-        html_data = self._extract_from_html(card)
+        html_data = self._extract_from_html(fields)
         product_data.update(html_data)
         
         # Skip if missing essential data
@@ -163,27 +226,22 @@ class SklavenitisScraper(BaseScraper):
         specs = " | ".join(specs_parts)
         
         # Create final deal object matching Deal model
-        return {
-            'title': product_data.get('title', '')[:500],
-            'category': product_data.get('category', 'Uncategorized')[:200],
-            'specs': specs[:500],
-            'original_price': product_data.get('original_price'),
-            'current_price': product_data.get('current_price'),
-            'discount_percentage': discount,
-            'rating': 0.0,
-            'review_count': 0,
-            'product_url': product_data.get('product_url', ''),
-            'image_url': product_data.get('image_url', ''),
-            'skuid': product_data.get('sku', ''),
-            'product_id': product_data.get('product_id', ''),
-            'shop_count': "1",
-            'is_active': True,
-            'scraped_at': datetime.now(),
-            'source': 'sklavenitis.gr',
-        }
+        return DealRecord(
+            title=product_data.get('title', ''),
+            category=product_data.get('category', 'Uncategorized'),
+            specs=specs,
+            original_price=product_data.get('original_price'),
+            current_price=product_data.get('current_price'),
+            discount_percentage=discount,
+            product_url=product_data.get('product_url', ''),
+            image_url=product_data.get('image_url', ''),
+            skuid=product_data.get('sku', ''),
+            product_id=product_data.get('product_id', ''),
+            source='sklavenitis.gr',
+        )
     
     def _extract_from_json_attributes(self, card):
-        """Extract product data from JSON attributes"""
+        """Extract product data from JSON attributes (a card or its raw fields)"""
         data = {}
         
         try:
@@ -224,45 +282,38 @@ class SklavenitisScraper(BaseScraper):
         
         return data
     
-    def _extract_from_html(self, card):
-        """Extract product data from HTML elements"""
+    def _extract_from_html(self, fields):
+        """Extract product data from the card's HTML element fields"""
         data = {}
         
         # Title
-        title_elem = card.select_one('h4.product__title a')
-        if title_elem:
-            data['title'] = title_elem.get_text(strip=True)
+        if fields.get('title') is not None:
+            data['title'] = fields['title']
         
         # Price
-        price_elem = card.select_one('div[data-price]')
-        if price_elem:
-            price = price_elem.get('data-price') or price_elem.get_text(strip=True)
-            data['current_price'] = self.extract_price(price)
+        if fields.get('price') is not None:
+            data['current_price'] = self.extract_price(fields['price'])
         
         # Original price
-        old_price_elem = card.select_one('.price--old, .old-price, s')
-        if old_price_elem:
-            data['original_price'] = self.extract_price(old_price_elem.get_text(strip=True))
+        if fields.get('old_price') is not None:
+            data['original_price'] = self.extract_price(fields['old_price'])
         
         # Product URL
-        link_elem = card.select_one('a.absLink') or card.select_one('h4.product__title a')
-        if link_elem:
-            href = link_elem.get('href', '')
-            if href and not href.startswith('http'):
-                data['product_url'] = urljoin(self.base_url, href)
-            elif href:
-                data['product_url'] = href
+        href = fields.get('link_href') or ''
+        if href and not href.startswith('http'):
+            data['product_url'] = urljoin(self.base_url, href)
+        elif href:
+            data['product_url'] = href
         
         # Image URL
-        img_elem = card.select_one('img')
-        if img_elem:
-            src = img_elem.get('src', '')
+        if fields.get('image_src') is not None:
+            src = fields['image_src']
             if src and not src.startswith('http'):
                 src = urljoin(self.base_url, src)
             data['image_url'] = src
         
         # Extract from class name (fallback for SKU)
-        for cls in card.get('class', []):
+        for cls in fields.get('classes') or []:
             if cls.startswith('prGa_'):
                 sku = cls.replace('prGa_', '')
                 if not data.get('sku'):
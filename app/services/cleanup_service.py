@@ -1,8 +1,11 @@
 import logging
 from datetime import datetime, timedelta
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from app.database import SessionLocal
+from app.generation import bump_generation
 from app.models import Deal
+from app.services.stats_service import StatsService
 from app.config import settings
 
 logger = logging.getLogger(__name__)
@@ -15,14 +18,18 @@ class CleanupService:
         try:
             cutoff_date = datetime.now() - timedelta(days=settings.CLEANUP_CONFIG['inactive_days'])
             
-            # Deactivate old deals instead of deleting
+            # Deactivate old deals instead of deleting. Unchanged deals keep their
+            # old scraped_at, so go by when a scrape last saw them
             old_deals = db.query(Deal).filter(
                 Deal.is_active == True,
-                Deal.scraped_at < cutoff_date
-            ).update({"is_active": False})
+                func.coalesce(Deal.last_seen_at, Deal.scraped_at) < cutoff_date
+            ).update({"is_active": False}, synchronize_session=False)
             
             db.commit()
             logger.info(f"Deactivated {old_deals} old deals")
+            if old_deals:
+                StatsService.refresh_source_stats()
+                bump_generation("cleanup")
             
         except Exception as e:
             logger.error(f"Error during cleanup: {e}")
@@ -0,0 +1,375 @@
+import json
+import logging
+import random
+import time
+import uuid
+from datetime import datetime
+from itertools import islice
+from sqlalchemy import (
+    BigInteger, Column, MetaData, String, Table, Text, and_, case, cast, exists, func, insert, literal,
+    literal_column, not_, or_, select, text, tuple_, update
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import DataError, DBAPIError, IntegrityError, OperationalError
+from app.database import write_engine
+from app.models import Deal, DealIngestReject, DealPriceHistory
+from app.services.price_history_service import PriceHistoryService
+from app.config import settings
+
+logger = logging.getLogger("deals-api")
+
+deals_table = Deal.__table__
+history_table = DealPriceHistory.__table__
+rejects_table = DealIngestReject.__table__
+
+# Columns ingest does not take from the records
+SERVER_COLUMNS = ("id", "created_at", "updated_at", "last_seen_at", "price_changed_at")
+
+# Bookkeeping columns taken from every scrape, whether the content changed or not
+SEEN_COLUMNS = ("is_active", "last_run_id")
+
+# A change in any of these appends a deal_price_history row
+HISTORY_COLUMNS = ("current_price", "original_price", "discount_percentage", "offer")
+
+MAX_BIND_PARAMS = 65535
+
+# Columns ingest writes, in COPY order (generated columns are computed by Postgres)
+INGEST_COLUMNS = [
+    column.name for column in deals_table.columns
+    if column.name not in SERVER_COLUMNS and column.computed is None
+]
+
+
+def csv_field(value):
+    """One COPY CSV field: unquoted empty for NULL, every string quoted so '' stays ''"""
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, (int, float)):
+        return repr(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return '"' + str(value).replace('"', '""') + '"'
+
+
+class CsvRowStream:
+    """Read-only file object that renders rows as CSV on demand, for cursor.copy_expert.
+
+    Rows are pulled from the iterator chunk_size at a time, so a generator
+    source is never materialised.
+    """
+
+    def __init__(self, rows, chunk_size=500):
+        self.rows = iter(rows)
+        self.chunk_size = chunk_size
+        self.buffer = ""
+
+    def _fill(self):
+        chunk = "".join(
+            ",".join(csv_field(value) for value in row) + "\n"
+            for row in islice(self.rows, self.chunk_size)
+        )
+        self.buffer += chunk
+        return bool(chunk)
+
+    def read(self, size=-1):
+        while (size < 0 or len(self.buffer) < size) and self._fill():
+            pass
+        if size < 0:
+            data, self.buffer = self.buffer, ""
+        else:
+            data, self.buffer = self.buffer[:size], self.buffer[size:]
+        return data
+
+
+def staging_type(column_type):
+    """Staging column type of a deals column: unbounded text for strings"""
+    return Text() if isinstance(column_type, String) else column_type
+
+
+def batched(iterable, size):
+    """Yield lists of up to size items"""
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+class IngestService:
+    @staticmethod
+    def upsert_deals(deals, batch_size=None, run_id=None):
+        """Insert or update deals in batches of INSERT ... ON CONFLICT, returns row counts.
+
+        Every batch commits on its own, so a failure only loses the batch
+        being written and locks are held for one batch at a time.
+        """
+        batch_size = batch_size or settings.INGEST_CONFIG["batch_size"]
+        # Postgres caps a statement at 65535 bind parameters
+        batch_size = min(batch_size, MAX_BIND_PARAMS // len(deals_table.columns))
+        stats = IngestService._new_stats()
+
+        PriceHistoryService.rotate_partitions()
+        for batch in batched(deals, batch_size):
+            # ON CONFLICT cannot touch the same row twice in one statement, last record wins
+            rows = list({
+                (deal.source, deal.product_id): {**deal.to_row(), 'last_run_id': run_id} for deal in batch
+            }.values())
+            IngestService._upsert_rows(rows, stats, run_id)
+
+        return stats
+
+    @staticmethod
+    def copy_deals(deals, chunk_size=None, run_id=None):
+        """Stream deals into an unlogged staging table with COPY and merge them chunk by chunk"""
+        chunk_size = chunk_size or settings.INGEST_CONFIG["batch_size"]
+        staging = Table(
+            f"deals_staging_{uuid.uuid4().hex[:12]}",
+            MetaData(),
+            # varchar limits are left to the merge, so an oversized value is one
+            # rejected row instead of a failed COPY
+            *(Column(name, staging_type(deals_table.c[name].type)) for name in INGEST_COLUMNS),
+            # Chunks are merged by seq range
+            Column("seq", BigInteger, primary_key=True),
+            prefixes=["UNLOGGED"],
+        )
+        stats = IngestService._new_stats()
+
+        PriceHistoryService.rotate_partitions()
+
+        # Loading the staging table takes no locks on deals, so it is one transaction
+        with write_engine.begin() as conn:
+            staging.create(conn)
+
+            cursor = conn.connection.dbapi_connection.cursor()
+            columns = ", ".join(INGEST_COLUMNS + ["seq"])
+            cursor.copy_expert(
+                f"COPY {staging.name} ({columns}) FROM STDIN WITH (FORMAT csv)",
+                CsvRowStream(IngestService._csv_rows(deals, run_id), chunk_size),
+            )
+            copied = cursor.rowcount
+            logger.info(f"Ingest: copied {copied} rows into {staging.name}")
+
+        try:
+            for start in range(0, copied, chunk_size):
+                IngestService._merge_range(staging, start, min(start + chunk_size, copied), stats, run_id)
+        finally:
+            with write_engine.begin() as conn:
+                staging.drop(conn)
+
+        return stats
+
+    @staticmethod
+    def _new_stats():
+        return {"inserted": 0, "updated": 0, "unchanged": 0, "price_changes": 0, "rejected": 0}
+
+    @staticmethod
+    def _add_counts(stats, counts):
+        inserted, updated, total, price_changes = counts
+        stats["inserted"] += inserted
+        stats["updated"] += updated
+        stats["unchanged"] += total - inserted - updated
+        stats["price_changes"] += price_changes
+
+    @staticmethod
+    def _upsert_rows(rows, stats, run_id):
+        """Upsert rows in one chunk; on a data error bisect down to the bad rows and quarantine them"""
+        try:
+            counts = IngestService._execute_chunk(IngestService._upsert_statement(rows))
+        except (DataError, IntegrityError) as e:
+            if len(rows) == 1:
+                IngestService._reject_rows(rows, e, run_id)
+                stats["rejected"] += 1
+                return
+            middle = len(rows) // 2
+            IngestService._upsert_rows(rows[:middle], stats, run_id)
+            IngestService._upsert_rows(rows[middle:], stats, run_id)
+            return
+
+        IngestService._add_counts(stats, counts)
+
+    @staticmethod
+    def _merge_range(staging, start, end, stats, run_id):
+        """Merge staging rows with start <= seq < end, bisecting the range on a data error"""
+        try:
+            counts = IngestService._execute_chunk(IngestService._merge_statement(staging, start, end))
+        except (DataError, IntegrityError) as e:
+            if end - start == 1:
+                IngestService._reject_staged(staging, start, e, run_id)
+                stats["rejected"] += 1
+                return
+            middle = (start + end) // 2
+            IngestService._merge_range(staging, start, middle, stats, run_id)
+            IngestService._merge_range(staging, middle, end, stats, run_id)
+            return
+
+        IngestService._add_counts(stats, counts)
+
+    @staticmethod
+    def _execute_chunk(stmt):
+        """Run one statement in its own short transaction, retrying transient errors with backoff"""
+        config = settings.INGEST_CONFIG
+
+        for attempt in range(config["max_retries"] + 1):
+            try:
+                with write_engine.begin() as conn:
+                    # SET LOCAL equivalents: bound how long a chunk waits for, and holds, row locks
+                    conn.execute(text(
+                        "SELECT set_config('lock_timeout', :lock, true), "
+                        "set_config('statement_timeout', :statement, true)"
+                    ), {"lock": config["lock_timeout"], "statement": config["statement_timeout"]})
+                    return conn.execute(stmt).one()
+
+            except DBAPIError as e:
+                # OperationalError covers serialization failures, deadlocks, lock and
+                # statement timeouts and dropped connections
+                transient = isinstance(e, OperationalError) or e.connection_invalidated
+                if not transient or attempt == config["max_retries"]:
+                    raise
+                delay = config["retry_backoff"] * 2 ** attempt * random.uniform(1, 1.5)
+                logger.warning(f"⚠ Ingest: chunk failed ({type(e.orig).__name__}), retry {attempt + 1} in {delay:.1f}s")
+                time.sleep(delay)
+
+    @staticmethod
+    def _reject_rows(rows, error, run_id):
+        """Quarantine rows that could not be written, with the database error"""
+        message = str(getattr(error, "orig", error)).strip()
+        logger.error(f"✗ Ingest: rejected {rows[0].get('source')} {rows[0].get('product_id')}: {message}")
+        with write_engine.begin() as conn:
+            conn.execute(insert(rejects_table), [
+                {
+                    "run_id": run_id,
+                    "source": row.get("source"),
+                    "product_id": row.get("product_id"),
+                    "error": message,
+                    "row_data": json.dumps(row, default=str, ensure_ascii=False),
+                }
+                for row in rows
+            ])
+
+    @staticmethod
+    def _reject_staged(staging, seq, error, run_id):
+        """Quarantine the staging row with this seq, with the database error"""
+        message = str(getattr(error, "orig", error)).strip()
+        logger.error(f"✗ Ingest: rejected staged row {seq}: {message}")
+        with write_engine.begin() as conn:
+            conn.execute(insert(rejects_table).from_select(
+                ["run_id", "source", "product_id", "error", "row_data"],
+                select(
+                    literal(run_id, String), staging.c.source, staging.c.product_id, literal(message, Text),
+                    cast(func.row_to_json(literal_column(staging.name)), Text),
+                ).where(staging.c.seq == seq),
+            ))
+
+    @staticmethod
+    def _csv_rows(deals, run_id=None):
+        """(row values..., seq) tuples in INGEST_COLUMNS order"""
+        for seq, deal in enumerate(deals):
+            row = deal.to_row()
+            row['last_run_id'] = run_id
+            yield [row[name] for name in INGEST_COLUMNS] + [seq]
+
+    @staticmethod
+    def _merge_statement(staging, start, end):
+        """INSERT ... SELECT DISTINCT ON from a seq range of the staging table, returning the row counts"""
+        # Latest copy of each (source, product_id) in the range, like the per-batch
+        # dedupe of the upsert path; later ranges overwrite earlier ones
+        latest = select(*(staging.c[name] for name in INGEST_COLUMNS)).where(
+            staging.c.seq >= start, staging.c.seq < end
+        ).distinct(
+            staging.c.source, staging.c.product_id
+        ).order_by(staging.c.source, staging.c.product_id, staging.c.seq.desc())
+
+        return IngestService._with_history(
+            pg_insert(deals_table).from_select(INGEST_COLUMNS, latest), INGEST_COLUMNS
+        )
+
+    @staticmethod
+    def _upsert_statement(rows):
+        """One multi-row upsert for a list of deal rows, returning the row counts"""
+        columns = [name for name in rows[0] if name not in SERVER_COLUMNS]
+        return IngestService._with_history(pg_insert(deals_table).values(rows), columns)
+
+    @staticmethod
+    def _with_history(stmt, columns):
+        """Run the upsert in a CTE that also appends price changes to deal_price_history.
+
+        Returns (inserted, updated, total, price_changes) in a single row.
+        """
+        merged = IngestService._on_conflict_update(stmt, columns).cte("merged")
+
+        # DO NOTHING: a deal repeated across batches of one transaction gets the same now()
+        history = pg_insert(history_table).from_select(
+            ["deal_id", "recorded_at", *HISTORY_COLUMNS],
+            select(merged.c.id, func.now(), *(merged.c[name] for name in HISTORY_COLUMNS))
+            .where(merged.c.price_changed),
+        ).on_conflict_do_nothing().cte("history")
+
+        return select(
+            func.count().filter(merged.c.inserted),
+            func.count().filter(and_(merged.c.changed, not_(merged.c.inserted))),
+            func.count(),
+            func.count().filter(merged.c.price_changed),
+        ).select_from(merged).add_cte(history)
+
+    @staticmethod
+    def _on_conflict_update(stmt, columns):
+        """Add the ON CONFLICT (source, product_id) update and the (inserted, changed) RETURNING"""
+        excluded = stmt.excluded
+        # A deal the sweep deactivated comes back with the same content, but listings,
+        # cached counts and the stats view still change, so reactivation counts too
+        changed = or_(
+            deals_table.c.content_hash.is_distinct_from(excluded.content_hash),
+            deals_table.c.is_active.is_distinct_from(excluded.is_active),
+        )
+        price_changed = tuple_(*(deals_table.c[name] for name in HISTORY_COLUMNS)).is_distinct_from(
+            tuple_(*(excluded[name] for name in HISTORY_COLUMNS))
+        )
+
+        # Unchanged rows keep every column (so no new index entries) and only get
+        # last_seen_at and last_run_id. updated_at only moves when the content or
+        # is_active did, so "updated_at = now()" in RETURNING tells updated rows from unchanged ones
+        return stmt.on_conflict_do_update(
+            constraint="uq_deals_source_product_id",
+            set_={
+                **{
+                    name: case((changed, excluded[name]), else_=deals_table.c[name])
+                    for name in columns if name not in SEEN_COLUMNS
+                },
+                **{name: excluded[name] for name in SEEN_COLUMNS},
+                "updated_at": case((changed, func.now()), else_=deals_table.c.updated_at),
+                "last_seen_at": func.now(),
+                "price_changed_at": case((price_changed, func.now()), else_=deals_table.c.price_changed_at),
+            },
+        ).returning(
+            deals_table.c.id,
+            *(deals_table.c[name] for name in HISTORY_COLUMNS),
+            literal_column("xmax = 0").label("inserted"),
+            (deals_table.c.updated_at == func.now()).label("changed"),
+            # New deals get price_changed_at = now() from the server default, so they start their history too
+            (deals_table.c.price_changed_at == func.now()).label("price_changed"),
+        )
+
+    @staticmethod
+    def sweep_unseen(source, run_id):
+        """Deactivate the deals of a source that a complete run did not see, returns the count"""
+        seen = deals_table.alias("seen")
+
+        # Guarded in SQL too: nothing happens unless the run saved rows for this source,
+        # and rows the run saw but had to reject are left alone
+        stmt = update(deals_table).where(
+            deals_table.c.source == source,
+            deals_table.c.is_active.is_(True),
+            deals_table.c.last_run_id.is_distinct_from(run_id),
+            exists().where(seen.c.source == source, seen.c.last_run_id == run_id),
+            ~exists().where(
+                rejects_table.c.run_id == run_id,
+                rejects_table.c.source == deals_table.c.source,
+                rejects_table.c.product_id == deals_table.c.product_id,
+            ),
+        ).values(is_active=False, updated_at=func.now())
+
+        with write_engine.begin() as conn:
+            return conn.execute(stmt).rowcount
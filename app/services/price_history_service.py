@@ -0,0 +1,68 @@
+import logging
+import re
+from datetime import date, datetime, timezone
+from sqlalchemy import text
+from app.database import write_engine
+from app.models import DealPriceHistory
+from app.config import settings
+
+logger = logging.getLogger("deals-api")
+
+history_table = DealPriceHistory.__table__
+
+# deal_price_history_y2025m03
+PARTITION_RE = re.compile(r'^deal_price_history_y(\d{4})m(\d{2})$')
+
+
+def add_months(month, count):
+    """First day of the month count months after month"""
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month):
+    return f"{history_table.name}_y{month.year}m{month.month:02d}"
+
+
+class PriceHistoryService:
+    @staticmethod
+    def rotate_partitions(today=None):
+        """Create the upcoming monthly partitions and detach the expired ones"""
+        config = settings.PRICE_HISTORY_CONFIG
+        today = today or datetime.now(timezone.utc).date()
+        current = today.replace(day=1)
+
+        with write_engine.begin() as conn:
+            for offset in range(config["months_ahead"] + 1):
+                PriceHistoryService._create_partition(conn, add_months(current, offset))
+
+            oldest_kept = add_months(current, -config["retention_months"])
+            for name, month in list(PriceHistoryService._attached_partitions(conn)):
+                if month < oldest_kept:
+                    conn.execute(text(f"ALTER TABLE {history_table.name} DETACH PARTITION {name}"))
+                    logger.info(f"Price history: ⚠ detached expired partition {name}")
+
+    @staticmethod
+    def _create_partition(conn, month):
+        # Bounds in UTC, like the now() written into recorded_at
+        conn.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {partition_name(month)} "
+            f"PARTITION OF {history_table.name} "
+            f"FOR VALUES FROM ('{month.isoformat()} 00:00:00+00') "
+            f"TO ('{add_months(month, 1).isoformat()} 00:00:00+00')"
+        ))
+
+    @staticmethod
+    def _attached_partitions(conn):
+        """(name, month) of the monthly partitions currently attached"""
+        rows = conn.execute(text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE parent.relname = :parent"
+        ), {"parent": history_table.name})
+
+        for (name,) in rows:
+            match = PARTITION_RE.match(name)
+            if match:
+                yield name, date(int(match.group(1)), int(match.group(2)), 1)
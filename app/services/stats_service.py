@@ -0,0 +1,25 @@
+import logging
+from sqlalchemy import text
+from app.database import is_postgres, write_engine
+from app.config import settings
+
+logger = logging.getLogger("deals-api")
+
+
+class StatsService:
+    @staticmethod
+    def refresh_source_stats():
+        """
+        Recompute the deal_source_stats view behind /scrapers/stats.
+
+        CONCURRENTLY keeps the old rows readable until the new ones are in.
+        A failed refresh only leaves the stats behind, so it is logged, not raised.
+        """
+        if not is_postgres(settings.DATABASE_URL):
+            return
+        try:
+            with write_engine.begin() as conn:
+                conn.execute(text("REFRESH MATERIALIZED VIEW CONCURRENTLY deal_source_stats"))
+            logger.info("📊 Refreshed deal_source_stats")
+        except Exception as e:
+            logger.warning(f"⚠ Refreshing deal_source_stats failed, /scrapers/stats is out of date: {e}")
@@ -0,0 +1,71 @@
+"""Recompute the parsed unit and offer columns of existing deals.
+
+Usage: python backfill_parsed_columns.py
+
+Ingest fills unit_* / offer_* / effective_* from app/parsers, but only
+rewrites a row when its content hash changes. Rows written before the
+columns existed, and rows parsed by an older version of the parsers, keep
+their old values. Run this once after `alembic upgrade head`, and again
+whenever the parsers change. Each batch commits on its own, and rows that
+already hold the current values are not rewritten.
+"""
+from sqlalchemy import text
+from app.database import write_engine
+from app.parsers.units import unit_pricing
+from app.parsers.offers import offer_columns
+
+BATCH_SIZE = 5000
+
+PARSED_COLUMNS = (
+    'unit_quantity', 'unit', 'unit_price',
+    'offer_type', 'offer_buy_qty', 'offer_free_qty', 'offer_nth_item', 'offer_nth_discount',
+    'effective_price', 'effective_discount',
+)
+
+SELECT_BATCH = text(f"""
+    SELECT id, title, specs, offer, current_price, original_price, {', '.join(PARSED_COLUMNS)}
+    FROM deals
+    WHERE id > :after
+    ORDER BY id
+    LIMIT :limit
+""")
+
+UPDATE_ROW = text(f"UPDATE deals SET {', '.join(f'{name} = :{name}' for name in PARSED_COLUMNS)} WHERE id = :id")
+
+
+def parsed_columns(row):
+    """The values ingest would store for a row (see DealRecord.to_row)"""
+    unit_quantity, unit, unit_price = unit_pricing(row.current_price, row.title, row.specs)
+    return {
+        'unit_quantity': unit_quantity,
+        'unit': unit,
+        'unit_price': unit_price,
+        **offer_columns(row.offer, row.current_price, row.original_price),
+    }
+
+
+def backfill_parsed_columns():
+    after = scanned = updated = 0
+    while True:
+        with write_engine.begin() as conn:
+            rows = conn.execute(SELECT_BATCH, {"after": after, "limit": BATCH_SIZE}).all()
+            if not rows:
+                break
+            changes = []
+            for row in rows:
+                values = parsed_columns(row)
+                if any(getattr(row, name) != value for name, value in values.items()):
+                    changes.append({**values, 'id': row.id})
+            if changes:
+                conn.execute(UPDATE_ROW, changes)
+
+        after = rows[-1].id
+        scanned += len(rows)
+        updated += len(changes)
+        print(f"📊 {scanned} deals scanned, {updated} updated")
+
+    print(f"✅ Parsed columns up to date ({updated} of {scanned} deals updated)")
+
+
+if __name__ == "__main__":
+    backfill_parsed_columns()
@@ -0,0 +1,115 @@
+"""Compare the old and the column-projected way of building a /deals page.
+
+Usage: python bench_listing_serialization.py [rows] [--db]
+
+before: whole Deal objects -> dict per row with get_redirect_url() ->
+        jsonable_encoder -> json.dumps (FastAPI's default JSONResponse)
+after:  rows of only the response columns, url built in SQL -> orjson
+
+Without --db the rows are synthetic, which isolates building the page and
+serialising it. With --db both queries run against DATABASE_URL as well.
+"""
+import json
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import desc, select
+from sqlalchemy.orm import Session
+
+from app.database import engine
+from app.models import Deal
+from app.projections import DEAL_FIELDS, LISTING_FIELDS, deal_columns
+
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 and sys.argv[1].isdigit() else 100
+REPEAT = 200
+
+
+def synthetic_deals(count):
+    now = datetime.now(timezone.utc)
+    return [
+        Deal(
+            id=i, title=f"Γάλα φρέσκο πλήρες {i} 1lt", category="Γαλακτοκομικά", specs="1 λίτρο " * 20,
+            original_price=1.89, current_price=1.49, discount_percentage=21.2, rating=0.0, review_count=0,
+            product_url=f"https://www.example.gr/product/{i}", image_url=f"https://cdn.example.gr/{i}.jpg" * 3,
+            product_id=str(100000 + i), source="ab.gr", scraped_at=now - timedelta(minutes=i),
+            created_at=now, updated_at=now, is_active=True, offer="1+1", unit_quantity=1.0, unit="l",
+            unit_price=1.49,
+        )
+        for i in range(count)
+    ]
+
+
+def before(deals):
+    page = {
+        "total": len(deals),
+        "deals": [
+            {
+                "id": d.id, "title": d.title, "price": d.current_price, "original_price": d.original_price,
+                "discount": d.discount_percentage, "source": d.source, "category": d.category,
+                "image": d.image_url, "url": d.get_redirect_url(), "is_active": d.is_active,
+                "scraped_at": d.scraped_at, "created_at": d.created_at, "updated_at": d.updated_at,
+                "offer": d.offer, "unit_quantity": d.unit_quantity, "unit": d.unit, "unit_price": d.unit_price,
+            }
+            for d in deals
+        ],
+    }
+    return json.dumps(jsonable_encoder(page), ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def after(rows):
+    return orjson.dumps({"total": len(rows), "deals": [dict(row) for row in rows]})
+
+
+def projected(deals):
+    """What the projected query returns for the same deals: mappings of the response fields"""
+    return [
+        {field: getattr(d, "redirect_url" if field == "url" else DEAL_FIELDS[field].key) for field in LISTING_FIELDS}
+        for d in deals
+    ]
+
+
+def timed(label, fn, *args):
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        body = fn(*args)
+    elapsed = (time.perf_counter() - start) / REPEAT * 1000
+    print(f"  {label:<8} {elapsed:8.3f} ms/page  {len(body) / 1024:7.1f} KiB")
+    return elapsed
+
+
+def bench_serialization():
+    print(f"\n📊 Serialisation, {ROWS} synthetic rows per page, mean of {REPEAT} runs")
+    deals = synthetic_deals(ROWS)
+    rows = projected(deals)
+    slow = timed("before", before, deals)
+    fast = timed("after", after, rows)
+    print(f"  ✓ {slow / fast:.1f}x faster")
+
+
+def bench_database():
+    print(f"\n📊 Query + serialisation against the database, {ROWS} rows per page")
+    full = select(Deal).where(Deal.is_active == True).order_by(desc(Deal.scraped_at)).limit(ROWS)
+    lean = select(*deal_columns(LISTING_FIELDS)).where(Deal.is_active == True).order_by(
+        desc(Deal.scraped_at)).limit(ROWS)
+
+    with Session(engine) as session:
+        def run_before():
+            body = before(session.scalars(full).all())
+            session.expunge_all()
+            return body
+
+        def run_after():
+            return after(session.execute(lean).mappings().all())
+
+        slow = timed("before", run_before)
+        fast = timed("after", run_after)
+    print(f"  ✓ {slow / fast:.1f}x faster")
+
+
+if __name__ == "__main__":
+    bench_serialization()
+    if "--db" in sys.argv:
+        bench_database()
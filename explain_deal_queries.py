@@ -0,0 +1,69 @@
+"""Print EXPLAIN (ANALYZE, BUFFERS) for the query shapes of the listing endpoints.
+
+Usage: python explain_deal_queries.py [source] [search]
+
+Run after `alembic upgrade head` to check that each shape uses the partial,
+composite and trigram indexes from migrations/versions/0003_listing_indexes.py
+and the keyset indexes from 0005_keyset_indexes.py.
+"""
+import sys
+from datetime import datetime, timezone
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+from app.database import engine
+from app.models import deal_source_stats
+from app.counting import cached_count_statement
+from app.deal_query import FACETS, DealFilterSpec, facet_statement, listing_page_statement, listing_statement
+from app.pagination import encode_cursor, page_params
+from app.projections import LISTING_FIELDS, OFFER_LISTING_FIELDS, SOURCE_LISTING_FIELDS
+
+SOURCE = sys.argv[1] if len(sys.argv) > 1 else "ab.gr"
+SEARCH = sys.argv[2] if len(sys.argv) > 2 else "γάλα"
+
+
+def page(spec, value=None, skip=0):
+    """A page of a listing as fetch_listing runs it: after a deep cursor at value, else at skip"""
+    cursor = encode_cursor(spec.sort, value, 1_000_000) if value is not None else None
+    params = {**spec.params, **page_params(spec.sorts, spec.sort, cursor, skip)}
+    return listing_page_statement(spec.shape, cursor is not None).params(**params)
+
+
+def count(spec):
+    """The exact count fetch_listing runs for a listing's total"""
+    return cached_count_statement(listing_statement(spec.shape)).params(**spec.params)
+
+
+QUERIES = {
+    "/deals (newest page)": page(DealFilterSpec.of(LISTING_FIELDS), skip=40),
+    "/deals (count)": count(DealFilterSpec.of(LISTING_FIELDS)),
+    "/deals?source=": page(DealFilterSpec.of(LISTING_FIELDS, source=SOURCE)),
+    "/deals?search=": page(DealFilterSpec.of(LISTING_FIELDS, search=SEARCH)),
+    "/deals?category=": page(DealFilterSpec.of(LISTING_FIELDS, category=SEARCH)),
+    "/deals/from/{source}?search=": page(DealFilterSpec.of(SOURCE_LISTING_FIELDS, source=SOURCE, search=SEARCH)),
+    "/deals/multiple-sources": page(DealFilterSpec.of(LISTING_FIELDS, sources=[SOURCE, "masoutis.gr"])),
+    "/deals/with-offers": page(DealFilterSpec.of(OFFER_LISTING_FIELDS, offers=True)),
+    "/deals?cursor= (newest)": page(DealFilterSpec.of(LISTING_FIELDS), datetime.now(timezone.utc)),
+    "/deals?sort=discount&cursor=": page(DealFilterSpec.of(LISTING_FIELDS, sort="discount"), 25.0),
+    "/deals?sort=price&cursor=": page(DealFilterSpec.of(LISTING_FIELDS, sort="price"), 2.5),
+    "/deals?sort=unit_price&cursor=": page(DealFilterSpec.of(LISTING_FIELDS, sort="unit_price"), 4.0),
+    "/deals/from/{source}?cursor=": page(DealFilterSpec.of(SOURCE_LISTING_FIELDS, source=SOURCE),
+                                         datetime.now(timezone.utc)),
+    "/deals/with-offers?sort=effective_discount&cursor=": page(
+        DealFilterSpec.of(OFFER_LISTING_FIELDS, offers=True, sort="effective_discount"), 30.0),
+    "/deals?facets=source,category,offer_type,price,discount": facet_statement(
+        DealFilterSpec.of(LISTING_FIELDS).shape, tuple(FACETS)),
+    "/scrapers/stats": select(deal_source_stats).order_by(deal_source_stats.c.source),
+}
+
+
+def explain_deal_queries():
+    with engine.connect() as conn:
+        for name, query in QUERIES.items():
+            sql = query.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+            print(f"\n📊 {name}\n{'-' * 80}")
+            for (line,) in conn.exec_driver_sql(f"EXPLAIN (ANALYZE, BUFFERS) {sql}"):
+                print(line)
+
+
+if __name__ == "__main__":
+    explain_deal_queries()
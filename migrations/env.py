@@ -0,0 +1,58 @@
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import text
+
+from app.config import settings
+from app.database import Base
+import app.models  # noqa: F401  registers the tables on Base.metadata
+
+config = context.config
+
+# The app configures its own logging; only the alembic CLI uses alembic.ini's
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
+
+target_metadata = Base.metadata
+
+# Serialises concurrent upgrades (several API workers starting at once)
+MIGRATION_LOCK_ID = 4_300_381
+
+
+def run_migrations_offline():
+    """Emit the migration SQL instead of running it (alembic upgrade head --sql)"""
+    context.configure(
+        url=settings.DATABASE_URL,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    """Run the migrations against the app's engine"""
+    from app.database import write_engine
+
+    with write_engine.connect() as connection:
+        # CREATE INDEX CONCURRENTLY and backfills can outlast the write pool's statement_timeout
+        connection.execute(text("SET statement_timeout = 0"))
+        connection.execute(text("SELECT pg_advisory_lock(:id)"), {"id": MIGRATION_LOCK_ID})
+        connection.commit()
+        try:
+            context.configure(connection=connection, target_metadata=target_metadata)
+
+            with context.begin_transaction():
+                context.run_migrations()
+        finally:
+            connection.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": MIGRATION_LOCK_ID})
+            connection.execute(text("RESET statement_timeout"))
+            connection.commit()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,54 @@
+"""Baseline: the deals table as created by Base.metadata.create_all
+
+Databases created before migrations existed already have this table; the
+app stamps them at this revision instead of running it (see run_migrations
+in app/database.py).
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'deals',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('title', sa.String(500), nullable=False),
+        sa.Column('category', sa.String(200)),
+        sa.Column('specs', sa.String(500)),
+        sa.Column('original_price', sa.Float()),
+        sa.Column('current_price', sa.Float()),
+        sa.Column('discount_percentage', sa.Float()),
+        sa.Column('rating', sa.Float()),
+        sa.Column('review_count', sa.Integer()),
+        sa.Column('product_url', sa.Text(), nullable=False),
+        sa.Column('image_url', sa.Text()),
+        sa.Column('skuid', sa.String(100)),
+        sa.Column('product_id', sa.String(100)),
+        sa.Column('shop_count', sa.String(100)),
+        sa.Column('source', sa.String(100)),
+        sa.Column('scraped_at', sa.DateTime(timezone=True)),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column('updated_at', sa.DateTime(timezone=True)),
+        sa.Column('is_active', sa.Boolean()),
+        sa.Column('offer', sa.String(200), nullable=True),
+    )
+    op.create_index('ix_deals_id', 'deals', ['id'])
+    op.create_index('ix_deals_product_id', 'deals', ['product_id'])
+    op.create_index('idx_product_id_source', 'deals', ['product_id', 'source'])
+    op.create_index('idx_discount', 'deals', ['discount_percentage'])
+    op.create_index('idx_current_price', 'deals', ['current_price'])
+    op.create_index('idx_scraped_at', 'deals', ['scraped_at'])
+    op.create_index('idx_source', 'deals', ['source'])
+
+
+def downgrade():
+    op.drop_table('deals')
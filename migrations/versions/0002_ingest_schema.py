@@ -0,0 +1,100 @@
+"""Ingest schema: parsed unit/offer columns, change tracking, price history, rejects
+
+Brings a baseline database up to the columns and tables added for the
+batched ingest. Every step is IF NOT EXISTS, since databases recreated with
+the old reset_deals_table.py (DROP + create_all) already have part of it.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+"""
+from alembic import op
+
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+NEW_COLUMNS = [
+    ('unit_quantity', 'double precision'),
+    ('unit', 'varchar(10)'),
+    ('unit_price', 'double precision'),
+    ('offer_type', 'varchar(30)'),
+    ('offer_buy_qty', 'integer'),
+    ('offer_free_qty', 'integer'),
+    ('offer_nth_item', 'integer'),
+    ('offer_nth_discount', 'double precision'),
+    ('effective_price', 'double precision'),
+    ('effective_discount', 'double precision'),
+    ('content_hash', 'varchar(32)'),
+    ('last_seen_at', 'timestamp with time zone DEFAULT now()'),
+    ('price_changed_at', 'timestamp with time zone DEFAULT now()'),
+    ('last_run_id', 'varchar(32)'),
+]
+
+
+def upgrade():
+    for name, definition in NEW_COLUMNS:
+        op.execute(f"ALTER TABLE deals ADD COLUMN IF NOT EXISTS {name} {definition}")
+
+    op.execute("CREATE INDEX IF NOT EXISTS idx_unit_price ON deals (unit, unit_price)")
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_offer_type_effective_discount ON deals (offer_type, effective_discount)"
+    )
+    op.execute("CREATE INDEX IF NOT EXISTS idx_effective_price ON deals (effective_price)")
+
+    # The upsert needs one row per (source, product_id): keep the newest copy
+    op.execute("""
+        DELETE FROM deals older
+        USING deals newer
+        WHERE older.source = newer.source
+          AND older.product_id = newer.product_id
+          AND older.id < newer.id
+    """)
+    op.execute("""
+        DO $$
+        BEGIN
+            IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'uq_deals_source_product_id') THEN
+                ALTER TABLE deals ADD CONSTRAINT uq_deals_source_product_id UNIQUE (source, product_id);
+            END IF;
+        END $$
+    """)
+    op.execute("DROP INDEX IF EXISTS idx_product_id_source")
+
+    # Partitions are created by PriceHistoryService.rotate_partitions
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS deal_price_history (
+            deal_id integer NOT NULL,
+            recorded_at timestamp with time zone NOT NULL,
+            current_price double precision,
+            original_price double precision,
+            discount_percentage double precision,
+            offer varchar(200),
+            PRIMARY KEY (deal_id, recorded_at)
+        ) PARTITION BY RANGE (recorded_at)
+    """)
+
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS deal_ingest_rejects (
+            id serial PRIMARY KEY,
+            run_id varchar(32),
+            source varchar(100),
+            product_id varchar(100),
+            error text,
+            row_data text,
+            rejected_at timestamp with time zone DEFAULT now()
+        )
+    """)
+    op.execute("CREATE INDEX IF NOT EXISTS ix_deal_ingest_rejects_run_id ON deal_ingest_rejects (run_id)")
+
+
+def downgrade():
+    op.execute("DROP TABLE IF EXISTS deal_ingest_rejects")
+    op.execute("DROP TABLE IF EXISTS deal_price_history")
+    op.execute("CREATE INDEX IF NOT EXISTS idx_product_id_source ON deals (product_id, source)")
+    op.execute("ALTER TABLE deals DROP CONSTRAINT IF EXISTS uq_deals_source_product_id")
+    op.execute("DROP INDEX IF EXISTS idx_effective_price")
+    op.execute("DROP INDEX IF EXISTS idx_offer_type_effective_discount")
+    op.execute("DROP INDEX IF EXISTS idx_unit_price")
+    for name, _ in reversed(NEW_COLUMNS):
+        op.execute(f"ALTER TABLE deals DROP COLUMN IF EXISTS {name}")
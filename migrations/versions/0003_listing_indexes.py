@@ -0,0 +1,51 @@
+"""Partial, composite and trigram indexes for the /deals listing queries
+
+Every listing filters on is_active (and usually source), orders by
+scraped_at DESC and may run ilike '%x%' on title, specs, offer and
+category. Checked with explain_deal_queries.py.
+
+Indexes are built CONCURRENTLY so a live deals table stays writable.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19
+"""
+from alembic import op
+
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    # /deals, /deals/simple: newest active deals across all sources
+    ('idx_deals_active_scraped_at', "(scraped_at DESC) WHERE is_active"),
+    # /deals?source=, /deals/from/{source}, /deals/multiple-sources
+    ('idx_deals_active_source_scraped_at', "(source, scraped_at DESC) WHERE is_active"),
+    # include_inactive listings and the latest scrape per source in /scrapers/stats
+    ('idx_deals_source_scraped_at', "(source, scraped_at DESC)"),
+    # /deals/with-offers (newest)
+    ('idx_deals_active_offers_scraped_at', "(scraped_at DESC) WHERE is_active AND offer_type IS NOT NULL"),
+    # ilike '%x%' filters
+    ('idx_deals_title_trgm', "USING gin (title gin_trgm_ops)"),
+    ('idx_deals_specs_trgm', "USING gin (specs gin_trgm_ops)"),
+    ('idx_deals_offer_trgm', "USING gin (offer gin_trgm_ops)"),
+    ('idx_deals_category_trgm', "USING gin (category gin_trgm_ops)"),
+]
+
+
+def upgrade():
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    with op.get_context().autocommit_block():
+        for name, definition in INDEXES:
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON deals {definition}")
+        # Superseded by idx_deals_source_scraped_at and uq_deals_source_product_id
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_source")
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_source ON deals (source)")
+        for name, _ in reversed(INDEXES):
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
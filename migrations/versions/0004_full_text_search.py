@@ -0,0 +1,57 @@
+"""Greek full-text search: greek_unaccent configuration and deals.search_vector
+
+Adds a stored generated tsvector over title, offer, category and specs
+(weighted A-D), built with a copy of the 'greek' configuration that runs
+unaccent before the Greek stemmer, so "γάλα", "ΓΑΛΑ" and "γαλα" match.
+
+Adding the generated column rewrites the deals table once.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19
+"""
+from alembic import op
+
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+SEARCH_CONFIG = 'greek_unaccent'
+
+# Same expression as app.models.SEARCH_VECTOR_SQL at this revision
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('greek_unaccent'::regconfig, coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('greek_unaccent'::regconfig, coalesce(offer, '')), 'B') || "
+    "setweight(to_tsvector('greek_unaccent'::regconfig, coalesce(category, '')), 'C') || "
+    "setweight(to_tsvector('greek_unaccent'::regconfig, coalesce(specs, '')), 'D')"
+)
+
+
+def upgrade():
+    op.execute("CREATE EXTENSION IF NOT EXISTS unaccent")
+    op.execute(f"""
+        DO $$
+        BEGIN
+            IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = '{SEARCH_CONFIG}') THEN
+                CREATE TEXT SEARCH CONFIGURATION {SEARCH_CONFIG} (COPY = greek);
+                ALTER TEXT SEARCH CONFIGURATION {SEARCH_CONFIG}
+                    ALTER MAPPING FOR hword, hword_part, word WITH unaccent, greek_stem;
+            END IF;
+        END $$
+    """)
+    op.execute(
+        f"ALTER TABLE deals ADD COLUMN IF NOT EXISTS search_vector tsvector "
+        f"GENERATED ALWAYS AS ({SEARCH_VECTOR_SQL}) STORED"
+    )
+
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_deals_search_vector ON deals USING gin (search_vector)"
+        )
+
+
+def downgrade():
+    op.execute("DROP INDEX IF EXISTS idx_deals_search_vector")
+    op.execute("ALTER TABLE deals DROP COLUMN IF EXISTS search_vector")
+    op.execute(f"DROP TEXT SEARCH CONFIGURATION IF EXISTS {SEARCH_CONFIG}")
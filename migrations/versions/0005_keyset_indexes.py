@@ -0,0 +1,58 @@
+"""Keyset pagination indexes: (sort column, id) per listing sort
+
+The listing endpoints page with a cursor on (sort column, id) instead of
+OFFSET (app/pagination.py). Each sort gets a partial index in that exact
+order, so any page is an index range scan that stops after limit + 1 rows.
+The 0003 newest-first indexes lacked the id tie-breaker and are replaced.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19
+"""
+from alembic import op
+
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    # /deals, /deals/simple: newest
+    ('idx_deals_active_newest', "(scraped_at DESC, id DESC) WHERE is_active"),
+    # /deals?source=, /deals/from/{source}, /deals/multiple-sources: newest
+    ('idx_deals_active_source_newest', "(source, scraped_at DESC, id DESC) WHERE is_active"),
+    # sort=discount, price, unit_price
+    ('idx_deals_active_discount',
+     "(discount_percentage DESC, id DESC) WHERE is_active AND discount_percentage IS NOT NULL"),
+    ('idx_deals_active_price', "(current_price, id) WHERE is_active AND current_price IS NOT NULL"),
+    ('idx_deals_active_unit_price', "(unit_price, id) WHERE is_active AND unit_price IS NOT NULL"),
+    # /deals/with-offers: newest, effective_discount, effective_price
+    ('idx_deals_active_offers_newest', "(scraped_at DESC, id DESC) WHERE is_active AND offer_type IS NOT NULL"),
+    ('idx_deals_active_offers_effective_discount',
+     "(effective_discount DESC, id DESC) WHERE is_active AND offer_type IS NOT NULL AND effective_discount IS NOT NULL"),
+    ('idx_deals_active_offers_effective_price',
+     "(effective_price, id) WHERE is_active AND offer_type IS NOT NULL AND effective_price IS NOT NULL"),
+]
+
+# Superseded 0003 indexes, recreated on downgrade
+REPLACED = [
+    ('idx_deals_active_scraped_at', "(scraped_at DESC) WHERE is_active"),
+    ('idx_deals_active_source_scraped_at', "(source, scraped_at DESC) WHERE is_active"),
+    ('idx_deals_active_offers_scraped_at', "(scraped_at DESC) WHERE is_active AND offer_type IS NOT NULL"),
+]
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        for name, definition in INDEXES:
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON deals {definition}")
+        for name, _ in REPLACED:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, definition in REPLACED:
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON deals {definition}")
+        for name, _ in reversed(INDEXES):
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
@@ -0,0 +1,30 @@
+"""data_generation: counter bumped by ingest and cleanup
+
+Read-side caches (exact listing counts in app/counting.py) are keyed on the
+generation, so a write makes them stale without having to find their keys.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'data_generation',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('generation', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.execute("INSERT INTO data_generation (id, generation) VALUES (1, 0)")
+
+
+def downgrade():
+    op.drop_table('data_generation')
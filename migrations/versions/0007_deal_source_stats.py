@@ -0,0 +1,73 @@
+"""deal_source_stats: per-source statistics as one materialized view
+
+/scrapers/stats used to run five queries per source. The view aggregates
+every source in one pass over deals: totals with FILTER, the category
+distribution, and the top offers ranked with row_number(). Ingest and
+cleanup refresh it CONCURRENTLY (app/services/stats_service.py), which
+needs the unique index on source.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19
+"""
+from alembic import op
+
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+# Offers listed per source
+TOP_OFFERS = 10
+
+VIEW_SQL = f"""
+CREATE MATERIALIZED VIEW deal_source_stats AS
+WITH totals AS (
+    SELECT source,
+           count(*) AS total_deals,
+           count(*) FILTER (WHERE is_active) AS active_deals,
+           -- scraped_at only moves when a deal's content changes, last_seen_at on every run
+           max(last_seen_at) AS latest_scrape
+    FROM deals
+    WHERE source IS NOT NULL
+    GROUP BY source
+),
+categories AS (
+    SELECT source, category, count(*) AS deals
+    FROM deals
+    WHERE is_active AND source IS NOT NULL AND category <> ''
+    GROUP BY source, category
+),
+offers AS (
+    SELECT source, offer, count(*) AS deals,
+           row_number() OVER (PARTITION BY source ORDER BY count(*) DESC, offer) AS position
+    FROM deals
+    WHERE is_active AND source IS NOT NULL AND offer <> ''
+    GROUP BY source, offer
+)
+SELECT t.source,
+       t.total_deals,
+       t.active_deals,
+       t.total_deals - t.active_deals AS inactive_deals,
+       t.latest_scrape,
+       coalesce((
+           SELECT jsonb_agg(jsonb_build_object('category', c.category, 'count', c.deals)
+                            ORDER BY c.deals DESC, c.category)
+           FROM categories c WHERE c.source = t.source
+       ), '[]'::jsonb) AS categories,
+       coalesce((
+           SELECT jsonb_agg(jsonb_build_object('offer', o.offer, 'count', o.deals) ORDER BY o.position)
+           FROM offers o WHERE o.source = t.source AND o.position <= {TOP_OFFERS}
+       ), '[]'::jsonb) AS top_offers,
+       now() AS refreshed_at
+FROM totals t
+"""
+
+
+def upgrade():
+    op.execute(VIEW_SQL)
+    op.execute("CREATE UNIQUE INDEX idx_deal_source_stats_source ON deal_source_stats (source)")
+
+
+def downgrade():
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS deal_source_stats")
@@ -0,0 +1,8 @@
+import os
+
+# Tests that need Postgres (tests/test_ingest.py) run against TEST_DATABASE_URL.
+# It must be set before anything imports app.config, which reads DATABASE_URL once
+if os.getenv("TEST_DATABASE_URL"):
+    os.environ["DATABASE_URL"] = os.environ["TEST_DATABASE_URL"]
+    os.environ["DATABASE_REPLICA_URL"] = ""
+os.environ.setdefault("AUTO_MIGRATE", "false")
@@ -0,0 +1,39 @@
+import pytest
+
+from app.deal_query import DealFilterSpec, InvalidFilter
+from app.projections import LISTING_FIELDS, OFFER_LISTING_FIELDS
+
+
+@pytest.mark.parametrize("filters, estimable", [
+    ({}, True),
+    ({"include_inactive": True}, True),
+    ({"source": "ab.gr"}, True),
+    ({"sources": ["ab.gr", "masoutis.gr"]}, True),
+    ({"sort": "price"}, True),
+    ({"category": "Γαλακτοκομικά"}, False),
+    ({"search": "γάλα"}, False),
+    ({"unit": "kg"}, False),
+    ({"max_unit_price": 5.0}, False),
+    ({"max_unit_price": 0.0}, False),
+    ({"offer_type": "buy_x_get_y"}, False),
+    ({"offer_type": "δώρο"}, False),
+    ({"source": "ab.gr", "unit": "l"}, False),
+])
+def test_only_unfiltered_or_source_only_totals_are_estimated(filters, estimable):
+    assert DealFilterSpec.of(LISTING_FIELDS, **filters).estimable is estimable
+
+
+def test_offer_listings_are_counted():
+    assert not DealFilterSpec.of(OFFER_LISTING_FIELDS, offers=True).estimable
+
+
+def test_sources_are_one_sorted_tuple():
+    spec = DealFilterSpec.of(LISTING_FIELDS, sources=[" b ", "a", "", "a"])
+    assert spec.sources == ("a", "b")
+    assert DealFilterSpec.of(LISTING_FIELDS, source="a").shape == DealFilterSpec.of(LISTING_FIELDS, sources=["a"]).shape
+
+
+@pytest.mark.parametrize("filters", [{"sort": "effective_price"}, {"unit": "gallon"}])
+def test_invalid_filters_are_rejected(filters):
+    with pytest.raises(InvalidFilter):
+        DealFilterSpec.of(LISTING_FIELDS, **filters)
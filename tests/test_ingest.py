@@ -0,0 +1,96 @@
+import os
+
+import pytest
+from sqlalchemy import select, text
+
+pytestmark = pytest.mark.skipif(
+    not os.getenv("TEST_DATABASE_URL"),
+    reason="needs a scratch Postgres database in TEST_DATABASE_URL (its deals tables are truncated)",
+)
+
+SOURCE = "test-market.gr"
+
+
+@pytest.fixture(scope="module")
+def schema():
+    from app.database import run_migrations
+    run_migrations()
+
+
+@pytest.fixture
+def db(schema):
+    from app.database import write_engine
+    with write_engine.begin() as conn:
+        conn.execute(text("TRUNCATE deals, deal_price_history, deal_ingest_rejects RESTART IDENTITY CASCADE"))
+    return write_engine
+
+
+def deal(product_id, price=2.0, **fields):
+    from app.scrapers.deal_record import DealRecord
+    return DealRecord(
+        title=f"Product {product_id} 500gr", product_url=f"https://{SOURCE}/p/{product_id}",
+        source=SOURCE, product_id=product_id, current_price=price, **fields
+    )
+
+
+def rows(db):
+    from app.models import Deal
+    with db.connect() as conn:
+        return {row.product_id: row for row in conn.execute(select(Deal.__table__).order_by(Deal.id))}
+
+
+def ingest(mode):
+    from app.services.ingest_service import IngestService
+    return IngestService.upsert_deals if mode == "upsert" else IngestService.copy_deals
+
+
+@pytest.mark.parametrize("mode", ["upsert", "copy"])
+def test_unchanged_row_is_not_rewritten(db, mode):
+    ingest(mode)([deal("a"), deal("b")], run_id="run1")
+    before = rows(db)
+
+    stats = ingest(mode)([deal("a"), deal("b", price=1.5)], run_id="run2")
+
+    assert (stats["inserted"], stats["updated"], stats["unchanged"]) == (0, 1, 1)
+    after = rows(db)
+    assert after["a"].updated_at == before["a"].updated_at
+    assert after["a"].price_changed_at == before["a"].price_changed_at
+    assert after["a"].last_run_id == "run2"  # seen, though not rewritten
+    assert after["b"].updated_at > before["b"].updated_at
+    with db.connect() as conn:
+        assert conn.scalar(text("SELECT count(*) FROM deal_price_history")) == 3
+
+
+@pytest.mark.parametrize("mode", ["upsert", "copy"])
+def test_bad_row_is_rejected_and_the_rest_of_the_chunk_commits(db, mode):
+    bad = deal("bad")
+    bad.skuid = "x" * 500  # past the varchar(100) column, after DealRecord's own truncation
+
+    stats = ingest(mode)([deal("a"), bad, deal("b")], run_id="run1")
+
+    assert (stats["inserted"], stats["rejected"]) == (2, 1)
+    assert set(rows(db)) == {"a", "b"}
+    with db.connect() as conn:
+        rejects = conn.execute(text("SELECT run_id, source, product_id FROM deal_ingest_rejects")).all()
+    assert [tuple(row) for row in rejects] == [("run1", SOURCE, "bad")]
+
+
+def test_incomplete_run_does_not_sweep(db):
+    from app.main import save_deals_to_db
+
+    save_deals_to_db([deal("a"), deal("b")], run_id="run1", completed_sources={SOURCE})
+    save_deals_to_db([deal("a")], run_id="run2", completed_sources=())
+    assert rows(db)["b"].is_active
+
+    save_deals_to_db([deal("a")], run_id="run3", completed_sources={SOURCE})
+    assert not rows(db)["b"].is_active
+
+
+def test_sweep_keeps_rows_the_run_rejected(db):
+    from app.main import save_deals_to_db
+
+    save_deals_to_db([deal("a"), deal("b")], run_id="run1", completed_sources={SOURCE})
+    bad = deal("b")
+    bad.skuid = "x" * 500
+    save_deals_to_db([deal("a"), bad], run_id="run2", completed_sources={SOURCE})
+    assert rows(db)["b"].is_active
@@ -0,0 +1,42 @@
+import pytest
+
+from app.parsers.offers import (
+    BUY_X_GET_Y, NTH_ITEM_DISCOUNT, OTHER, PERCENT_OFF, ParsedOffer, offer_columns, parse_offer
+)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("1+1", ParsedOffer(BUY_X_GET_Y, buy_qty=1, free_qty=1)),
+    ("Προσφορά 2+1 ΔΩΡΟ", ParsedOffer(BUY_X_GET_Y, buy_qty=2, free_qty=1)),
+    ("3 για 2", ParsedOffer(BUY_X_GET_Y, buy_qty=2, free_qty=1)),
+    ("3 ΓΙΑ 2", ParsedOffer(BUY_X_GET_Y, buy_qty=2, free_qty=1)),
+    ("3 στην τιμή των 2", ParsedOffer(BUY_X_GET_Y, buy_qty=2, free_qty=1)),
+    ("2ο -50%", ParsedOffer(NTH_ITEM_DISCOUNT, nth_item=2, nth_discount=50.0)),
+    ("2nd item at 50%", ParsedOffer(NTH_ITEM_DISCOUNT, nth_item=2, nth_discount=50.0)),
+    ("-50% στο 2ο", ParsedOffer(NTH_ITEM_DISCOUNT, nth_item=2, nth_discount=50.0)),
+    ("το δεύτερο -30%", ParsedOffer(NTH_ITEM_DISCOUNT, nth_item=2, nth_discount=30.0)),
+    ("2ο τεμάχιο στη μισή τιμή", ParsedOffer(NTH_ITEM_DISCOUNT, nth_item=2, nth_discount=50.0)),
+    ("-20%", ParsedOffer(PERCENT_OFF, percent=20.0)),
+    ("-12,5%", ParsedOffer(PERCENT_OFF, percent=12.5)),
+    ("2 για 5€", ParsedOffer(OTHER)),  # a bundle price, not take-N-pay-M
+    ("Νέα γεύση", ParsedOffer(OTHER)),
+    ("", ParsedOffer()),
+    (None, ParsedOffer()),
+])
+def test_parse_offer(text, expected):
+    assert parse_offer(text) == expected
+
+
+@pytest.mark.parametrize("text, current_price, original_price, effective_price, effective_discount", [
+    ("1+1", 4.0, None, 2.0, 50.0),
+    ("3 για 2", 3.0, None, 2.0, 33.3),
+    ("2ο -50%", 2.0, None, 1.5, 25.0),
+    ("-20%", 8.0, None, 8.0, 20.0),
+    ("-20%", 8.0, 10.0, 8.0, 20.0),
+    ("Νέα γεύση", 5.0, None, 5.0, None),
+    ("1+1", None, None, None, None),
+])
+def test_offer_columns(text, current_price, original_price, effective_price, effective_discount):
+    columns = offer_columns(text, current_price, original_price)
+    assert columns["effective_price"] == effective_price
+    assert columns["effective_discount"] == effective_discount
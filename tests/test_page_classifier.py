@@ -0,0 +1,87 @@
+import pytest
+from bs4 import BeautifulSoup
+
+from app.scrapers.page_classifier import PageClassifier, PageVerdict
+
+
+def classify(html, card_selectors=".product", next_selector=None):
+    classifier = PageClassifier(card_selectors, next_selector)
+    return classifier.classify(BeautifulSoup(html, "html.parser"), html_length=len(html))
+
+
+def test_counts_cards_and_reads_totals():
+    verdict, cards = classify(
+        "<div class='product'>A</div><div class='product'>B</div>"
+        "<p>1.250 προϊόντα</p><p>Σελίδα 3 από 42</p>"
+    )
+    assert len(cards) == verdict.card_count == 2
+    assert verdict.total_products == 1250
+    assert (verdict.page_current, verdict.page_total) == (3, 42)
+    assert verdict.is_valid
+
+
+def test_card_selectors_fall_back_in_priority_order():
+    verdict, cards = classify("<li class='tile'>A</li><li class='tile'>B</li>", [".product", ".tile"])
+    assert [card.text for card in cards] == ["A", "B"]
+
+
+def test_no_results_page_is_empty():
+    verdict, cards = classify("<div><h2>Δεν βρέθηκαν προϊόντα</h2></div>")
+    assert cards == []
+    assert verdict.no_results and verdict.is_empty and not verdict.is_valid
+
+
+def test_no_results_message_next_to_cards_is_not_empty():
+    filler = "<p>" + "x" * 20000 + "</p>"
+    verdict, cards = classify(
+        "<div class='product'>A</div><div class='product'>B</div>"
+        "<aside>Δεν βρέθηκαν αποτελέσματα για τις προτάσεις</aside>" + filler
+    )
+    assert len(cards) == verdict.card_count == 2
+    assert not verdict.is_empty and verdict.is_valid
+
+
+@pytest.mark.parametrize("text", ["Δεν βρέθηκαν αποτελέσματα", "No results for your filters"])
+def test_generic_messages_are_not_no_results_markers(text):
+    verdict, _ = classify(f"<div class='product'>A</div><p>{text}</p>")
+    assert not verdict.no_results
+
+
+def test_block_page_is_blocked():
+    verdict, _ = classify("<title>Just a moment...</title><p>Checking your browser</p>")
+    assert verdict.blocked and not verdict.is_valid
+
+
+def test_block_markers_in_scripts_are_ignored():
+    verdict, _ = classify("<script>var captcha = 1;</script><div class='product'>A</div>")
+    assert not verdict.blocked
+
+
+def test_consent_wall_only_without_cards():
+    walled, _ = classify("<div id='onetrust-banner-sdk'>Cookies</div>")
+    listing, _ = classify("<div id='onetrust-banner-sdk'>Cookies</div><div class='product'>A</div>")
+    assert walled.consent_wall and not listing.consent_wall
+
+
+def test_disabled_next_button():
+    verdict, _ = classify("<div class='product'>A</div><a class='next disabled'>›</a>", next_selector=".next")
+    assert verdict.next_disabled is True
+
+
+@pytest.mark.parametrize("verdict, past_last_page", [
+    (PageVerdict(card_count=0, page_current=5, page_total=4), True),
+    (PageVerdict(card_count=20, page_current=4, page_total=4), False),
+    (PageVerdict(card_count=20), False),
+])
+def test_past_last_page(verdict, past_last_page):
+    assert verdict.past_last_page is past_last_page
+
+
+@pytest.mark.parametrize("total_products, per_page, pages", [
+    (100, 24, 5),
+    (96, 24, 4),
+    (None, 24, None),
+    (100, 0, None),
+])
+def test_estimated_pages(total_products, per_page, pages):
+    assert PageVerdict(total_products=total_products).estimated_pages(per_page) == pages
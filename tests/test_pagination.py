@@ -0,0 +1,42 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from app.pagination import DEAL_SORTS, OFFER_SORTS, InvalidCursor, decode_cursor, encode_cursor
+
+
+@pytest.mark.parametrize("sort, sorts, value", [
+    ("newest", DEAL_SORTS, datetime(2026, 10, 19, 12, 30, tzinfo=timezone.utc)),
+    ("discount", DEAL_SORTS, 35.5),
+    ("price", DEAL_SORTS, 2),
+    ("unit_price", DEAL_SORTS, 0.99),
+    ("effective_discount", OFFER_SORTS, 50.0),
+])
+def test_cursor_round_trip(sort, sorts, value):
+    assert decode_cursor(encode_cursor(sort, value, 42), sort, sorts) == (value, 42)
+
+
+def test_cursor_is_url_safe():
+    token = encode_cursor("newest", datetime(2026, 10, 19, tzinfo=timezone.utc), 1)
+    assert "=" not in token and "+" not in token and "/" not in token
+
+
+def test_cursor_of_another_sort_is_rejected():
+    with pytest.raises(InvalidCursor, match="issued for sort 'price'"):
+        decode_cursor(encode_cursor("price", 2.5, 1), "discount", DEAL_SORTS)
+
+
+@pytest.mark.parametrize("sort, token", [
+    ("price", "not a cursor!"),
+    ("price", ""),
+    ("price", encode_cursor("price", None, 1)),
+    ("price", encode_cursor("price", "2.5", 1)),
+    ("price", encode_cursor("price", 2.5, "1")),
+    ("price", encode_cursor("price", True, 1)),
+    ("price", encode_cursor("price", 2.5, False)),
+    ("newest", encode_cursor("newest", "yesterday", 1)),
+    ("newest", encode_cursor("newest", 1700000000, 1)),
+])
+def test_malformed_cursor_is_rejected(sort, token):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(token, sort, DEAL_SORTS)
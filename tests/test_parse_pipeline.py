@@ -0,0 +1,50 @@
+import random
+import threading
+import time
+
+from app.scrapers.parse_pipeline import ParsePipeline
+
+
+def slow_parse(snapshot):
+    """Finishes out of submission order"""
+    time.sleep(random.uniform(0, 0.02))
+    return snapshot * 10
+
+
+def test_results_come_back_in_page_order():
+    with ParsePipeline(slow_parse, max_workers=4, max_in_flight=4) as pipeline:
+        results = []
+        for page in range(1, 21):
+            pipeline.submit(page, page)
+            results.extend(pipeline.completed())
+        results.extend(pipeline.completed(drain=True))
+    assert results == [(page, page * 10) for page in range(1, 21)]
+
+
+def test_completed_blocks_on_the_oldest_page_when_full():
+    release = threading.Event()
+
+    def parse(snapshot):
+        if snapshot == 1:
+            release.wait(timeout=5)
+        return snapshot
+
+    with ParsePipeline(parse, max_workers=2, max_in_flight=2) as pipeline:
+        pipeline.submit(1, 1)
+        assert list(pipeline.completed()) == []  # not full, page 1 still parsing
+        pipeline.submit(2, 2)
+        assert pipeline.is_full()
+        threading.Timer(0.05, release.set).start()
+        assert list(pipeline.completed()) == [(1, 1), (2, 2)]
+
+
+def test_failed_parse_yields_none_in_place():
+    def parse(snapshot):
+        if snapshot == 2:
+            raise ValueError("broken page")
+        return snapshot
+
+    with ParsePipeline(parse, max_workers=2, max_in_flight=3) as pipeline:
+        for page in (1, 2, 3):
+            pipeline.submit(page, page)
+        assert list(pipeline.completed(drain=True)) == [(1, 1), (2, None), (3, 3)]
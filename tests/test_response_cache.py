@@ -0,0 +1,181 @@
+import asyncio
+from datetime import datetime, timezone
+
+import fakeredis
+import orjson
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from app import response_cache as response_cache_module
+from app.response_cache import ResponseCache, cached_response
+
+
+def test_key_ignores_param_order():
+    assert ResponseCache.make_key("get_deals", {"skip": 0, "limit": 20}) == \
+        ResponseCache.make_key("get_deals", {"limit": 20, "skip": 0})
+
+
+def test_key_sorts_and_dedupes_list_values():
+    assert ResponseCache.make_key("get_deals", {"sources": ["b", "a", "a"]}) == \
+        ResponseCache.make_key("get_deals", {"sources": ("a", "b")})
+
+
+def test_key_keeps_distinct_values_apart():
+    assert ResponseCache.make_key("get_deals", {"sources": ["a"]}) != \
+        ResponseCache.make_key("get_deals", {"sources": ["a", "b"]})
+    assert ResponseCache.make_key("get_deals", {"limit": 20}) != \
+        ResponseCache.make_key("get_deals_from", {"limit": 20})
+
+
+class Compute:
+    """An endpoint body that counts its calls and can be held until released"""
+
+    def __init__(self, hold=False):
+        self.calls = 0
+        self.release = asyncio.Event()
+        if not hold:
+            self.release.set()
+
+    def __call__(self, payload):
+        async def compute():
+            self.calls += 1
+            await self.release.wait()
+            return payload
+        return compute
+
+
+def body(entry):
+    return orjson.loads(entry.body)
+
+
+def test_entry_is_reused_within_a_generation():
+    async def scenario():
+        cache, compute = ResponseCache(size=8), Compute()
+        first = await cache.fetch("k", 1, None, compute({"v": 1}))
+        again = await cache.fetch("k", 1, None, compute({"v": 2}))
+        assert (body(first), body(again), compute.calls) == ({"v": 1}, {"v": 1}, 1)
+    asyncio.run(scenario())
+
+
+def test_newer_generation_past_the_stale_window_recomputes():
+    async def scenario():
+        cache, compute = ResponseCache(size=8, stale_generations=1), Compute()
+        await cache.fetch("k", 1, None, compute({"v": 1}))
+        entry = await cache.fetch("k", 3, None, compute({"v": 3}))
+        assert (entry.generation, body(entry), compute.calls) == (3, {"v": 3}, 2)
+    asyncio.run(scenario())
+
+
+def test_stale_entry_is_served_while_it_refreshes():
+    async def scenario():
+        cache = ResponseCache(size=8, stale_generations=1)
+        await cache.fetch("k", 1, None, Compute()({"v": 1}))
+
+        refresh = Compute(hold=True)
+        stale = await cache.fetch("k", 2, None, refresh({"v": 2}))
+        assert (stale.generation, body(stale)) == (1, {"v": 1})
+
+        refresh.release.set()
+        await asyncio.gather(*cache._inflight.values())
+        fresh = await cache.fetch("k", 2, None, refresh({"v": "unused"}))
+        assert (fresh.generation, body(fresh), refresh.calls) == (2, {"v": 2}, 1)
+    asyncio.run(scenario())
+
+
+def test_concurrent_misses_share_one_computation():
+    async def scenario():
+        cache, compute = ResponseCache(size=8), Compute(hold=True)
+        waiting = [asyncio.ensure_future(cache.fetch("k", 1, None, compute({"v": 1}))) for _ in range(5)]
+        await asyncio.sleep(0)
+        compute.release.set()
+        entries = await asyncio.gather(*waiting)
+        assert compute.calls == 1
+        assert all(body(entry) == {"v": 1} for entry in entries)
+    asyncio.run(scenario())
+
+
+def test_request_after_an_ingest_does_not_join_an_older_computation():
+    async def scenario():
+        cache = ResponseCache(size=8, stale_generations=1)
+        before, after = Compute(hold=True), Compute()
+        old = asyncio.ensure_future(cache.fetch("k", 1, None, before({"v": 1})))
+        await asyncio.sleep(0)
+
+        try:
+            # Joining the held generation 1 computation would wait for it
+            new = await asyncio.wait_for(cache.fetch("k", 2, None, after({"v": 2})), timeout=2)
+        finally:
+            before.release.set()
+        assert (new.generation, body(new), after.calls) == (2, {"v": 2}, 1)
+
+        assert body(await old) == {"v": 1}
+        # The older result, finishing last, does not replace the newer entry
+        assert (await cache.get("k")).generation == 2
+    asyncio.run(scenario())
+
+
+def test_redis_tier_is_shared_between_workers():
+    async def scenario():
+        server = fakeredis.FakeServer()
+        workers = [ResponseCache(size=8), ResponseCache(size=8)]
+        for worker in workers:
+            worker._redis = fakeredis.aioredis.FakeRedis(server=server)
+        compute = Compute()
+        await workers[0].fetch("k", 1, "2026-10-19T00:00:00+00:00", compute({"v": 1}))
+        entry = await workers[1].fetch("k", 1, None, compute({"v": 2}))
+        assert (body(entry), entry.changed_at, compute.calls) == ({"v": 1}, "2026-10-19T00:00:00+00:00", 1)
+    asyncio.run(scenario())
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """An app with one cached endpoint on a settable generation, counting endpoint calls"""
+    state = {"generation": 1, "calls": 0}
+
+    async def fake_generation_state(db):
+        return state["generation"], datetime(2026, 10, 19, tzinfo=timezone.utc)
+
+    class Session:
+        async def __aenter__(self):
+            return None
+
+        async def __aexit__(self, *exc):
+            return False
+
+    monkeypatch.setattr(response_cache_module, "generation_state", fake_generation_state)
+    monkeypatch.setattr(response_cache_module.database, "AsyncSessionLocal", Session)
+    monkeypatch.setattr(response_cache_module, "response_cache", ResponseCache(size=8))
+
+    app = FastAPI()
+
+    @app.get("/items")
+    @cached_response()
+    async def items(db=Depends(lambda: None), q: str = "all"):
+        state["calls"] += 1
+        return {"q": q, "generation": state["generation"]}
+
+    return TestClient(app), state
+
+
+def test_conditional_request_gets_304_without_running_the_endpoint(client):
+    client, state = client
+    first = client.get("/items")
+    assert first.status_code == 200 and state["calls"] == 1
+
+    again = client.get("/items", headers={"If-None-Match": first.headers["ETag"]})
+    assert again.status_code == 304 and again.content == b""
+    assert state["calls"] == 1
+
+    since = client.get("/items", headers={"If-Modified-Since": first.headers["Last-Modified"]})
+    assert since.status_code == 304 and state["calls"] == 1
+
+
+def test_new_generation_changes_the_etag(client):
+    client, state = client
+    first = client.get("/items")
+    state["generation"] = 5
+    after = client.get("/items", headers={"If-None-Match": first.headers["ETag"]})
+    assert after.status_code == 200
+    assert after.headers["ETag"] != first.headers["ETag"]
+    assert after.json() == {"q": "all", "generation": 5}
@@ -0,0 +1,80 @@
+import pytest
+
+from app.scrapers import sklavenitis_scraper
+from app.scrapers.deal_record import DealRecord
+from app.scrapers.page_classifier import PageVerdict
+from app.scrapers.sklavenitis_scraper import SklavenitisScraper
+
+FULL_PAGE = 20000
+
+
+class FakeDriver:
+    """Just enough of a WebDriver for the pagination loop"""
+
+    def __init__(self):
+        self.page = 0
+
+    def get(self, url):
+        self.page += 1
+
+    def quit(self):
+        pass
+
+
+def deals(page, count):
+    return [DealRecord(title=f"p{page}-{i}", product_url=f"u{page}-{i}", source="sklavenitis.gr") for i in range(count)]
+
+
+def run(pages, monkeypatch):
+    """Scrape a listing of pages {number: (verdict, deals)}; pages past the last are empty full-size pages"""
+    scraper = SklavenitisScraper()
+    scraper.driver = FakeDriver()
+    monkeypatch.setattr(sklavenitis_scraper.time, "sleep", lambda seconds: None)
+    monkeypatch.setattr(scraper, "scroll_page", lambda: None)
+    monkeypatch.setattr(scraper, "take_snapshot", lambda: scraper.driver.page)
+    monkeypatch.setattr(scraper, "analyze_snapshot", lambda page: pages.get(
+        page, (PageVerdict(card_count=0, html_length=FULL_PAGE), [])
+    ))
+    return scraper, scraper.scrape_deals(max_pages=10)
+
+
+def test_full_listing_marks_the_run_complete(monkeypatch):
+    scraper, scraped = run({
+        1: (PageVerdict(card_count=2, html_length=FULL_PAGE), deals(1, 2)),
+        2: (PageVerdict(card_count=1, html_length=FULL_PAGE), deals(2, 1)),
+    }, monkeypatch)
+    assert len(scraped) == 3
+    assert scraper.run_complete
+
+
+def test_cards_plus_no_results_marker_keeps_deals_but_not_complete(monkeypatch):
+    scraper, scraped = run({
+        1: (PageVerdict(card_count=2, html_length=FULL_PAGE, no_results=True), deals(1, 2)),
+        2: (PageVerdict(card_count=1, html_length=FULL_PAGE), deals(2, 1)),
+    }, monkeypatch)
+    assert len(scraped) == 3
+    assert scraper.skipped_pages == 1
+    assert not scraper.run_complete
+
+
+def test_undersized_page_is_not_complete(monkeypatch):
+    scraper, scraped = run({
+        1: (PageVerdict(card_count=2, html_length=FULL_PAGE), deals(1, 2)),
+        2: (PageVerdict(card_count=0, html_length=1000), []),
+        3: (PageVerdict(card_count=1, html_length=FULL_PAGE), deals(3, 1)),
+    }, monkeypatch)
+    assert len(scraped) == 3
+    assert not scraper.run_complete
+
+
+@pytest.mark.parametrize("verdict, end", [
+    (PageVerdict(card_count=0, html_length=FULL_PAGE), True),
+    (PageVerdict(card_count=0, html_length=FULL_PAGE, no_results=True), True),
+    (PageVerdict(card_count=2, html_length=FULL_PAGE, no_results=True), False),
+    (PageVerdict(card_count=2, html_length=FULL_PAGE, total_products=0), False),
+    (PageVerdict(card_count=0, html_length=1000), False),
+    (PageVerdict(card_count=0, html_length=FULL_PAGE, blocked=True), False),
+    (PageVerdict(card_count=0, html_length=1000, page_current=5, page_total=4), True),
+])
+def test_is_end_of_listing(verdict, end):
+    assert SklavenitisScraper().is_end_of_listing(verdict) is end
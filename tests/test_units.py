@@ -0,0 +1,33 @@
+import pytest
+
+from app.parsers.units import PackageSize, parse_package_size, unit_pricing
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("500gr", PackageSize(0.5, "kg")),
+    ("1kg", PackageSize(1.0, "kg")),
+    ("Φέτα ΠΟΠ 400 γρ.", PackageSize(0.4, "kg")),
+    ("Γάλα 1,5 λίτρα", PackageSize(1.5, "l")),
+    ("Χυμός 330ml", PackageSize(0.33, "l")),
+    ("Μπύρα 6x330ml", PackageSize(1.98, "l")),
+    ("Νερό 6 x 1,5 λ", PackageSize(9.0, "l")),
+    ("Αναψυκτικό 330ml x 6", PackageSize(1.98, "l")),
+    ("Κιμάς 600-800γρ", PackageSize(0.7, "kg")),
+    ("Αυγά 10 τεμ.", PackageSize(10.0, "piece")),
+    ("5 lemons", None),
+    ("Χαρτί κουζίνας 12 ρολά", None),
+    ("", None),
+    (None, None),
+])
+def test_parse_package_size(text, expected):
+    assert parse_package_size(text) == expected
+
+
+@pytest.mark.parametrize("price, texts, expected", [
+    (3.0, ("Γάλα 1,5 λίτρα",), (1.5, "l", 2.0)),
+    (2.0, ("Τυρί", "250 γρ"), (0.25, "kg", 8.0)),  # size from the specs when the title has none
+    (None, ("500gr",), (0.5, "kg", None)),
+    (1.0, ("Χωρίς μέγεθος",), (None, None, None)),
+])
+def test_unit_pricing(price, texts, expected):
+    assert unit_pricing(price, *texts) == expected